@@ -0,0 +1,146 @@
+"""Implicit-feedback alternating least squares with conjugate-gradient solves"""
+import logging
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+from scipy.sparse import csr_matrix
+
+logger = logging.getLogger(__name__)
+
+
+class ImplicitALS:
+    """Matrix factorization for implicit feedback (Hu, Koren & Volinsky, 2008)
+    
+    Every observed interaction is a positive preference with confidence
+    ``1 + alpha * rating``; unobserved pairs are weak negatives. Each half-step
+    updates one side of the factorization with a few conjugate-gradient
+    iterations per row, warm-started from the previous factors (Takacs et al.,
+    2011), so the cost per sweep is linear in the number of interactions.
+    Rows are processed in blocks that are spread over a thread pool - the
+    block work is dominated by NumPy/SciPy kernels that release the GIL.
+    """
+    
+    def __init__(self, n_factors: int = 50, regularization: float = 0.1, alpha: float = 10.0,
+                 iterations: int = 15, cg_steps: int = 3, n_workers: int = 4,
+                 block_size: int = 2048, random_state: int = 42):
+        self.n_factors = n_factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.cg_steps = cg_steps
+        self.n_workers = max(1, n_workers)
+        self.block_size = block_size
+        self.random_state = random_state
+        self.user_factors = None
+        self.item_factors = None
+    
+    def fit(self, interaction_matrix: csr_matrix,
+            progress_callback: Optional[Callable[[int, int], None]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Factorize a users x items rating matrix; returns ``(user_factors, item_factors)``"""
+        user_items = csr_matrix(interaction_matrix, dtype=np.float32)
+        item_users = user_items.T.tocsr()
+        n_users, n_items = user_items.shape
+        
+        rng = np.random.default_rng(self.random_state)
+        self.user_factors = (rng.standard_normal((n_users, self.n_factors)) * 0.01).astype(np.float32)
+        self.item_factors = (rng.standard_normal((n_items, self.n_factors)) * 0.01).astype(np.float32)
+        
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            for iteration in range(self.iterations):
+                started = time.time()
+                
+                self._half_step(executor, user_items, self.user_factors, self.item_factors)
+                self._half_step(executor, item_users, self.item_factors, self.user_factors)
+                
+                logger.info(f"ALS iteration {iteration + 1}/{self.iterations} "
+                           f"completed in {time.time() - started:.2f}s")
+                if progress_callback:
+                    progress_callback(iteration + 1, self.iterations)
+        
+        return self.user_factors, self.item_factors
+    
+    def _half_step(self, executor: ThreadPoolExecutor, matrix: csr_matrix,
+                   factors: np.ndarray, fixed_factors: np.ndarray):
+        """Update ``factors`` in place with the other side held fixed"""
+        gram = fixed_factors.T @ fixed_factors
+        blocks = range(0, matrix.shape[0], self.block_size)
+        
+        futures = [
+            executor.submit(self._solve_block, matrix, factors, fixed_factors, gram,
+                            start, min(start + self.block_size, matrix.shape[0]))
+            for start in blocks
+        ]
+        for future in futures:
+            future.result()
+    
+    def _solve_block(self, matrix: csr_matrix, factors: np.ndarray, fixed_factors: np.ndarray,
+                     gram: np.ndarray, start: int, stop: int):
+        """Batched conjugate gradient for rows ``start:stop``
+        
+        For a row ``u`` with interactions ``I`` this approximately solves
+        ``(Y^T Y + Y_I^T (C_I - 1) Y_I + reg * I) x = Y_I^T C_I 1``, all rows of
+        the block advancing together as (rows x factors) arrays.
+        """
+        block = matrix[start:stop]
+        if not block.nnz:
+            factors[start:stop] = 0.0
+            return
+        
+        row_ids = np.repeat(np.arange(stop - start), np.diff(block.indptr))
+        observed = fixed_factors[block.indices]
+        extra_confidence = (self.alpha * block.data).astype(np.float32)
+        
+        def matvec(p: np.ndarray) -> np.ndarray:
+            weights = np.einsum('ij,ij->i', observed, p[row_ids]) * extra_confidence
+            weighted = csr_matrix((weights, block.indices, block.indptr), shape=block.shape)
+            return p @ gram + self.regularization * p + weighted @ fixed_factors
+        
+        confidence = csr_matrix((1.0 + extra_confidence, block.indices, block.indptr), shape=block.shape)
+        x = factors[start:stop].copy()
+        r = confidence @ fixed_factors - matvec(x)
+        p = r.copy()
+        rs_old = np.einsum('ij,ij->i', r, r)
+        
+        for _ in range(self.cg_steps):
+            if rs_old.max() < 1e-10:
+                break
+            
+            ap = matvec(p)
+            denominator = np.einsum('ij,ij->i', p, ap)
+            step = np.divide(rs_old, denominator, out=np.zeros_like(rs_old), where=denominator > 0)
+            
+            x += step[:, np.newaxis] * p
+            r -= step[:, np.newaxis] * ap
+            
+            rs_new = np.einsum('ij,ij->i', r, r)
+            ratio = np.divide(rs_new, rs_old, out=np.zeros_like(rs_new), where=rs_old > 0)
+            p = r + ratio[:, np.newaxis] * p
+            rs_old = rs_new
+        
+        factors[start:stop] = x
+
+
+def fold_in_rows(rows: csr_matrix, fixed_factors: np.ndarray, gram: np.ndarray,
+                 regularization: float, alpha: float) -> np.ndarray:
+    """Exact implicit-ALS factors for ``rows`` against frozen ``fixed_factors``
+    
+    Used for incremental updates where only a handful of rows change, so an
+    exact ``factors x factors`` solve per row is cheaper than warm CG restarts.
+    """
+    n_factors = fixed_factors.shape[1]
+    solved = np.zeros((rows.shape[0], n_factors), dtype=fixed_factors.dtype)
+    base = gram + regularization * np.eye(n_factors)
+    
+    for row in range(rows.shape[0]):
+        cols = rows.indices[rows.indptr[row]:rows.indptr[row + 1]]
+        if not len(cols):
+            continue
+        
+        extra_confidence = alpha * rows.data[rows.indptr[row]:rows.indptr[row + 1]]
+        observed = fixed_factors[cols]
+        system = base + (observed.T * extra_confidence) @ observed
+        rhs = observed.T @ (1.0 + extra_confidence)
+        solved[row] = np.linalg.solve(system, rhs)
+    
+    return solved
\ No newline at end of file
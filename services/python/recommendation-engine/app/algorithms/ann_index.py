@@ -0,0 +1,196 @@
+"""Nearest-neighbour indexes over collaborative filtering item factors"""
+import copy
+import logging
+import numpy as np
+from typing import Optional, Protocol, Tuple
+
+from app.utils.arrays import grown_rows
+
+logger = logging.getLogger(__name__)
+
+
+class ItemFactorIndex(Protocol):
+    """Maximum inner product index over item factor vectors
+    
+    Item biases are folded in as an extra dimension (``[v_i, b_i]`` against a
+    query of ``[u, 1]``), so a search ranks events by ``u . v_i + b_i`` - the
+    collaborative filtering prediction minus the per-user constant terms.
+    """
+    
+    name: str
+    
+    @property
+    def n_items(self) -> int: ...
+    
+    def build(self, item_factors: np.ndarray, item_bias: Optional[np.ndarray] = None) -> None:
+        """Index the given item factors, replacing any previous contents"""
+    
+    def add(self, item_factors: np.ndarray, item_bias: Optional[np.ndarray] = None) -> None:
+        """Append items; they receive the next consecutive indices"""
+    
+    def added(self, item_factors: np.ndarray, item_bias: Optional[np.ndarray] = None) -> "ItemFactorIndex":
+        """Copy of the index with items appended; this one keeps serving unchanged"""
+    
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return up to ``k`` ``(item_indices, scores)`` ordered by descending score"""
+
+
+def _augment(item_factors: np.ndarray, item_bias: Optional[np.ndarray]) -> np.ndarray:
+    if item_bias is None:
+        item_bias = np.zeros(len(item_factors))
+    return np.hstack([item_factors, np.asarray(item_bias).reshape(-1, 1)]).astype(np.float32)
+
+
+def _augment_query(query: np.ndarray) -> np.ndarray:
+    return np.append(query, 1.0).astype(np.float32)
+
+
+def _top_k(indices: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        indices, scores = indices[top], scores[top]
+    order = np.argsort(-scores, kind='stable')
+    return indices[order], scores[order]
+
+
+class IVFIndex:
+    """Inverted-file index: items are bucketed by k-means and only the buckets
+    whose centroids score best against the query are scanned
+    
+    ``n_probe`` is the recall/latency knob - each query touches roughly
+    ``n_probe / n_lists`` of the catalog.
+    """
+    
+    name = "ivf"
+    
+    def __init__(self, n_lists: int = 0, n_probe: int = 16, kmeans_iterations: int = 10,
+                 train_sample: int = 100000, random_state: int = 42):
+        self.vectors = None
+        self.requested_lists = n_lists
+        self.n_probe = n_probe
+        self.kmeans_iterations = kmeans_iterations
+        self.train_sample = train_sample
+        self.random_state = random_state
+        self.centroids = None
+        self.lists = []
+    
+    @property
+    def n_items(self) -> int:
+        return 0 if self.vectors is None else len(self.vectors)
+    
+    @property
+    def n_lists(self) -> int:
+        return len(self.lists)
+    
+    def build(self, item_factors: np.ndarray, item_bias: Optional[np.ndarray] = None) -> None:
+        self.vectors = _augment(item_factors, item_bias)
+        n_items = len(self.vectors)
+        n_lists = self.requested_lists or int(np.sqrt(n_items))
+        n_lists = max(1, min(n_lists, n_items))
+        
+        self.centroids = self._train_centroids(n_lists)
+        assignments = self._assign(self.vectors)
+        
+        order = np.argsort(assignments, kind='stable')
+        boundaries = np.cumsum(np.bincount(assignments, minlength=n_lists))[:-1]
+        self.lists = np.split(order, boundaries)
+        
+        logger.info(f"Built IVF index over {n_items} items with {n_lists} lists")
+    
+    def add(self, item_factors: np.ndarray, item_bias: Optional[np.ndarray] = None) -> None:
+        if self.centroids is None:
+            self.build(item_factors, item_bias)
+            return
+        
+        vectors = _augment(item_factors, item_bias)
+        start = len(self.vectors)
+        # Appended past the end of the current view, so copies made by ``added`` share the buffer safely
+        self.vectors = grown_rows(self.vectors, start + len(vectors))
+        self.vectors[start:] = vectors
+        
+        new_indices = np.arange(start, start + len(vectors))
+        assignments = self._assign(vectors)
+        for list_id in np.unique(assignments):
+            self.lists[list_id] = np.concatenate([self.lists[list_id], new_indices[assignments == list_id]])
+    
+    def added(self, item_factors: np.ndarray, item_bias: Optional[np.ndarray] = None) -> "IVFIndex":
+        index = copy.copy(self)
+        index.lists = list(self.lists)
+        index.add(item_factors, item_bias)
+        return index
+    
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.vectors is None or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        query = _augment_query(query)
+        
+        # Pick the lists whose centroids score best against the query
+        n_probe = min(self.n_probe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        if n_probe < self.n_lists:
+            probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            probe = np.arange(self.n_lists)
+        
+        candidates = np.concatenate([self.lists[list_id] for list_id in probe])
+        if not len(candidates):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        
+        scores = self.vectors[candidates] @ query
+        return _top_k(candidates, scores, k)
+    
+    def _train_centroids(self, n_lists: int) -> np.ndarray:
+        """Lloyd's k-means on a sample of the item vectors"""
+        rng = np.random.default_rng(self.random_state)
+        n_items = len(self.vectors)
+        
+        sample = self.vectors
+        if n_items > self.train_sample:
+            sample = self.vectors[rng.choice(n_items, self.train_sample, replace=False)]
+        
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        
+        for _ in range(self.kmeans_iterations):
+            assignments = self._assign(sample, centroids)
+            counts = np.bincount(assignments, minlength=n_lists)
+            
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            
+            # Empty clusters keep their previous centroid
+            non_empty = counts > 0
+            centroids[non_empty] = sums[non_empty] / counts[non_empty, np.newaxis]
+        
+        return centroids
+    
+    def _assign(self, vectors: np.ndarray, centroids: Optional[np.ndarray] = None,
+                block_size: int = 65536) -> np.ndarray:
+        """Nearest centroid (euclidean) for each vector, computed in blocks"""
+        centroids = self.centroids if centroids is None else centroids
+        half_norms = 0.5 * np.einsum('ij,ij->i', centroids, centroids)
+        
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            assignments[start:start + block_size] = np.argmax(block @ centroids.T - half_norms, axis=1)
+        
+        return assignments
+
+
+ITEM_INDEX_TYPES = {
+    IVFIndex.name: IVFIndex,
+}
+
+
+def create_item_index(kind: str, **params) -> Optional[ItemFactorIndex]:
+    """Create an empty item index by name; ``None`` means exact scoring only"""
+    if not kind or kind == "exact":
+        return None
+    
+    index_class = ITEM_INDEX_TYPES.get(kind)
+    if index_class is None:
+        logger.warning(f"Unknown item index type '{kind}', using exact scoring")
+        return None
+    
+    return index_class(**params)
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""Inverted indexes for content-based candidate generation"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.algorithms.content_features import EventFeatureStore
+
+logger = logging.getLogger(__name__)
+
+
+class PostingLists:
+    """Event rows grouped by integer key, each list ordered by a static event prior
+    
+    All lists share one flat row array with per-key offsets, so a lookup is
+    a slice and truncating a list keeps its highest-prior events.
+    """
+    
+    def __init__(self, keys: np.ndarray, rows: np.ndarray, prior: np.ndarray, n_keys: int):
+        order = np.lexsort((-prior[rows], keys))
+        self.rows = rows[order].astype(np.int64)
+        self.offsets = np.searchsorted(keys[order], np.arange(n_keys + 1))
+    
+    def get(self, key: int, limit: Optional[int] = None) -> np.ndarray:
+        """Up to ``limit`` (default all) rows for ``key``, best prior first"""
+        start, stop = self.offsets[key], self.offsets[key + 1]
+        return self.rows[start:stop if limit is None else min(stop, start + limit)]
+
+
+def _name_postings(names: np.ndarray, prior: np.ndarray) -> Tuple[Dict[str, int], PostingLists]:
+    """Vocabulary and posting lists of a string column; empty names are not indexed"""
+    vocabulary, codes = np.unique(names, return_inverse=True)
+    rows = np.flatnonzero(names != '')
+    return (
+        {name: code for code, name in enumerate(vocabulary.tolist()) if name},
+        PostingLists(codes[rows], rows, prior, len(vocabulary))
+    )
+
+
+class CandidateIndex:
+    """Category, tag, organizer and venue inverted indexes over the catalog
+    
+    Candidates for a profile are the events sharing a preferred category,
+    organizer or venue, at most ``per_key`` per key, the ``per_key`` x
+    matched-tag events sharing the most preferred tags, and a backfill of the
+    ``backfill`` best events overall. Ties are broken by the event prior used
+    in scoring: curation multiplier x time relevance at build time.
+    """
+    
+    def __init__(self, features: EventFeatureStore, per_key: int, backfill: int,
+                 now: Optional[float] = None):
+        prior = features.curation_multipliers * features.time_relevance(now)
+        rows = np.arange(len(features))
+        has_category = features.category_codes >= 0
+        tag_entries = features.tag_matrix.tocoo()
+        
+        self.per_key = per_key
+        self.prior = prior
+        self.categories = features.categories
+        self.category_postings = PostingLists(
+            features.category_codes[has_category], rows[has_category], prior, len(features.categories)
+        )
+        self.tags = features.tags
+        self.tag_postings = PostingLists(tag_entries.col, tag_entries.row, prior, len(features.tags))
+        self.organizers, self.organizer_postings = _name_postings(features.organizer_names, prior)
+        self.venues, self.venue_postings = _name_postings(features.venue_names, prior)
+        self.backfill_rows = np.argsort(-prior, kind='stable')[:backfill].astype(np.int64)
+        
+        logger.info(f"Built candidate indexes over {len(features)} events ({len(self.organizers)} organizers, "
+                   f"{len(self.venues)} venues)")
+    
+    def candidates(self, profile: Dict[str, Any], extra_rows: Iterable[np.ndarray] = ()) -> np.ndarray:
+        """Sorted unique candidate rows for a user profile, plus any ``extra_rows``"""
+        row_lists: List[np.ndarray] = [self.backfill_rows, self._tag_candidates(profile['preferred_tags']),
+                                       *extra_rows]
+        lookups = [
+            (profile['preferred_categories'], self.categories, self.category_postings),
+            ({name.lower() for name in profile['organizer_preferences']}, self.organizers, self.organizer_postings),
+            ({name.lower() for name in profile['venue_preferences']}, self.venues, self.venue_postings)
+        ]
+        
+        for names, vocabulary, postings in lookups:
+            for name in names:
+                key = vocabulary.get(name)
+                if key is not None:
+                    row_lists.append(postings.get(key, self.per_key))
+        
+        return np.unique(np.concatenate(row_lists))
+    
+    def _tag_candidates(self, preferred_tags: Iterable[str]) -> np.ndarray:
+        """Events ranked by the number of preferred tags they carry, then by prior"""
+        keys = [self.tags[tag] for tag in preferred_tags if tag in self.tags]
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        
+        rows, matches = np.unique(np.concatenate([self.tag_postings.get(key) for key in keys]),
+                                  return_counts=True)
+        best = np.lexsort((-self.prior[rows], -matches))[:self.per_key * len(keys)]
+        return rows[best]
\ No newline at end of file
@@ -1,227 +1,507 @@
 """Collaborative filtering recommendation algorithm using matrix factorization"""
 import logging
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 from uuid import UUID
+from datetime import datetime, timezone
 import asyncio
+import time
 from scipy.sparse import csr_matrix
 from sklearn.decomposition import NMF
 from sklearn.metrics.pairwise import cosine_similarity
-import pickle
-import os
 
 from app.config import get_settings
 from app.models.recommendation import RecommendationItem, RecommendationAlgorithm, UserInteraction
+from app.algorithms.ann_index import ItemFactorIndex, create_item_index
+from app.algorithms.als import ImplicitALS, fold_in_rows
+from app.algorithms.neighbours import NeighbourTable
+from app.algorithms.interaction_data import (
+    InteractionDelta, InteractionMatrixBuilder, load_interaction_matrix, user_interaction_ratings
+)
+from app.utils.arrays import grown_rows
+from app.utils.id_registry import IdRegistry
+from app.utils.model_artifacts import ModelArtifactStore
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+ProgressCallback = Callable[[str, float], None]
+
 
 class CollaborativeFilteringRecommender:
     """Matrix factorization-based collaborative filtering recommender"""
     
     def __init__(self):
         self.model = None
-        self.user_encoder = {}
-        self.event_encoder = {}
-        self.user_decoder = {}
-        self.event_decoder = {}
+        self.user_registry = IdRegistry()
+        self.event_registry = IdRegistry()
         self.interaction_matrix = None
+        self.interaction_delta = InteractionDelta()
+        self.event_popularity: Optional[np.ndarray] = None
+        self.popular_events = np.zeros(0, dtype=np.int64)
         self.user_factors = None
         self.item_factors = None
         self.user_bias = None
         self.item_bias = None
         self.global_bias = 0.0
+        self.trainer = "nmf"
+        self.rating_scale = float(settings.CF_MAX_RATING)
+        self.item_index: Optional[ItemFactorIndex] = None
+        self.user_neighbours: Optional[NeighbourTable] = None
+        # Sorted users whose factors changed since the neighbour table was built or refreshed
+        self.stale_neighbour_users = np.zeros(0, dtype=np.int64)
+        self._user_gram = None
+        self._item_gram = None
+        self.artifact_store = ModelArtifactStore("collaborative_filtering")
+        self.artifact_version = None
+        # Epoch time the interactions were read from the database; later ones are caught up on load
+        self.interactions_as_of: Optional[float] = None
         self.is_trained = False
         self.model_version = "1.0.0"
         
-    async def train(self, interactions: List[UserInteraction]) -> None:
+    async def train(self, interactions: List[UserInteraction],
+                    progress_callback: Optional[ProgressCallback] = None) -> None:
         """Train the collaborative filtering model"""
         if len(interactions) < settings.MIN_INTERACTIONS_FOR_CF:
             logger.warning(f"Not enough interactions ({len(interactions)}) for collaborative filtering training")
             return
         
-        logger.info(f"Training collaborative filtering model with {len(interactions)} interactions")
+        builder = InteractionMatrixBuilder()
+        builder.add_interactions(interactions)
+        await self.train_from_matrix(*builder.build(), progress_callback=progress_callback)
+    
+    async def train_from_database(self, since: Optional[datetime] = None,
+                                  progress_callback: Optional[ProgressCallback] = None) -> None:
+        """Train on ``user_interactions`` streamed from Postgres in chunks"""
+        if progress_callback:
+            progress_callback('loading_interactions', 0.0)
+        interactions_as_of = time.time()
+        builder = await asyncio.to_thread(
+            load_interaction_matrix, since, until=datetime.fromtimestamp(interactions_as_of, timezone.utc)
+        )
+        
+        if builder.n_interactions < settings.MIN_INTERACTIONS_FOR_CF:
+            logger.warning(f"Not enough interactions ({builder.n_interactions}) for collaborative filtering training")
+            return
+        
+        await self.train_from_matrix(*builder.build(), progress_callback=progress_callback,
+                                     interactions_as_of=interactions_as_of)
+    
+    async def train_from_matrix(self, user_registry: IdRegistry, event_registry: IdRegistry,
+                                interaction_matrix: csr_matrix,
+                                progress_callback: Optional[ProgressCallback] = None,
+                                interactions_as_of: Optional[float] = None) -> None:
+        """Train on a prepared users x events rating matrix
+        
+        ``progress_callback(stage, fraction)`` is called as training advances.
+        ``interactions_as_of`` is when the matrix was read from the database,
+        if it was.
+        """
+        logger.info(f"Training collaborative filtering model with {interaction_matrix.nnz} user/event pairs")
         
         try:
-            # Convert interactions to DataFrame
-            df = pd.DataFrame([
-                {
-                    'user_id': str(interaction.user_id),
-                    'event_id': str(interaction.event_id),
-                    'rating': self._interaction_to_rating(interaction)
-                }
-                for interaction in interactions
-            ])
-            
-            # Create user and event encoders
-            unique_users = df['user_id'].unique()
-            unique_events = df['event_id'].unique()
-            
-            self.user_encoder = {user: idx for idx, user in enumerate(unique_users)}
-            self.event_encoder = {event: idx for idx, event in enumerate(unique_events)}
-            self.user_decoder = {idx: user for user, idx in self.user_encoder.items()}
-            self.event_decoder = {idx: event for event, idx in self.event_encoder.items()}
-            
-            # Create interaction matrix
-            n_users = len(unique_users)
-            n_events = len(unique_events)
-            
-            # Encode user and event IDs
-            df['user_idx'] = df['user_id'].map(self.user_encoder)
-            df['event_idx'] = df['event_id'].map(self.event_encoder)
-            
-            # Create sparse matrix
-            self.interaction_matrix = csr_matrix(
-                (df['rating'], (df['user_idx'], df['event_idx'])),
-                shape=(n_users, n_events)
-            )
+            self.user_registry = user_registry
+            self.event_registry = event_registry
+            self.interaction_matrix = interaction_matrix
+            self.interaction_delta = InteractionDelta()
+            self.interactions_as_of = interactions_as_of
+            self.event_popularity = self._column_totals(interaction_matrix)
+            self.popular_events = self._rank_popular(self.event_popularity)
             
             # Train matrix factorization model
-            await self._train_matrix_factorization()
+            await self._train_matrix_factorization(progress_callback)
             
             self.is_trained = True
             logger.info("Collaborative filtering model trained successfully")
             
             # Save model
+            if progress_callback:
+                progress_callback('saving', 0.95)
             await self._save_model()
             
         except Exception as e:
             logger.error(f"Failed to train collaborative filtering model: {e}")
             raise
     
-    async def _train_matrix_factorization(self):
+    async def _train_matrix_factorization(self, progress_callback: Optional[ProgressCallback] = None):
+        """Train matrix factorization with the trainer selected by ``CF_TRAINER``"""
+        try:
+            if progress_callback:
+                progress_callback('factorizing', 0.1)
+            
+            if settings.CF_TRAINER == "als":
+                self._train_implicit_als(progress_callback)
+            else:
+                self._train_nmf()
+            
+            self._user_gram = None
+            self._item_gram = None
+            
+            logger.info(f"Matrix factorization ({self.trainer}) completed with {settings.CF_N_FACTORS} factors")
+            
+            if progress_callback:
+                progress_callback('building_indexes', 0.9)
+            
+            self._build_item_index()
+            self.user_neighbours = self._create_neighbour_table()
+            self.user_neighbours.build(self.user_factors)
+            self.stale_neighbour_users = np.zeros(0, dtype=np.int64)
+            
+        except Exception as e:
+            logger.error(f"Matrix factorization training failed: {e}")
+            raise
+    
+    def _train_nmf(self):
         """Train matrix factorization using NMF"""
+        # Use Non-negative Matrix Factorization
+        self.model = NMF(
+            n_components=settings.CF_N_FACTORS,
+            init='nndsvd',
+            solver='mu',
+            max_iter=settings.CF_N_EPOCHS,
+            random_state=42
+        )
+        
+        # Fit the model
+        self.user_factors = self.model.fit_transform(self.interaction_matrix)
+        self.item_factors = self.model.components_.T
+        
+        # Calculate biases
+        self.global_bias = self.interaction_matrix.data.mean()
+        
+        # User biases
+        user_means = np.array(self.interaction_matrix.mean(axis=1)).flatten()
+        self.user_bias = user_means - self.global_bias
+        
+        # Item biases
+        item_means = np.array(self.interaction_matrix.mean(axis=0)).flatten()
+        self.item_bias = item_means - self.global_bias
+        
+        self.trainer = "nmf"
+        self.rating_scale = float(settings.CF_MAX_RATING)
+    
+    def _train_implicit_als(self, progress_callback: Optional[ProgressCallback] = None):
+        """Train matrix factorization using implicit-feedback ALS
+        
+        ALS predicts preferences on a 0-1 scale directly, so no rating biases
+        are added on top of the factor dot products.
+        """
+        self.model = ImplicitALS(
+            n_factors=settings.CF_N_FACTORS,
+            regularization=settings.CF_ALS_REGULARIZATION,
+            alpha=settings.CF_ALS_ALPHA,
+            iterations=settings.CF_ALS_ITERATIONS,
+            cg_steps=settings.CF_ALS_CG_STEPS,
+            n_workers=settings.PARALLEL_WORKERS,
+            block_size=settings.CF_ALS_BLOCK_SIZE
+        )
+        
+        def iteration_progress(iteration: int, iterations: int):
+            if progress_callback:
+                progress_callback('factorizing', 0.1 + 0.8 * iteration / iterations)
+        
+        self.user_factors, self.item_factors = self.model.fit(self.interaction_matrix, iteration_progress)
+        
+        n_users, n_events = self.interaction_matrix.shape
+        self.global_bias = 0.0
+        self.user_bias = np.zeros(n_users, dtype=np.float32)
+        self.item_bias = np.zeros(n_events, dtype=np.float32)
+        
+        self.trainer = "als"
+        self.rating_scale = 1.0
+    
+    async def update_interactions(self, interactions: List[UserInteraction]) -> Dict[str, int]:
+        """Fold new interactions into the trained model without a full retrain"""
+        return await self.update_ratings(
+            [interaction.user_id for interaction in interactions],
+            [interaction.event_id for interaction in interactions],
+            user_interaction_ratings(interactions)
+        )
+    
+    async def update_ratings(self, user_ids: Iterable, event_ids: Iterable, ratings: np.ndarray) -> Dict[str, int]:
+        """Fold ``(user_id, event_id, rating)`` columns into the trained model
+        
+        New users and events are appended to the ID registries, and the new
+        ratings go to a small ``InteractionDelta`` that is merged into the
+        interaction matrix once it holds ``CF_INTERACTION_DELTA_FRACTION`` of
+        its entries. Events seen for the first time get item factors solved
+        against the frozen user factors, then every user whose interactions
+        changed is re-solved against the frozen item factors; their similar-user
+        lists are refreshed later by ``refresh_user_neighbours``. The solves
+        run on a worker thread. Arrays only appended to grow into spare capacity
+        (``grown_rows``), and the re-solved user rows are written to new arrays, so
+        the update can run on a shallow copy of the recommender while requests
+        score on the original, which never sees the change.
+        """
+        stats = {'interactions': 0, 'users_updated': 0, 'new_users': 0, 'new_events': 0}
+        
+        ratings = np.asarray(ratings, dtype=np.float32)
+        if not self.is_trained or not len(ratings):
+            return stats
+        
         try:
-            # Use Non-negative Matrix Factorization
-            self.model = NMF(
-                n_components=settings.CF_N_FACTORS,
-                init='nndsvd',
-                solver='mu',
-                max_iter=settings.CF_N_EPOCHS,
-                random_state=42
+            changed_users, new_users, new_events = await asyncio.to_thread(
+                self._fold_in_ratings, user_ids, event_ids, ratings
             )
             
-            # Fit the model
-            self.user_factors = self.model.fit_transform(self.interaction_matrix)
-            self.item_factors = self.model.components_.T
+            stats.update({
+                'interactions': len(ratings),
+                'users_updated': len(changed_users),
+                'new_users': new_users,
+                'new_events': new_events
+            })
+            logger.info(f"Folded {len(ratings)} interactions into collaborative filtering model: {stats}")
+            return stats
             
-            # Calculate biases
-            self.global_bias = self.interaction_matrix.data.mean()
+        except Exception as e:
+            logger.error(f"Failed to fold interactions into collaborative filtering model: {e}")
+            raise
+    
+    def _fold_in_ratings(self, user_ids: Iterable, event_ids: Iterable,
+                         ratings: np.ndarray) -> Tuple[np.ndarray, int, int]:
+        """Synchronous body of ``update_ratings``; returns ``(changed_users, n_new_users, n_new_events)``"""
+        n_users_before = len(self.user_registry)
+        n_events_before = len(self.event_registry)
+        
+        user_registry = self.user_registry.copy()
+        event_registry = self.event_registry.copy()
+        user_indices = user_registry.encode_or_add(user_ids)
+        event_indices = event_registry.encode_or_add(event_ids)
+        
+        n_users = len(user_registry)
+        n_events = len(event_registry)
+        n_new_users = n_users - n_users_before
+        n_new_events = n_events - n_events_before
+        
+        # New users get empty rows of the interaction matrix; the ratings go to the delta
+        matrix = self.interaction_matrix
+        indptr = grown_rows(matrix.indptr, n_users + 1)
+        indptr[n_users_before + 1:] = matrix.indptr[-1]
+        interaction_matrix = csr_matrix((matrix.data, matrix.indices, indptr), shape=(n_users, n_events))
+        interaction_delta = self.interaction_delta.added(user_indices, event_indices, ratings, n_events)
+        if interaction_delta.nnz > settings.CF_INTERACTION_DELTA_FRACTION * interaction_matrix.nnz:
+            interaction_matrix = interaction_delta.merged_into(interaction_matrix)
+            interaction_delta = InteractionDelta()
+        
+        # Totals only grow, so only the events just rated can enter the popular list
+        event_popularity = np.concatenate([self.event_popularity, np.zeros(n_new_events)])
+        np.add.at(event_popularity, event_indices, ratings)
+        popular_events = self._rank_popular(event_popularity, np.union1d(self.popular_events, event_indices))
+        
+        # Item rows are only appended; user rows of known users are rewritten, so those arrays are copied
+        item_factors = grown_rows(self.item_factors, n_events)
+        item_bias = grown_rows(self.item_bias, n_events)
+        user_factors = grown_rows(self.user_factors, n_users, copy=True)
+        user_bias = grown_rows(self.user_bias, n_users, copy=True)
+        item_gram = self._get_item_gram()
+        item_index = self.item_index
+        
+        if n_new_events:
+            new_events = np.arange(n_events_before, n_events)
+            # Events seen for the first time were only rated in this batch
+            rated = event_indices >= n_events_before
+            columns = csr_matrix(
+                (ratings[rated], (event_indices[rated] - n_events_before, user_indices[rated])),
+                shape=(n_new_events, n_users)
+            )
+            
+            item_factors[new_events] = self._fold_in(columns, user_factors, self._get_user_gram())
+            if self.trainer == "nmf":
+                item_bias[new_events] = np.asarray(columns.sum(axis=1)).ravel() / n_users - self.global_bias
             
-            # User biases
-            user_means = np.array(self.interaction_matrix.mean(axis=1)).flatten()
-            self.user_bias = user_means - self.global_bias
+            item_gram = item_gram + item_factors[new_events].T @ item_factors[new_events]
+            if item_index is not None:
+                item_index = item_index.added(item_factors[new_events], item_bias[new_events])
+        
+        changed_users = np.unique(user_indices)
+        rows = interaction_matrix[changed_users]
+        if interaction_delta.nnz:
+            rows = (rows + interaction_delta.rows(changed_users)).tocsr()
+        
+        old_factors = user_factors[changed_users]
+        new_factors = self._fold_in(rows, item_factors, item_gram)
+        user_factors[changed_users] = new_factors
+        if self.trainer == "nmf":
+            user_bias[changed_users] = np.asarray(rows.sum(axis=1)).ravel() / n_events - self.global_bias
+        
+        user_gram = self._user_gram
+        if user_gram is not None:
+            user_gram = user_gram + new_factors.T @ new_factors - old_factors.T @ old_factors
+        
+        self.user_registry = user_registry
+        self.event_registry = event_registry
+        self.interaction_matrix = interaction_matrix
+        self.interaction_delta = interaction_delta
+        self.event_popularity = event_popularity
+        self.popular_events = popular_events
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.user_bias = user_bias
+        self.item_bias = item_bias
+        self.item_index = item_index
+        self.stale_neighbour_users = np.union1d(self.stale_neighbour_users, changed_users)
+        self._user_gram = user_gram
+        self._item_gram = item_gram
+        
+        return changed_users, n_new_users, n_new_events
+    
+    async def refresh_user_neighbours(self) -> int:
+        """Apply the users folded in since the last refresh to the similar-users table
+        
+        Refreshing scores the changed users against every user, so streamed
+        batches only mark users stale and the table is patched here in one
+        pass, on a copy off the event loop. Returns the number of users
+        refreshed.
+        """
+        stale_users = self.stale_neighbour_users
+        if self.user_neighbours is None or not len(stale_users):
+            return 0
+        
+        def refreshed() -> NeighbourTable:
+            user_neighbours = self.user_neighbours.copy()
+            user_neighbours.update(stale_users, self.user_factors)
+            return user_neighbours
+        
+        try:
+            user_neighbours = await asyncio.to_thread(refreshed)
             
-            # Item biases
-            item_means = np.array(self.interaction_matrix.mean(axis=0)).flatten()
-            self.item_bias = item_means - self.global_bias
+            self.user_neighbours = user_neighbours
+            self.stale_neighbour_users = np.zeros(0, dtype=np.int64)
             
-            logger.info(f"Matrix factorization completed with {settings.CF_N_FACTORS} factors")
+            logger.info(f"Refreshed similar users of {len(stale_users)} users")
+            return len(stale_users)
             
         except Exception as e:
-            logger.error(f"Matrix factorization training failed: {e}")
+            logger.error(f"Failed to refresh the similar-users table: {e}")
             raise
     
-    def _interaction_to_rating(self, interaction: UserInteraction) -> float:
-        """Convert interaction to rating"""
-        if interaction.rating is not None:
-            return float(interaction.rating)
-        
-        # Convert interaction type to implicit rating
-        type_ratings = {
-            'register': 5.0,
-            'like': 4.0,
-            'save': 4.0,
-            'share': 4.0,
-            'click': 3.0,
-            'view': 2.0,
-            'comment': 3.5
-        }
-        
-        base_rating = type_ratings.get(interaction.interaction_type, 2.0)
-        
-        # Adjust based on duration for view interactions
-        if interaction.interaction_type == 'view' and interaction.duration_seconds:
-            if interaction.duration_seconds > 300:  # 5 minutes
-                base_rating += 1.0
-            elif interaction.duration_seconds > 60:  # 1 minute
-                base_rating += 0.5
-        
-        return min(5.0, base_rating)
+    async def catch_up_interactions(self) -> int:
+        """Fold in the interactions recorded since the model's interactions were read
+        
+        Interactions created in the database after ``interactions_as_of`` are
+        folded in, so a freshly loaded version keeps what was streamed while it
+        was being trained. Returns the number of interactions folded in.
+        """
+        if not self.is_trained or self.interactions_as_of is None:
+            return 0
+        
+        started_at = time.time()
+        builder = await asyncio.to_thread(
+            load_interaction_matrix, datetime.fromtimestamp(self.interactions_as_of, timezone.utc),
+            until=datetime.fromtimestamp(started_at, timezone.utc)
+        )
+        user_registry, event_registry, matrix = builder.build()
+        entries = matrix.tocoo()
+        await self.update_ratings(user_registry.ids[entries.row], event_registry.ids[entries.col], entries.data)
+        
+        self.interactions_as_of = started_at
+        if builder.n_interactions:
+            logger.info(f"Caught up {builder.n_interactions} interactions into collaborative filtering model")
+        return builder.n_interactions
+    
+    async def remove_events(self, event_ids: List[UUID]) -> int:
+        """Drop events (e.g. ones that have ended) from the model without retraining
+        
+        Their interaction-matrix columns, item factors and biases are discarded
+        and the item index is rebuilt over the remaining events. User factors
+        are kept as trained; the next full retrain drops the removed events'
+        influence on them. Returns the number of events removed.
+        """
+        if not self.is_trained or not event_ids:
+            return 0
+        
+        rows = np.unique(self._encode_event_ids(event_ids))
+        if not len(rows):
+            return 0
+        
+        try:
+            kept = np.setdiff1d(np.arange(len(self.event_registry)), rows)
+            event_registry = IdRegistry(self.event_registry.ids[kept])
+            interaction_matrix = self._merged_interactions()[:, kept].tocsr()
+            item_factors = np.ascontiguousarray(self.item_factors[kept])
+            item_bias = self.item_bias[kept]
+            item_index = await asyncio.to_thread(self._create_item_index, item_factors, item_bias)
+            
+            event_popularity = self.event_popularity[kept]
+            popular_events = self.popular_events[~np.isin(self.popular_events, rows)]
+            popular_events = popular_events - np.searchsorted(rows, popular_events)
+            if len(popular_events) < min(settings.POPULARITY_TOP_N, len(kept)):
+                popular_events = self._rank_popular(event_popularity)
+            
+            self.event_registry = event_registry
+            self.interaction_matrix = interaction_matrix
+            self.interaction_delta = InteractionDelta()
+            self.event_popularity = event_popularity
+            self.popular_events = popular_events
+            self.item_factors = item_factors
+            self.item_bias = item_bias
+            self.item_index = item_index
+            self._item_gram = None
+            
+            logger.info(f"Removed {len(rows)} events from collaborative filtering model")
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Failed to remove events from collaborative filtering model: {e}")
+            raise
+    
+    def _fold_in(self, rows: csr_matrix, fixed_factors: np.ndarray, gram: np.ndarray) -> np.ndarray:
+        """Regularised least-squares factors for ``rows`` against frozen ``fixed_factors``
+        
+        For NMF this solves ``(F^T F + reg * I) x = F^T r`` for every row ``r`` at
+        once; missing entries count as zeros, matching what NMF optimises, and the
+        result is clipped to stay non-negative. ALS models use the confidence
+        weighted implicit-feedback system instead.
+        """
+        if self.trainer == "als":
+            return fold_in_rows(rows, fixed_factors, gram, settings.CF_ALS_REGULARIZATION, settings.CF_ALS_ALPHA)
+        
+        regularised = gram + settings.CF_REG_ALL * np.eye(gram.shape[0])
+        rhs = np.asarray(rows @ fixed_factors)
+        return np.maximum(np.linalg.solve(regularised, rhs.T).T, 0.0)
+    
+    def _get_user_gram(self) -> np.ndarray:
+        if self._user_gram is None:
+            self._user_gram = self.user_factors.T @ self.user_factors
+        return self._user_gram
+    
+    def _get_item_gram(self) -> np.ndarray:
+        if self._item_gram is None:
+            self._item_gram = self.item_factors.T @ self.item_factors
+        return self._item_gram
     
     async def get_recommendations(self, user_id: UUID, count: int = 20, 
                                 exclude_events: List[UUID] = None) -> List[RecommendationItem]:
         """Generate collaborative filtering recommendations for a user"""
+        return self.recommend(user_id, count, exclude_events)
+    
+    def recommend(self, user_id: UUID, count: int = 20,
+                  exclude_events: List[UUID] = None) -> List[RecommendationItem]:
+        """Synchronous ``get_recommendations``, for scoring threads"""
         if not self.is_trained:
             logger.warning("Collaborative filtering model not trained yet")
             return []
         
         try:
-            user_id_str = str(user_id)
+            user_idx = self.user_registry.encode_one(user_id)
             
             # Check if user is in training data
-            if user_id_str not in self.user_encoder:
+            if user_idx is None:
                 logger.info(f"User {user_id} not in training data, using popularity-based fallback")
-                return await self._get_popularity_based_recommendations(count, exclude_events)
-            
-            user_idx = self.user_encoder[user_id_str]
-            
-            # Calculate predicted ratings for all events
-            user_vector = self.user_factors[user_idx]
-            predicted_ratings = np.dot(user_vector, self.item_factors.T)
-            
-            # Add biases
-            predicted_ratings += self.global_bias + self.user_bias[user_idx] + self.item_bias
-            
-            # Get events user hasn't interacted with
-            user_interactions = set(self.interaction_matrix[user_idx].nonzero()[1])
+                return self._get_popularity_based_recommendations(count, exclude_events)
             
-            # Exclude events that user has already interacted with
-            exclude_indices = user_interactions.copy()
+            exclude_indices = self._encode_event_ids(exclude_events)
             
-            # Exclude specifically requested events
-            if exclude_events:
-                for event_id in exclude_events:
-                    event_id_str = str(event_id)
-                    if event_id_str in self.event_encoder:
-                        exclude_indices.add(self.event_encoder[event_id_str])
+            # Approximate candidates first, exact scoring when the index can't fill the list
+            ranked = self._score_user_approximate(user_idx, count, exclude_indices)
+            if ranked is None:
+                top_indices, top_scores = self._score_users(np.array([user_idx]), count, exclude_indices)
+                ranked = (top_indices[0], top_scores[0])
             
-            # Create recommendations
-            recommendations = []
-            event_scores = list(enumerate(predicted_ratings))
-            event_scores.sort(key=lambda x: x[1], reverse=True)
-            
-            rank = 1
-            for event_idx, score in event_scores:
-                if event_idx in exclude_indices:
-                    continue
-                
-                if len(recommendations) >= count:
-                    break
-                
-                event_id = UUID(self.event_decoder[event_idx])
-                
-                # Calculate confidence based on user's interaction history
-                confidence = min(0.9, 0.5 + (len(user_interactions) / 100))
-                
-                recommendations.append(RecommendationItem(
-                    event_id=event_id,
-                    score=min(1.0, max(0.0, score / 5.0)),  # Normalize to 0-1
-                    algorithm=RecommendationAlgorithm.COLLABORATIVE_FILTERING,
-                    confidence=confidence,
-                    rank=rank,
-                    reasons=[f"Users with similar preferences also liked this event"],
-                    title="",  # Will be filled by the calling service
-                    category="",
-                    tags=[],
-                    start_time=None,
-                    is_virtual=False,
-                    organizer_name=""
-                ))
-                
-                rank += 1
+            interaction_count = self.interaction_rows(np.array([user_idx])).nnz
+            recommendations = self._build_recommendation_items(
+                ranked[0], ranked[1], self._calculate_confidence(interaction_count)
+            )
             
             logger.info(f"Generated {len(recommendations)} collaborative filtering recommendations for user {user_id}")
             return recommendations
@@ -230,30 +510,221 @@ class CollaborativeFilteringRecommender:
             logger.error(f"Failed to generate collaborative filtering recommendations: {e}")
             return []
     
+    async def get_recommendations_batch(self, user_ids: List[UUID], count: int = 20,
+                                      exclude_events: List[UUID] = None) -> Dict[UUID, List[RecommendationItem]]:
+        """Generate collaborative filtering recommendations for many users at once
+        
+        Known users are scored in blocks of ``CF_BATCH_SCORING_SIZE`` with a single
+        matrix multiply per block; users missing from the training data share one
+        popularity-based fallback list.
+        """
+        if not self.is_trained:
+            logger.warning("Collaborative filtering model not trained yet")
+            return {}
+        
+        try:
+            user_indices = self.user_registry.encode(user_ids)
+            known = user_indices >= 0
+            known_user_ids = [user_id for user_id, is_known in zip(user_ids, known) if is_known]
+            cold_start_user_ids = [user_id for user_id, is_known in zip(user_ids, known) if not is_known]
+            known_indices = user_indices[known]
+            
+            results = {}
+            
+            if cold_start_user_ids:
+                fallback = self._get_popularity_based_recommendations(count, exclude_events)
+                for user_id in cold_start_user_ids:
+                    results[user_id] = [rec.model_copy() for rec in fallback]
+            
+            if len(known_indices):
+                exclude_indices = self._encode_event_ids(exclude_events)
+                interaction_counts = np.diff(self.interaction_rows(known_indices).indptr)
+                block_size = max(1, settings.CF_BATCH_SCORING_SIZE)
+                
+                for start in range(0, len(known_indices), block_size):
+                    block = known_indices[start:start + block_size]
+                    top_indices, top_scores = self._score_users(block, count, exclude_indices)
+                    
+                    for row in range(len(block)):
+                        results[known_user_ids[start + row]] = self._build_recommendation_items(
+                            top_indices[row], top_scores[row],
+                            self._calculate_confidence(interaction_counts[start + row])
+                        )
+            
+            logger.info(f"Generated batched collaborative filtering recommendations for {len(results)} users "
+                       f"({len(cold_start_user_ids)} cold start)")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Failed to generate batched collaborative filtering recommendations: {e}")
+            return {}
+    
+    def _score_users(self, user_indices: np.ndarray, count: int,
+                     exclude_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Score every event for a block of users and select the top ``count`` per user
+        
+        Events the users already interacted with (taken from their CSR rows) and the
+        explicitly excluded events are masked to ``-inf`` before top-K selection, so
+        they sort behind every real candidate. Returns ``(event_indices, scores)``,
+        both of shape ``(len(user_indices), k)`` and ordered by descending score.
+        """
+        # Predicted ratings for the whole block in one matrix multiply
+        scores = self.user_factors[user_indices] @ self.item_factors.T
+        scores += self.global_bias + self.user_bias[user_indices][:, np.newaxis] + self.item_bias
+        
+        # Mask events each user has already interacted with
+        rows = self.interaction_rows(user_indices)
+        row_ids = np.repeat(np.arange(len(user_indices)), np.diff(rows.indptr))
+        scores[row_ids, rows.indices] = -np.inf
+        
+        # Mask specifically requested events
+        if len(exclude_indices):
+            scores[:, exclude_indices] = -np.inf
+        
+        return self._select_top_k(scores, count)
+    
+    def _score_user_approximate(self, user_idx: int, count: int,
+                                exclude_indices: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Rank events for one user through the item index
+        
+        Returns ``None`` when no index is built or when the probed candidates
+        cannot fill ``count`` slots after exclusions, so the caller can fall back
+        to exact scoring.
+        """
+        if self.item_index is None:
+            return None
+        
+        excluded = np.union1d(self.interaction_rows(np.array([user_idx])).indices, exclude_indices)
+        
+        # Over-fetch so the list is still full once excluded events are dropped
+        indices, scores = self.item_index.search(self.user_factors[user_idx], count + len(excluded))
+        keep = ~np.isin(indices, excluded)
+        indices, scores = indices[keep][:count], scores[keep][:count]
+        
+        if len(indices) < min(count, self.item_index.n_items - len(excluded)):
+            return None
+        
+        return indices, scores + self.global_bias + self.user_bias[user_idx]
+    
+    def interaction_rows(self, user_indices: np.ndarray) -> csr_matrix:
+        """Interaction-matrix rows of ``user_indices``, including the ratings folded in since training"""
+        rows = self.interaction_matrix[user_indices]
+        if self.interaction_delta.nnz:
+            rows = (rows + self.interaction_delta.rows(user_indices)).tocsr()
+        return rows
+    
+    def _merged_interactions(self) -> csr_matrix:
+        """The whole interaction matrix, including the ratings folded in since training"""
+        if self.interaction_delta.nnz:
+            return self.interaction_delta.merged_into(self.interaction_matrix)
+        return self.interaction_matrix
+    
+    def _build_item_index(self):
+        """Build the approximate item index used for single-user scoring"""
+        self.item_index = self._create_item_index(self.item_factors, self.item_bias)
+    
+    def _create_item_index(self, item_factors: np.ndarray,
+                           item_bias: np.ndarray) -> Optional[ItemFactorIndex]:
+        """Approximate index over the given item factors, or ``None`` for exact scoring"""
+        n_events = len(item_factors)
+        if n_events < settings.CF_ANN_MIN_EVENTS:
+            logger.info(f"Skipping item index for {n_events} events, exact scoring is used")
+            return None
+        
+        item_index = create_item_index(
+            settings.CF_ANN_INDEX,
+            n_lists=settings.CF_ANN_N_LISTS,
+            n_probe=settings.CF_ANN_N_PROBE,
+            kmeans_iterations=settings.CF_ANN_KMEANS_ITERATIONS,
+            train_sample=settings.CF_ANN_TRAIN_SAMPLE
+        )
+        if item_index is not None:
+            item_index.build(item_factors, item_bias)
+        
+        return item_index
+    
+    @staticmethod
+    def _select_top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row-wise top-K selection with argpartition, sorted by descending score"""
+        n_rows, n_cols = scores.shape
+        k = min(k, n_cols)
+        if k <= 0:
+            return np.empty((n_rows, 0), dtype=np.int64), np.empty((n_rows, 0), dtype=scores.dtype)
+        
+        if k < n_cols:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.tile(np.arange(n_cols), (n_rows, 1))
+        
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        
+        return (np.take_along_axis(candidates, order, axis=1),
+                np.take_along_axis(candidate_scores, order, axis=1))
+    
+    def _encode_event_ids(self, event_ids: Optional[List[UUID]]) -> np.ndarray:
+        """Map event ids to model indices, dropping events unknown to the model"""
+        if not event_ids:
+            return np.empty(0, dtype=np.int64)
+        
+        indices = self.event_registry.encode(event_ids)
+        return indices[indices >= 0]
+    
+    def _calculate_confidence(self, n_interactions: int) -> float:
+        """Calculate confidence based on user's interaction history"""
+        return min(0.9, 0.5 + (n_interactions / 100))
+    
+    def _build_recommendation_items(self, event_indices: np.ndarray, scores: np.ndarray,
+                                   confidence: float) -> List[RecommendationItem]:
+        """Turn ranked ``(event_idx, score)`` pairs into recommendation items"""
+        # Masked events sort last, so the first one ends the list
+        finite = np.isfinite(scores)
+        n_valid = len(scores) if finite.all() else int(np.argmin(finite))
+        event_ids = self.event_registry.decode(event_indices[:n_valid])
+        
+        recommendations = []
+        
+        for event_id, score in zip(event_ids, scores[:n_valid]):
+            recommendations.append(RecommendationItem(
+                event_id=event_id,
+                score=min(1.0, max(0.0, score / self.rating_scale)),  # Normalize to 0-1
+                algorithm=RecommendationAlgorithm.COLLABORATIVE_FILTERING,
+                confidence=confidence,
+                rank=len(recommendations) + 1,
+                reasons=[f"Users with similar preferences also liked this event"],
+                title="",  # Will be filled by the calling service
+                category="",
+                tags=[],
+                start_time=None,
+                is_virtual=False,
+                organizer_name=""
+            ))
+        
+        return recommendations
+    
     async def get_similar_users(self, user_id: UUID, count: int = 10) -> List[Tuple[UUID, float]]:
         """Find users similar to the given user"""
         if not self.is_trained:
             return []
         
         try:
-            user_id_str = str(user_id)
-            if user_id_str not in self.user_encoder:
+            user_idx = self.user_registry.encode_one(user_id)
+            if user_idx is None:
                 return []
             
-            user_idx = self.user_encoder[user_id_str]
-            user_vector = self.user_factors[user_idx].reshape(1, -1)
-            
-            # Calculate similarities with all other users
-            similarities = cosine_similarity(user_vector, self.user_factors)[0]
-            
-            # Get top similar users (excluding the user themselves)
-            similar_indices = similarities.argsort()[::-1][1:count+1]
+            # Precomputed neighbours cover the common case; larger requests and users
+            # folded in since the last table refresh scan every user
+            stale = self.stale_neighbour_users
+            position = np.searchsorted(stale, user_idx)
+            is_stale = position < len(stale) and stale[position] == user_idx
+            if self.user_neighbours is not None and count <= self.user_neighbours.k and not is_stale:
+                similar_indices, similarities = self.user_neighbours.neighbours(user_idx, count)
+            else:
+                similar_indices, similarities = self._scan_similar_users(user_idx, count)
             
             similar_users = []
-            for idx in similar_indices:
-                similar_user_id = UUID(self.user_decoder[idx])
-                similarity_score = similarities[idx]
-                similar_users.append((similar_user_id, similarity_score))
+            for similar_user_id, similarity_score in zip(self.user_registry.decode(similar_indices), similarities):
+                similar_users.append((similar_user_id, float(similarity_score)))
             
             return similar_users
             
@@ -261,42 +732,56 @@ class CollaborativeFilteringRecommender:
             logger.error(f"Failed to find similar users: {e}")
             return []
     
-    async def _get_popularity_based_recommendations(self, count: int, 
-                                                  exclude_events: List[UUID] = None) -> List[RecommendationItem]:
-        """Fallback to popularity-based recommendations for cold start users"""
+    def _scan_similar_users(self, user_idx: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Most similar users by cosine similarity, scanning every user"""
+        user_vector = self.user_factors[user_idx].reshape(1, -1)
+        similarities = cosine_similarity(user_vector, self.user_factors)[0]
+        similarities[user_idx] = -np.inf
+        
+        top_indices, top_scores = self._select_top_k(similarities[np.newaxis, :], count)
+        valid = np.isfinite(top_scores[0])
+        return top_indices[0][valid], top_scores[0][valid]
+    
+    def _create_neighbour_table(self) -> NeighbourTable:
+        return NeighbourTable(
+            k=settings.CF_SIMILAR_USERS_K,
+            block_size=settings.CF_NEIGHBOUR_BLOCK_SIZE,
+            n_workers=settings.PARALLEL_WORKERS
+        )
+    
+    def _get_popularity_based_recommendations(self, count: int,
+                                            exclude_events: List[UUID] = None) -> List[RecommendationItem]:
+        """Fallback to popularity-based recommendations for cold start users
+        
+        Served from the precomputed popular-event list; only requests that
+        exclude enough of it to run short rank every event.
+        """
         try:
-            if self.interaction_matrix is None:
+            if self.event_popularity is None:
                 return []
             
-            # Calculate popularity scores (number of interactions per event)
-            event_popularity = np.array(self.interaction_matrix.sum(axis=0)).flatten()
-            
-            # Get top popular events
-            popular_indices = event_popularity.argsort()[::-1]
+            event_popularity = self.event_popularity
+            popular_indices = self.popular_events
+            exclude_indices = set(self._encode_event_ids(exclude_events).tolist())
+            if count + len(exclude_indices) > len(popular_indices):
+                popular_indices = self._rank_popular(event_popularity, limit=len(event_popularity))
             
-            exclude_indices = set()
-            if exclude_events:
-                for event_id in exclude_events:
-                    event_id_str = str(event_id)
-                    if event_id_str in self.event_encoder:
-                        exclude_indices.add(self.event_encoder[event_id_str])
+            # Normalize by the most popular event
+            max_popularity = event_popularity[popular_indices[0]] if len(popular_indices) else 1
+            max_popularity = max_popularity if max_popularity > 0 else 1
             
             recommendations = []
             rank = 1
             
-            for event_idx in popular_indices:
+            for event_idx in popular_indices.tolist():
                 if event_idx in exclude_indices:
                     continue
                 
                 if len(recommendations) >= count:
                     break
                 
-                event_id = UUID(self.event_decoder[event_idx])
-                popularity_score = event_popularity[event_idx]
-                
-                # Normalize popularity score
-                max_popularity = event_popularity.max() if event_popularity.max() > 0 else 1
-                normalized_score = popularity_score / max_popularity
+                event_id = self.event_registry.decode_one(event_idx)
+                normalized_score = float(event_popularity[event_idx] / max_popularity)
                 
                 recommendations.append(RecommendationItem(
                     event_id=event_id,
@@ -321,22 +806,30 @@ class CollaborativeFilteringRecommender:
             logger.error(f"Failed to generate popularity-based recommendations: {e}")
             return []
     
+    @staticmethod
+    def _column_totals(interaction_matrix: csr_matrix) -> np.ndarray:
+        """Summed ratings per event"""
+        return np.bincount(interaction_matrix.indices, weights=interaction_matrix.data,
+                           minlength=interaction_matrix.shape[1])
+    
+    @staticmethod
+    def _rank_popular(event_popularity: np.ndarray, candidates: Optional[np.ndarray] = None,
+                      limit: Optional[int] = None) -> np.ndarray:
+        """The ``limit`` (default ``POPULARITY_TOP_N``) most popular of ``candidates`` (default all)"""
+        candidates = np.arange(len(event_popularity)) if candidates is None else np.asarray(candidates)
+        order = np.lexsort((candidates, -event_popularity[candidates]))
+        return candidates[order[:limit or settings.POPULARITY_TOP_N]].astype(np.int64)
+    
     async def get_event_similarity(self, event_id1: UUID, event_id2: UUID) -> float:
         """Calculate similarity between two events based on user interactions"""
         if not self.is_trained:
             return 0.0
         
         try:
-            event_id1_str = str(event_id1)
-            event_id2_str = str(event_id2)
-            
-            if (event_id1_str not in self.event_encoder or 
-                event_id2_str not in self.event_encoder):
+            event_idx1, event_idx2 = self.event_registry.encode([event_id1, event_id2])
+            if event_idx1 < 0 or event_idx2 < 0:
                 return 0.0
             
-            event_idx1 = self.event_encoder[event_id1_str]
-            event_idx2 = self.event_encoder[event_id2_str]
-            
             # Get event vectors from item factors
             event_vector1 = self.item_factors[event_idx1].reshape(1, -1)
             event_vector2 = self.item_factors[event_idx2].reshape(1, -1)
@@ -351,58 +844,93 @@ class CollaborativeFilteringRecommender:
             return 0.0
     
     async def _save_model(self):
-        """Save the trained model to disk"""
+        """Publish the trained model as a new artifact version"""
         try:
-            model_dir = settings.MODEL_CACHE_DIR
-            os.makedirs(model_dir, exist_ok=True)
-            
-            model_data = {
-                'user_encoder': self.user_encoder,
-                'event_encoder': self.event_encoder,
-                'user_decoder': self.user_decoder,
-                'event_decoder': self.event_decoder,
+            interaction_matrix = self._merged_interactions()
+            arrays = {
+                'user_ids': self.user_registry.ids,
+                'event_ids': self.event_registry.ids,
                 'user_factors': self.user_factors,
                 'item_factors': self.item_factors,
                 'user_bias': self.user_bias,
                 'item_bias': self.item_bias,
-                'global_bias': self.global_bias,
-                'model_version': self.model_version
+                'interaction_data': interaction_matrix.data,
+                'interaction_indices': interaction_matrix.indices,
+                'interaction_indptr': interaction_matrix.indptr,
+                'user_neighbour_indices': self.user_neighbours.indices,
+                'user_neighbour_scores': self.user_neighbours.scores
+            }
+            metadata = {
+                'global_bias': float(self.global_bias),
+                'trainer': self.trainer,
+                'model_version': self.model_version,
+                'interactions_as_of': self.interactions_as_of
             }
             
-            model_path = os.path.join(model_dir, 'collaborative_filtering_model.pkl')
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data, f)
-            
-            logger.info(f"Collaborative filtering model saved to {model_path}")
+            self.artifact_version = self.artifact_store.save(arrays, metadata)
+            logger.info(f"Collaborative filtering model saved as version {self.artifact_version}")
             
         except Exception as e:
             logger.error(f"Failed to save model: {e}")
     
     async def load_model(self):
-        """Load a previously trained model from disk"""
+        """Load the published model version, memory-mapping its arrays
+        
+        Everything is built before any attribute is replaced, so requests being
+        served while a newer version is swapped in see either the old model or
+        the new one, never a mix.
+        """
+        return self.load()
+    
+    def load(self) -> bool:
+        """Synchronous ``load_model``, for loader threads"""
         try:
-            model_path = os.path.join(settings.MODEL_CACHE_DIR, 'collaborative_filtering_model.pkl')
-            
-            if not os.path.exists(model_path):
+            artifact = self.artifact_store.load()
+            if artifact is None:
                 logger.info("No saved collaborative filtering model found")
                 return False
             
-            with open(model_path, 'rb') as f:
-                model_data = pickle.load(f)
-            
-            self.user_encoder = model_data['user_encoder']
-            self.event_encoder = model_data['event_encoder']
-            self.user_decoder = model_data['user_decoder']
-            self.event_decoder = model_data['event_decoder']
-            self.user_factors = model_data['user_factors']
-            self.item_factors = model_data['item_factors']
-            self.user_bias = model_data['user_bias']
-            self.item_bias = model_data['item_bias']
-            self.global_bias = model_data['global_bias']
-            self.model_version = model_data.get('model_version', '1.0.0')
+            arrays = artifact.arrays
+            user_registry = IdRegistry(arrays['user_ids'])
+            event_registry = IdRegistry(arrays['event_ids'])
+            interaction_matrix = csr_matrix(
+                (arrays['interaction_data'], arrays['interaction_indices'], arrays['interaction_indptr']),
+                shape=(len(user_registry), len(event_registry))
+            )
+            event_popularity = self._column_totals(interaction_matrix)
+            trainer = artifact.metadata.get('trainer', 'nmf')
+            item_index = self._create_item_index(arrays['item_factors'], arrays['item_bias'])
+            
+            user_neighbours = self._create_neighbour_table()
+            if 'user_neighbour_indices' in arrays:
+                user_neighbours.load(arrays['user_neighbour_indices'], arrays['user_neighbour_scores'])
+            else:
+                user_neighbours.build(arrays['user_factors'])
+            
+            self.user_registry = user_registry
+            self.event_registry = event_registry
+            self.interaction_matrix = interaction_matrix
+            self.interaction_delta = InteractionDelta()
+            self.event_popularity = event_popularity
+            self.popular_events = self._rank_popular(event_popularity)
+            self.user_factors = arrays['user_factors']
+            self.item_factors = arrays['item_factors']
+            self.user_bias = arrays['user_bias']
+            self.item_bias = arrays['item_bias']
+            self.global_bias = artifact.metadata.get('global_bias', 0.0)
+            self.model_version = artifact.metadata.get('model_version', '1.0.0')
+            self.interactions_as_of = artifact.metadata.get('interactions_as_of')
+            self.trainer = trainer
+            self.rating_scale = 1.0 if trainer == "als" else float(settings.CF_MAX_RATING)
+            self.item_index = item_index
+            self.user_neighbours = user_neighbours
+            self.stale_neighbour_users = np.zeros(0, dtype=np.int64)
+            self._user_gram = None
+            self._item_gram = None
+            self.artifact_version = artifact.version
             
             self.is_trained = True
-            logger.info("Collaborative filtering model loaded successfully")
+            logger.info(f"Collaborative filtering model version {artifact.version} loaded successfully")
             return True
             
         except Exception as e:
@@ -417,8 +945,11 @@ class CollaborativeFilteringRecommender:
         return {
             "trained": True,
             "model_version": self.model_version,
-            "n_users": len(self.user_encoder),
-            "n_events": len(self.event_encoder),
+            "n_users": len(self.user_registry),
+            "n_events": len(self.event_registry),
             "n_factors": settings.CF_N_FACTORS,
-            "global_bias": float(self.global_bias)
+            "trainer": self.trainer,
+            "global_bias": float(self.global_bias),
+            "artifact_version": self.artifact_version,
+            "item_index": self.item_index.name if self.item_index is not None else "exact"
         }
\ No newline at end of file
@@ -1,34 +1,71 @@
 """Content-based filtering recommendation algorithm"""
+import hashlib
+import json
 import logging
+import time
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, Iterator, List, Tuple, Optional, Any
 from uuid import UUID
 import asyncio
+import copy
+import itertools
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
-import pickle
-import os
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 
 from app.config import get_settings
 from app.models.recommendation import RecommendationItem, RecommendationAlgorithm
+from app.algorithms.candidates import CandidateIndex
+from app.algorithms.content_features import EventFeatureStore
+from app.algorithms.embedding_service import EmbeddingService, get_embedding_service
+from app.algorithms.embedding_store import EmbeddingStore
+from app.algorithms.event_data import event_frame, frame_features, load_event_pages
+from app.algorithms.geo_index import GeoGridIndex
+from app.algorithms.neighbours import NeighbourTable, normalize_rows
+from app.utils.id_registry import IdRegistry
+from app.utils.lru import LRUCache
+from app.utils.model_artifacts import ModelArtifactStore
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+def _content_hash(features: Dict[str, Any]) -> str:
+    """Stable digest of an event's extracted features, combined text included"""
+    encoded = json.dumps(
+        features, sort_keys=True,
+        default=lambda value: value.item() if isinstance(value, np.generic) else str(value)
+    ).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+# Catalog generations are unique across instances, copies included
+_catalog_generations = itertools.count()
+
+
 class ContentBasedRecommender:
     """Content-based filtering using event features and embeddings"""
     
     def __init__(self):
         self.text_vectorizer = None
-        self.sentence_embedder = None
-        self.event_features = {}
-        self.event_embeddings = {}
+        self.embedding_service: Optional[EmbeddingService] = None
+        self.event_registry = IdRegistry()
+        self.event_features: List[Dict[str, Any]] = []
+        self.content_hashes: List[str] = []
+        self.event_embeddings: Optional[EmbeddingStore] = None
+        self.feature_store: Optional[EventFeatureStore] = None
+        self.event_neighbours: Optional[NeighbourTable] = None
+        self.candidate_index: Optional[CandidateIndex] = None
+        self.geo_index: Optional[GeoGridIndex] = None
+        self.preference_cache = LRUCache(settings.CONTENT_PROFILE_CACHE_SIZE)
+        # Changes whenever event rows or embeddings do; part of every preference cache key
+        self.catalog_generation = next(_catalog_generations)
         self.category_encoder = {}
         self.tag_vocabulary = set()
+        self.artifact_store = ModelArtifactStore("content_based")
+        self.artifact_version = None
+        # Epoch time the catalog was read from the database; changes after it are caught up on load
+        self.catalog_as_of: Optional[float] = None
         self.is_trained = False
         self.model_version = "1.0.0"
         
@@ -37,17 +74,7 @@ class ContentBasedRecommender:
         try:
             logger.info("Initializing content-based recommender...")
             
-            # Initialize TF-IDF vectorizer for text features
-            self.text_vectorizer = TfidfVectorizer(
-                max_features=5000,
-                stop_words='english',
-                ngram_range=(1, 2),
-                min_df=2,
-                max_df=0.8
-            )
-            
-            # Initialize sentence transformer for semantic embeddings
-            self.sentence_embedder = SentenceTransformer(settings.EMBEDDING_MODEL)
+            self.setup_encoders()
             
             # Try to load existing model
             await self.load_model()
@@ -58,164 +85,133 @@ class ContentBasedRecommender:
             logger.error(f"Failed to initialize content-based recommender: {e}")
             raise
     
-    async def train(self, events_data: List[Dict[str, Any]]) -> None:
-        """Train the content-based model with event data"""
+    def setup_encoders(self):
+        """Create the text encoders without loading a published model, e.g. to train from scratch"""
+        # Initialize TF-IDF vectorizer for text features
+        self.text_vectorizer = TfidfVectorizer(
+            max_features=5000,
+            stop_words='english',
+            ngram_range=(1, 2),
+            min_df=2,
+            max_df=0.8
+        )
+        
+        # Semantic embeddings come from the shared embedding worker pool
+        self.embedding_service = get_embedding_service()
+    
+    async def train(self, events_data: List[Dict[str, Any]], save: bool = True) -> None:
+        """Train the content-based model with event data; with ``save`` the model is published"""
         if not events_data:
             logger.warning("No events data provided for training")
             return
         
         logger.info(f"Training content-based model with {len(events_data)} events")
-        
-        try:
-            # Convert to DataFrame for easier processing
-            df = pd.DataFrame(events_data)
-            
-            # Process event features
-            await self._process_event_features(df)
-            
-            # Create text embeddings
-            await self._create_text_embeddings(df)
-            
-            # Build category encoder
-            self._build_category_encoder(df)
-            
-            # Build tag vocabulary
-            self._build_tag_vocabulary(df)
-            
-            self.is_trained = True
-            logger.info("Content-based model trained successfully")
-            
-            # Save model
-            await self._save_model()
-            
-        except Exception as e:
-            logger.error(f"Failed to train content-based model: {e}")
-            raise
+        page_size = settings.CONTENT_TRAINING_PAGE_SIZE
+        await self._train_from_frames(
+            (event_frame(events_data[start:start + page_size]) for start in range(0, len(events_data), page_size)),
+            save=save
+        )
     
-    async def _process_event_features(self, df: pd.DataFrame):
-        """Extract and process event features"""
-        try:
-            self.event_features = {}
-            
-            for idx, event in df.iterrows():
-                event_id = str(event['id'])
-                
-                # Combine text content
-                text_content = self._combine_text_content(event)
-                
-                # Extract features
-                features = {
-                    'title': event.get('title', ''),
-                    'description': event.get('description', ''),
-                    'short_description': event.get('short_description', ''),
-                    'category': event.get('category', ''),
-                    'tags': event.get('tags', []),
-                    'organizer_name': event.get('organizer_name', ''),
-                    'venue_name': event.get('venue_name', ''),
-                    'is_virtual': event.get('is_virtual', False),
-                    'price': event.get('price', 0.0),
-                    'text_content': text_content,
-                    'start_time': event.get('start_time'),
-                    'location': event.get('location', {}),
-                    'images_count': len(event.get('images', [])),
-                    'curation_score': event.get('curation_score', 0.5)
-                }
-                
-                self.event_features[event_id] = features
-            
-            logger.info(f"Processed features for {len(self.event_features)} events")
-            
-        except Exception as e:
-            logger.error(f"Failed to process event features: {e}")
-            raise
+    async def train_from_database(self) -> None:
+        """Train on the published events in Postgres, read in pages"""
+        logger.info("Training content-based model from the events table")
+        await self._train_from_frames(load_event_pages(), catalog_as_of=time.time())
     
-    async def _create_text_embeddings(self, df: pd.DataFrame):
-        """Create semantic embeddings for event text content"""
+    async def _train_from_frames(self, frames: Iterator[pd.DataFrame], catalog_as_of: Optional[float] = None,
+                                 save: bool = True) -> None:
+        """Featurise and embed the catalog one normalised frame at a time
+        
+        The next frame is read on a worker thread while the current one is
+        embedded, and only the compact per-chunk columns and embeddings are
+        kept, so memory beyond the model itself is bounded by the chunk size.
+        """
         try:
-            texts = []
-            event_ids = []
-            
-            for idx, event in df.iterrows():
-                event_id = str(event['id'])
-                text_content = self._combine_text_content(event)
+            # Events are addressed by dense index everywhere below
+            event_registry = IdRegistry()
+            event_features: List[Dict[str, Any]] = []
+            content_hashes: List[str] = []
+            categories: Dict[str, int] = {}
+            tags: Dict[str, int] = {}
+            column_chunks = []
+            embedding_chunks = []
+            
+            next_frame = asyncio.create_task(asyncio.to_thread(next, frames, None))
+            while True:
+                frame = await next_frame
+                if frame is None:
+                    break
+                next_frame = asyncio.create_task(asyncio.to_thread(next, frames, None))
                 
-                texts.append(text_content)
-                event_ids.append(event_id)
-            
-            # Create embeddings in batches
-            batch_size = 32
-            embeddings = []
-            
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i + batch_size]
-                batch_embeddings = self.sentence_embedder.encode(batch_texts)
-                embeddings.extend(batch_embeddings)
+                # Keep the first occurrence of each event
+                n_known = len(event_registry)
+                rows = event_registry.encode_or_add(frame['id'])
+                unique_rows, positions = np.unique(rows, return_index=True)
+                frame = frame.iloc[positions[unique_rows >= n_known]].reset_index(drop=True)
+                if frame.empty:
+                    continue
+                
+                chunk_features = frame_features(frame)
+                event_features.extend(chunk_features)
+                content_hashes.extend(_content_hash(features) for features in chunk_features)
+                column_chunks.append(EventFeatureStore.encode_frame(frame, categories, tags))
+                embedding_chunks.append(await self.embedding_service.embed_many(
+                    [features['text_content'] for features in chunk_features]
+                ))
+                logger.info(f"Featurised and embedded {len(event_features)} events")
+            
+            if not event_features:
+                logger.warning("No events found for training")
+                return
+            
+            self.event_registry = event_registry
+            self.event_features = event_features
+            self.content_hashes = content_hashes
+            self.feature_store = EventFeatureStore.concat(column_chunks, categories, tags)
+            self.candidate_index = self._create_candidate_index(self.feature_store)
+            self.geo_index = self._create_geo_index(self.feature_store)
+            self.event_embeddings = EmbeddingStore.quantize(np.concatenate(embedding_chunks),
+                                                            settings.CONTENT_EMBEDDING_DTYPE)
+            self.category_encoder = dict(categories)
+            self.tag_vocabulary = set(tags)
+            self.catalog_as_of = catalog_as_of
+            self.catalog_generation = next(_catalog_generations)
+            self.preference_cache.clear()
+            logger.info(f"Created {self.event_embeddings.dtype} embeddings for {len(self.event_embeddings)} events "
+                       f"({self.event_embeddings.nbytes / 2**20:.1f} MiB)")
+            
+            # Precompute similar events
+            self.event_neighbours = self._create_neighbour_table()
+            self.event_neighbours.build_with(len(self.event_features), self._event_similarities)
             
-            # Store embeddings
-            self.event_embeddings = {}
-            for event_id, embedding in zip(event_ids, embeddings):
-                self.event_embeddings[event_id] = embedding
+            self.is_trained = True
+            logger.info("Content-based model trained successfully")
             
-            logger.info(f"Created embeddings for {len(self.event_embeddings)} events")
+            if save:
+                await self._save_model()
             
         except Exception as e:
-            logger.error(f"Failed to create text embeddings: {e}")
+            logger.error(f"Failed to train content-based model: {e}")
             raise
     
-    def _build_category_encoder(self, df: pd.DataFrame):
-        """Build category encoder for categorical features"""
-        categories = df['category'].dropna().unique()
-        self.category_encoder = {cat: idx for idx, cat in enumerate(categories)}
-        logger.info(f"Built category encoder with {len(categories)} categories")
-    
-    def _build_tag_vocabulary(self, df: pd.DataFrame):
-        """Build tag vocabulary"""
-        all_tags = []
-        for tags in df['tags'].dropna():
-            if isinstance(tags, list):
-                all_tags.extend(tags)
-        
-        self.tag_vocabulary = set(all_tags)
-        logger.info(f"Built tag vocabulary with {len(self.tag_vocabulary)} tags")
-    
-    def _combine_text_content(self, event: Dict[str, Any]) -> str:
-        """Combine all text content for an event"""
-        content_parts = []
-        
-        # Title (weighted more heavily)
-        if event.get('title'):
-            content_parts.extend([event['title']] * 3)
-        
-        # Description
-        if event.get('description'):
-            content_parts.append(event['description'])
-        
-        # Short description
-        if event.get('short_description'):
-            content_parts.append(event['short_description'])
-        
-        # Category (weighted)
-        if event.get('category'):
-            content_parts.extend([event['category']] * 2)
-        
-        # Tags (weighted)
-        if event.get('tags') and isinstance(event['tags'], list):
-            content_parts.extend(event['tags'] * 2)
-        
-        # Organizer name
-        if event.get('organizer_name'):
-            content_parts.append(event['organizer_name'])
-        
-        # Venue name
-        if event.get('venue_name'):
-            content_parts.append(event['venue_name'])
-        
-        return ' '.join(content_parts)
-    
     async def get_recommendations(self, user_id: UUID, user_preferences: Dict[str, Any],
                                 user_interactions: List[Dict[str, Any]], count: int = 20,
-                                exclude_events: List[UUID] = None) -> List[RecommendationItem]:
-        """Generate content-based recommendations for a user"""
+                                exclude_events: List[UUID] = None,
+                                include_past_events: bool = False,
+                                location: Optional[Dict[str, float]] = None) -> List[RecommendationItem]:
+        """Generate content-based recommendations for a user
+        
+        With the user's ``location`` (``latitude``/``longitude``), nearby
+        events become candidates and location scores decay with distance.
+        """
+        return self.recommend(user_id, user_preferences, user_interactions, count, exclude_events,
+                              include_past_events, location)
+    
+    def recommend(self, user_id: UUID, user_preferences: Dict[str, Any],
+                  user_interactions: List[Dict[str, Any]], count: int = 20,
+                  exclude_events: List[UUID] = None,
+                  include_past_events: bool = False,
+                  location: Optional[Dict[str, float]] = None) -> List[RecommendationItem]:
+        """Synchronous ``get_recommendations``, for scoring threads"""
         if not self.is_trained:
             logger.warning("Content-based model not trained yet")
             return []
@@ -225,18 +221,27 @@ class ContentBasedRecommender:
             
             # Build user profile from interactions and preferences
             user_profile = self._build_user_profile(user_preferences, user_interactions)
+            user_profile['preference_embedding'] = self._get_preference_embedding(user_id, user_profile)
+            if location:
+                user_profile['location'] = (location['latitude'], location['longitude'])
+            
+            # Score the candidate events (every event for small catalogs)
+            candidates = self._get_candidates(user_profile, count + len(exclude_events or []))
+            event_scores = self._calculate_event_scores(user_profile, exclude_events, candidates,
+                                                        include_past_events)
             
-            # Calculate event scores
-            event_scores = await self._calculate_event_scores(user_profile, exclude_events)
+            # Sort by score and take top events; excluded events score -inf
+            top = np.argsort(-event_scores, kind='stable')[:count]
+            top = top[event_scores[top] > -np.inf]
+            top_events = top if candidates is None else candidates[top]
             
-            # Sort by score and take top events
-            sorted_events = sorted(event_scores.items(), key=lambda x: x[1], reverse=True)
-            top_events = sorted_events[:count]
+            top_event_ids = self.event_registry.decode(top_events)
             
             # Create recommendation items
             recommendations = []
-            for rank, (event_id, score) in enumerate(top_events, 1):
-                event_features = self.event_features[event_id]
+            for rank, (event_id, event_idx, score) in enumerate(
+                    zip(top_event_ids, top_events.tolist(), event_scores[top].tolist()), 1):
+                event_features = self.event_features[event_idx]
                 
                 # Generate explanation
                 reasons = self._generate_explanation(user_profile, event_features)
@@ -245,7 +250,7 @@ class ContentBasedRecommender:
                 confidence = self._calculate_confidence(user_profile, event_features)
                 
                 recommendations.append(RecommendationItem(
-                    event_id=UUID(event_id),
+                    event_id=event_id,
                     score=min(1.0, max(0.0, score)),
                     algorithm=RecommendationAlgorithm.CONTENT_BASED,
                     confidence=confidence,
@@ -278,9 +283,11 @@ class ContentBasedRecommender:
             'preferred_locations': set(),
             'price_preferences': {'min': 0, 'max': float('inf')},
             'virtual_preference': 0.5,  # 0 = prefer in-person, 1 = prefer virtual
-            'text_preferences': [],
+            'history_events': [],
+            'history_weights': [],
             'organizer_preferences': set(),
-            'venue_preferences': set()
+            'venue_preferences': set(),
+            'location': None
         }
         
         # Extract from explicit preferences
@@ -295,10 +302,10 @@ class ContentBasedRecommender:
                 profile['price_preferences']['max'] = preferences['price_range_max']
         
         # Learn from interaction history
-        for interaction in interactions:
-            event_id = str(interaction['event_id'])
-            if event_id in self.event_features:
-                event = self.event_features[event_id]
+        event_indices = self.event_registry.encode([interaction['event_id'] for interaction in interactions])
+        for interaction, event_idx in zip(interactions, event_indices):
+            if event_idx >= 0:
+                event = self.event_features[event_idx]
                 
                 # Weight interactions by type
                 weight = self._get_interaction_weight(interaction['interaction_type'])
@@ -322,8 +329,9 @@ class ContentBasedRecommender:
                 else:
                     profile['virtual_preference'] = max(0.0, profile['virtual_preference'] - 0.1 * weight)
                 
-                # Collect text for content similarity
-                profile['text_preferences'].append(event['text_content'])
+                # Collect history for content similarity
+                profile['history_events'].append(int(event_idx))
+                profile['history_weights'].append(weight)
         
         return profile
     
@@ -341,184 +349,116 @@ class ContentBasedRecommender:
         }
         return weights.get(interaction_type, 0.3)
     
-    async def _calculate_event_scores(self, user_profile: Dict[str, Any], 
-                                    exclude_events: List[UUID] = None) -> Dict[str, float]:
-        """Calculate scores for all events based on user profile"""
-        scores = {}
-        exclude_event_ids = {str(event_id) for event_id in (exclude_events or [])}
-        
-        for event_id, event_features in self.event_features.items():
-            if event_id in exclude_event_ids:
-                continue
-            
-            score = 0.0
-            
-            # Category similarity
-            category_score = self._calculate_category_similarity(user_profile, event_features)
-            score += category_score * settings.CATEGORY_WEIGHT
-            
-            # Tag similarity
-            tag_score = self._calculate_tag_similarity(user_profile, event_features)
-            score += tag_score * settings.TAG_WEIGHT
-            
-            # Text/semantic similarity
-            text_score = self._calculate_text_similarity(user_profile, event_features)
-            score += text_score * settings.DESCRIPTION_WEIGHT
-            
-            # Location preference (if applicable)
-            location_score = self._calculate_location_preference(user_profile, event_features)
-            score += location_score * settings.LOCATION_WEIGHT
-            
-            # Price preference
-            price_score = self._calculate_price_preference(user_profile, event_features)
-            score *= price_score  # Multiplicative penalty for price mismatch
-            
-            # Virtual preference
-            virtual_score = self._calculate_virtual_preference(user_profile, event_features)
-            score *= virtual_score
-            
-            # Boost recent events
-            time_score = self._calculate_time_relevance(event_features)
-            score *= time_score
-            
-            # Curation score boost
-            curation_boost = event_features.get('curation_score', 0.5)
-            score *= (0.5 + 0.5 * curation_boost)
-            
-            scores[event_id] = score
-        
-        return scores
-    
-    def _calculate_category_similarity(self, user_profile: Dict[str, Any], 
-                                     event_features: Dict[str, Any]) -> float:
-        """Calculate category-based similarity score"""
-        if not user_profile['preferred_categories']:
-            return 0.5  # Neutral score if no preferences
-        
-        if event_features['category'] in user_profile['preferred_categories']:
-            return 1.0
-        
-        # Could add category hierarchy similarity here
-        return 0.1
+    def _get_candidates(self, user_profile: Dict[str, Any], min_candidates: int) -> Optional[np.ndarray]:
+        """Event indices worth scoring for the profile; ``None`` to score the whole catalog
+        
+        Candidates come from the inverted indexes, the precomputed similar
+        events of the most recent history events, the events nearest the
+        user's location and the backfill. Catalogs
+        below ``CONTENT_CANDIDATE_MIN_CATALOG`` events, or profiles yielding
+        fewer than ``min_candidates`` events, are scored in full.
+        """
+        if self.candidate_index is None or len(self.event_features) < settings.CONTENT_CANDIDATE_MIN_CATALOG:
+            return None
+        
+        history = np.asarray(user_profile['history_events'][-settings.CONTENT_CANDIDATE_HISTORY_EVENTS:],
+                             dtype=np.int64)
+        similar = self.event_neighbours.indices[history].ravel()
+        extra_rows = [history, similar[similar >= 0]]
+        if user_profile['location'] is not None:
+            nearby, _ = self.geo_index.nearest(*user_profile['location'], settings.LOCATION_CANDIDATES,
+                                               settings.LOCATION_SEARCH_RADIUS_KM)
+            extra_rows.append(nearby)
+        
+        candidates = self.candidate_index.candidates(user_profile, extra_rows)
+        
+        return candidates if len(candidates) >= min_candidates else None
     
-    def _calculate_tag_similarity(self, user_profile: Dict[str, Any], 
-                                event_features: Dict[str, Any]) -> float:
-        """Calculate tag-based similarity score"""
-        if not user_profile['preferred_tags'] or not event_features['tags']:
-            return 0.5
-        
-        event_tags = set(event_features['tags'])
-        intersection = user_profile['preferred_tags'].intersection(event_tags)
-        union = user_profile['preferred_tags'].union(event_tags)
-        
-        if not union:
-            return 0.5
-        
-        return len(intersection) / len(union)
-    
-    def _calculate_text_similarity(self, user_profile: Dict[str, Any], 
-                                 event_features: Dict[str, Any]) -> float:
-        """Calculate semantic text similarity"""
-        if not user_profile['text_preferences']:
-            return 0.5
-        
-        event_id = None
-        for eid, features in self.event_features.items():
-            if features == event_features:
-                event_id = eid
-                break
-        
-        if event_id is None or event_id not in self.event_embeddings:
-            return 0.5
-        
-        event_embedding = self.event_embeddings[event_id]
-        
-        # Calculate similarity with user's preferred content
-        max_similarity = 0.0
-        for preferred_text in user_profile['text_preferences']:
-            # Get embedding for preferred text
-            preferred_embedding = self.sentence_embedder.encode([preferred_text])[0]
-            
-            # Calculate cosine similarity
-            similarity = cosine_similarity(
-                [event_embedding], [preferred_embedding]
-            )[0][0]
-            
-            max_similarity = max(max_similarity, similarity)
+    def _calculate_event_scores(self, user_profile: Dict[str, Any],
+                                exclude_events: List[UUID] = None,
+                                rows: Optional[np.ndarray] = None,
+                                include_past_events: bool = False) -> np.ndarray:
+        """Score events ``rows`` (every event if ``None``) for the user profile, in that order
+        
+        Category, tag, text and location similarity are blended with their
+        configured weights, then scaled by price, virtual-format, time and
+        curation multipliers. Excluded events, and events that have ended
+        unless ``include_past_events`` is set, score ``-inf``.
+        """
+        features = self.feature_store if rows is None else self.feature_store.take(rows)
+        
+        scores = (
+            features.category_scores(user_profile['preferred_categories']) * settings.CATEGORY_WEIGHT +
+            features.tag_scores(user_profile['preferred_tags']) * settings.TAG_WEIGHT +
+            self._calculate_text_scores(user_profile, rows) * settings.DESCRIPTION_WEIGHT +
+            features.location_scores(user_profile['preferred_locations'], user_profile['location'],
+                                     settings.LOCATION_DECAY_KM) * settings.LOCATION_WEIGHT
+        )
+        
+        # Multiplicative penalties for price and format mismatch, boosts for timing and curation
+        scores *= features.price_scores(user_profile['price_preferences']['min'],
+                                        user_profile['price_preferences']['max'])
+        scores *= features.virtual_scores(user_profile['virtual_preference'])
+        scores *= features.time_relevance()
+        scores *= features.curation_multipliers
+        
+        if not include_past_events:
+            scores[features.has_ended()] = -np.inf
+        
+        exclude_indices = self.event_registry.encode(exclude_events or [])
+        exclude_indices = exclude_indices[exclude_indices >= 0]
+        if rows is None:
+            scores[exclude_indices] = -np.inf
+        else:
+            scores[np.isin(rows, exclude_indices)] = -np.inf
         
-        return max_similarity
+        return scores
     
-    def _calculate_location_preference(self, user_profile: Dict[str, Any], 
-                                     event_features: Dict[str, Any]) -> float:
-        """Calculate location-based preference score"""
-        if not user_profile['preferred_locations']:
-            return 1.0  # No penalty if no location preferences
-        
-        if event_features['is_virtual']:
-            # Virtual events match if user prefers online events
-            return 1.0 if 'online' in user_profile['preferred_locations'] else 0.8
-        
-        if event_features['venue_name']:
-            venue_location = event_features['venue_name'].lower()
-            for preferred_loc in user_profile['preferred_locations']:
-                if preferred_loc.lower() in venue_location:
-                    return 1.0
+    def _calculate_text_scores(self, user_profile: Dict[str, Any], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosine similarity of events ``rows`` (every event if ``None``) to the user's preference embedding"""
+        preference_embedding = user_profile.get('preference_embedding')
+        if preference_embedding is None:
+            return np.full(len(self.event_features) if rows is None else len(rows), 0.5)
+        
+        if rows is None:
+            norms = self.event_embeddings.norms
+            similarities = self.event_embeddings.dot(preference_embedding)
+        else:
+            norms = self.event_embeddings.norms[rows]
+            similarities = self.event_embeddings.rows(rows) @ preference_embedding
+        similarities = np.divide(similarities, norms, out=np.zeros_like(similarities), where=norms > 0)
         
-        return 0.5  # Neutral if location doesn't match but isn't excluded
+        return np.maximum(similarities, 0.0)
     
-    def _calculate_price_preference(self, user_profile: Dict[str, Any], 
-                                  event_features: Dict[str, Any]) -> float:
-        """Calculate price preference score"""
-        event_price = event_features.get('price', 0.0) or 0.0
-        min_price = user_profile['price_preferences']['min']
-        max_price = user_profile['price_preferences']['max']
-        
-        if min_price <= event_price <= max_price:
-            return 1.0
-        elif event_price < min_price:
-            return 0.8  # Slight penalty for too cheap
-        else:
-            # Penalty increases with how much over budget
-            over_budget_ratio = event_price / max_price if max_price > 0 else float('inf')
-            return max(0.1, 1.0 / over_budget_ratio)
-    
-    def _calculate_virtual_preference(self, user_profile: Dict[str, Any], 
-                                    event_features: Dict[str, Any]) -> float:
-        """Calculate virtual event preference score"""
-        virtual_pref = user_profile['virtual_preference']
-        is_virtual = event_features['is_virtual']
-        
-        if is_virtual:
-            return 0.5 + 0.5 * virtual_pref
-        else:
-            return 0.5 + 0.5 * (1 - virtual_pref)
+    def _get_preference_embedding(self, user_id: UUID, user_profile: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Interaction-weighted centroid of the user's history embeddings, unit length
+        
+        Built from the stored event embeddings, so no text is encoded at
+        request time, and cached per user until their history or the catalog
+        changes. The cache is shared with copies made for updates, so entries
+        are keyed by the catalog generation they were built from.
+        """
+        history = user_profile['history_events']
+        if not history or self.event_embeddings is None:
+            return None
+        
+        signature = (self.catalog_generation, len(history), history[-1])
+        cached = self.preference_cache.get(user_id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        weights = np.asarray(user_profile['history_weights'], dtype=np.float32)
+        centroid = weights @ normalize_rows(self.event_embeddings.rows(history))
+        norm = np.linalg.norm(centroid)
+        if norm > 0:
+            centroid /= norm
+        
+        self.preference_cache.put(user_id, (signature, centroid))
+        return centroid
     
-    def _calculate_time_relevance(self, event_features: Dict[str, Any]) -> float:
-        """Calculate time-based relevance score"""
-        if not event_features.get('start_time'):
-            return 0.8
-        
-        try:
-            if isinstance(event_features['start_time'], str):
-                start_time = datetime.fromisoformat(event_features['start_time'].replace('Z', '+00:00'))
-            else:
-                start_time = event_features['start_time']
-            
-            now = datetime.now(start_time.tzinfo)
-            time_diff = start_time - now
-            
-            # Boost events happening soon (within 30 days)
-            if timedelta(0) <= time_diff <= timedelta(days=30):
-                return 1.0
-            elif timedelta(days=30) < time_diff <= timedelta(days=90):
-                return 0.9
-            elif time_diff > timedelta(days=90):
-                return 0.7
-            else:
-                return 0.1  # Past events
-                
-        except Exception:
-            return 0.8
+    def invalidate_user_profiles(self, user_ids: List[UUID]) -> None:
+        """Forget cached preference embeddings, e.g. after new interactions"""
+        self.preference_cache.invalidate(user_ids)
     
     def _generate_explanation(self, user_profile: Dict[str, Any], 
                             event_features: Dict[str, Any]) -> List[str]:
@@ -563,7 +503,7 @@ class ContentBasedRecommender:
             confidence += 0.1
         if user_profile['preferred_tags']:
             confidence += 0.1
-        if user_profile['text_preferences']:
+        if user_profile['history_events']:
             confidence += 0.2
         if user_profile['preferred_locations']:
             confidence += 0.1
@@ -576,32 +516,25 @@ class ContentBasedRecommender:
             return []
         
         try:
-            event_id_str = str(event_id)
-            if event_id_str not in self.event_features:
+            target_idx = self.event_registry.encode_one(event_id)
+            if target_idx is None:
                 return []
             
-            target_event = self.event_features[event_id_str]
-            similarities = {}
-            
-            # Calculate similarities with all other events
-            for other_id, other_event in self.event_features.items():
-                if other_id == event_id_str:
-                    continue
-                
-                similarity = await self._calculate_event_similarity(target_event, other_event)
-                similarities[other_id] = similarity
+            if count <= self.event_neighbours.k:
+                top_indices, top_scores = self.event_neighbours.neighbours(target_idx, count)
+            else:
+                top_indices, top_scores = self._scan_similar_events(target_idx, count)
             
-            # Sort and get top similar events
-            sorted_similar = sorted(similarities.items(), key=lambda x: x[1], reverse=True)
-            top_similar = sorted_similar[:count]
+            top_similar = list(zip(top_indices.tolist(), top_scores.tolist()))
+            top_similar_ids = self.event_registry.decode(top_indices)
             
             # Create recommendation items
             recommendations = []
-            for rank, (similar_id, similarity) in enumerate(top_similar, 1):
-                similar_event = self.event_features[similar_id]
+            for rank, (similar_id, (similar_idx, similarity)) in enumerate(zip(top_similar_ids, top_similar), 1):
+                similar_event = self.event_features[similar_idx]
                 
                 recommendations.append(RecommendationItem(
-                    event_id=UUID(similar_id),
+                    event_id=similar_id,
                     score=similarity,
                     algorithm=RecommendationAlgorithm.CONTENT_BASED,
                     confidence=0.8,
@@ -624,87 +557,431 @@ class ContentBasedRecommender:
             logger.error(f"Failed to get similar events: {e}")
             return []
     
-    async def _calculate_event_similarity(self, event1: Dict[str, Any], 
-                                        event2: Dict[str, Any]) -> float:
-        """Calculate similarity between two events"""
-        similarity = 0.0
+    async def get_nearby_events(self, latitude: float, longitude: float, count: int = 10,
+                                radius_km: Optional[float] = None,
+                                exclude_events: List[UUID] = None) -> List[RecommendationItem]:
+        """Upcoming events nearest to a point, scored by distance decay"""
+        if not self.is_trained:
+            return []
         
-        # Category similarity
-        if event1['category'] == event2['category']:
-            similarity += 0.3
+        try:
+            radius_km = radius_km or settings.LOCATION_SEARCH_RADIUS_KM
+            exclude_indices = self.event_registry.encode(exclude_events or [])
+            
+            # Over-fetch so the list is still full once ended and excluded events are dropped
+            rows, distances = self.geo_index.nearest(latitude, longitude, 2 * count + len(exclude_indices),
+                                                     radius_km)
+            keep = ~self.feature_store.has_ended()[rows] & ~np.isin(rows, exclude_indices)
+            rows, distances = rows[keep][:count], distances[keep][:count]
+            
+            recommendations = []
+            for rank, (event_id, event_idx, distance) in enumerate(
+                    zip(self.event_registry.decode(rows), rows.tolist(), distances.tolist()), 1):
+                event = self.event_features[event_idx]
+                
+                recommendations.append(RecommendationItem(
+                    event_id=event_id,
+                    score=float(np.exp(-distance / settings.LOCATION_DECAY_KM)),
+                    algorithm=RecommendationAlgorithm.LOCATION_BASED,
+                    confidence=0.7,
+                    rank=rank,
+                    reasons=[f"{distance:.1f} km from you"],
+                    title=event['title'],
+                    short_description=event['short_description'],
+                    category=event['category'],
+                    tags=event['tags'],
+                    start_time=event['start_time'],
+                    is_virtual=event['is_virtual'],
+                    price=event['price'],
+                    venue_name=event['venue_name'],
+                    organizer_name=event['organizer_name']
+                ))
+            
+            return recommendations
+            
+        except Exception as e:
+            logger.error(f"Failed to get nearby events: {e}")
+            return []
+    
+    def event_segments(self, event_ids: List[UUID]) -> List[List[Tuple[str, str]]]:
+        """Leaderboard segments of each event - ``('category', name)``, ``('city', name)``
+        (lowercased) and ``('format', 'virtual' | 'in_person')``
         
-        # Tag similarity
-        tags1 = set(event1['tags'])
-        tags2 = set(event2['tags'])
-        if tags1 and tags2:
-            tag_sim = len(tags1.intersection(tags2)) / len(tags1.union(tags2))
-            similarity += 0.25 * tag_sim
+        Events not in the catalog have none.
+        """
+        if not self.is_trained:
+            return [[] for _ in event_ids]
         
-        # Semantic similarity using embeddings
-        event1_id = None
-        event2_id = None
+        segments = []
+        for row in self.event_registry.encode(event_ids).tolist():
+            event = self.event_features[row] if row >= 0 else None
+            if event is None:
+                segments.append([])
+                continue
+            
+            names = [('category', event['category']), ('city', event['location'].get('city') or '')]
+            segments.append([(kind, name.lower()) for kind, name in names if name]
+                            + [('format', 'virtual' if event['is_virtual'] else 'in_person')])
+        return segments
+    
+    def get_ranked_events(self, ranked: List[Tuple[UUID, float]], count: int,
+                          algorithm: RecommendationAlgorithm, reason: str,
+                          exclude_events: List[UUID] = None,
+                          filters: Optional[Dict[str, Any]] = None) -> List[RecommendationItem]:
+        """Recommendation items for events ranked elsewhere (trending, popular, precomputed slates)
+        
+        Events no longer in the upcoming catalog, in ``exclude_events`` or not
+        matching ``filters`` are dropped, and scores are scaled so the best
+        ranked event scores 1.0.
+        """
+        if not self.is_trained or not ranked:
+            return []
+        
+        event_ids = [event_id for event_id, _ in ranked]
+        scores = np.array([score for _, score in ranked])
+        rows = self.event_registry.encode(event_ids)
         
-        for eid, features in self.event_features.items():
-            if features == event1:
-                event1_id = eid
-            elif features == event2:
-                event2_id = eid
+        keep = rows >= 0
+        keep[keep] = ~self.feature_store.has_ended()[rows[keep]]
+        keep &= ~np.isin(rows, self.event_registry.encode(exclude_events or []))
+        top_score = scores.max() if scores.max() > 0 else 1.0
         
-        if (event1_id and event2_id and 
-            event1_id in self.event_embeddings and 
-            event2_id in self.event_embeddings):
+        recommendations = []
+        for event_id, event_idx, score in zip(np.array(event_ids, dtype=object)[keep].tolist(),
+                                              rows[keep].tolist(), scores[keep].tolist()):
+            if len(recommendations) >= count:
+                break
             
-            embedding1 = self.event_embeddings[event1_id]
-            embedding2 = self.event_embeddings[event2_id]
+            event = self.event_features[event_idx]
+            if filters and not self._matches_filters(event, filters):
+                continue
             
-            semantic_sim = cosine_similarity([embedding1], [embedding2])[0][0]
-            similarity += 0.45 * semantic_sim
+            recommendations.append(RecommendationItem(
+                event_id=event_id,
+                score=score / top_score,
+                algorithm=algorithm,
+                confidence=0.6,
+                rank=len(recommendations) + 1,
+                reasons=[reason],
+                title=event['title'],
+                short_description=event['short_description'],
+                category=event['category'],
+                tags=event['tags'],
+                start_time=event['start_time'],
+                is_virtual=event['is_virtual'],
+                price=event['price'],
+                venue_name=event['venue_name'],
+                organizer_name=event['organizer_name']
+            ))
+        
+        return recommendations
+    
+    @staticmethod
+    def _matches_filters(event: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        """Whether an event passes the request's ``category``, ``city``, ``is_virtual`` and ``max_price`` filters"""
+        for kind, value in (('category', event['category']), ('city', event['location'].get('city') or '')):
+            if isinstance(filters.get(kind), str) and filters[kind] and filters[kind].lower() != value.lower():
+                return False
         
-        return min(1.0, max(0.0, similarity))
+        if isinstance(filters.get('is_virtual'), bool) and filters['is_virtual'] != event['is_virtual']:
+            return False
+        if isinstance(filters.get('max_price'), (int, float)) and event['price'] > filters['max_price']:
+            return False
+        return True
     
-    async def _save_model(self):
-        """Save the trained model"""
+    def _scan_similar_events(self, event_idx: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-``count`` similar events, for requests beyond the precomputed K"""
+        similarities = self._event_similarities(np.array([event_idx]))[0]
+        similarities[event_idx] = -np.inf
+        
+        top = np.argsort(-similarities, kind='stable')[:count]
+        top = top[similarities[top] > -np.inf]
+        return top, similarities[top]
+    
+    def _event_similarities(self, rows: np.ndarray) -> np.ndarray:
+        return self.feature_store.event_similarities(rows, self.event_embeddings)
+    
+    def _create_candidate_index(self, feature_store: EventFeatureStore) -> CandidateIndex:
+        return CandidateIndex(
+            feature_store,
+            per_key=settings.CONTENT_CANDIDATES_PER_KEY,
+            backfill=settings.CONTENT_CANDIDATE_BACKFILL
+        )
+    
+    def _create_geo_index(self, feature_store: EventFeatureStore) -> GeoGridIndex:
+        geo_index = GeoGridIndex(settings.LOCATION_GRID_CELL_DEGREES)
+        geo_index.build(feature_store.latitudes, feature_store.longitudes)
+        return geo_index
+    
+    def _create_neighbour_table(self) -> NeighbourTable:
+        return NeighbourTable(
+            k=settings.CONTENT_SIMILAR_EVENTS_K,
+            block_size=settings.CONTENT_NEIGHBOUR_BLOCK_SIZE,
+            n_workers=settings.PARALLEL_WORKERS
+        )
+    
+    async def upsert_events(self, events_data: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Add new events and apply changes to known ones without retraining
+        
+        Events whose content hash is unchanged are skipped and only events
+        whose combined text changed are re-embedded. The feature columns,
+        embedding matrix and similar-event table are patched for the changed
+        rows. Changes are applied in memory only; every serving process applies
+        them itself and new versions are published by the training job alone.
+        Shared state is never modified in place: new objects are built and
+        then assigned. Returns the number of added, updated and unchanged events.
+        """
+        if not self.is_trained:
+            await self.train(events_data, save=False)
+            return {'added': len(self.event_features), 'updated': 0, 'unchanged': 0}
+        
+        # The last version of an event in the batch wins
+        frame = event_frame(events_data)
+        frame['id'] = frame['id'].astype(str)
+        frame = frame.drop_duplicates('id', keep='last').reset_index(drop=True)
+        
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+        changed: Dict[int, Dict[str, Any]] = {}
+        changed_hashes: Dict[int, str] = {}
+        changed_positions: Dict[int, int] = {}
+        new_ids = []
+        
+        rows = self.event_registry.encode(frame['id']).tolist()
+        for position, (event_id, row, features) in enumerate(zip(frame['id'], rows, frame_features(frame))):
+            digest = _content_hash(features)
+            if row >= 0 and self.content_hashes[row] == digest:
+                counts['unchanged'] += 1
+                continue
+            
+            if row < 0:
+                row = len(self.event_registry) + len(new_ids)
+                new_ids.append(event_id)
+                counts['added'] += 1
+            else:
+                counts['updated'] += 1
+            changed[row] = features
+            changed_hashes[row] = digest
+            changed_positions[row] = position
+        
+        if not changed:
+            return counts
+        
+        try:
+            n_rows = len(self.event_features) + len(new_ids)
+            changed_rows = np.array(sorted(changed), dtype=np.int64)
+            embed_rows = [
+                row for row in changed_rows.tolist()
+                if row >= len(self.event_features)
+                or self.event_features[row]['text_content'] != changed[row]['text_content']
+            ]
+            
+            event_features = self.event_features + [None] * len(new_ids)
+            content_hashes = self.content_hashes + [None] * len(new_ids)
+            for row in changed_rows.tolist():
+                event_features[row] = changed[row]
+                content_hashes[row] = changed_hashes[row]
+            
+            feature_store = self.feature_store.patched(
+                changed_rows, frame.iloc[[changed_positions[row] for row in changed_rows.tolist()]], n_rows
+            )
+            candidate_index = self._create_candidate_index(feature_store)
+            geo_index = self.geo_index.updated(changed_rows, feature_store.latitudes[changed_rows],
+                                               feature_store.longitudes[changed_rows])
+            event_embeddings = self.event_embeddings
+            if embed_rows:
+                new_embeddings = await self.embedding_service.embed_many(
+                    [changed[row]['text_content'] for row in embed_rows]
+                )
+                event_embeddings = event_embeddings.updated(embed_rows, new_embeddings, n_rows)
+            
+            event_registry = self.event_registry.copy()
+            event_registry.encode_or_add(new_ids)
+            
+            # Patch a copy so requests in flight keep a consistent table
+            event_neighbours = self.event_neighbours.copy()
+            event_neighbours.update_with(
+                changed_rows, n_rows, lambda chunk: feature_store.event_similarities(chunk, event_embeddings)
+            )
+            
+            self.event_registry = event_registry
+            self.event_features = event_features
+            self.content_hashes = content_hashes
+            self.feature_store = feature_store
+            self.candidate_index = candidate_index
+            self.geo_index = geo_index
+            self.event_embeddings = event_embeddings
+            self.category_encoder = dict(feature_store.categories)
+            self.tag_vocabulary = set(feature_store.tags)
+            self.event_neighbours = event_neighbours
+            self.catalog_generation = next(_catalog_generations)
+            self.preference_cache.clear()
+            
+            logger.info(f"Upserted events into the content-based model: {counts}, "
+                       f"{len(embed_rows)} re-embedded")
+            return counts
+            
+        except Exception as e:
+            logger.error(f"Failed to upsert events: {e}")
+            raise
+    
+    def ended_event_ids(self, before: Optional[float] = None) -> List[UUID]:
+        """Events that ended before the epoch time ``before`` (default now)"""
+        if not self.is_trained:
+            return []
+        return self.event_registry.decode(np.flatnonzero(self.feature_store.has_ended(before)))
+    
+    async def remove_events(self, event_ids: List[UUID]) -> int:
+        """Drop events (e.g. cancelled ones) from the model without retraining
+        
+        The remaining events are renumbered in order and similar-event lists
+        that pointed at a removed event are recomputed. Like ``upsert_events``
+        this only changes the in-memory model. Returns the number of events
+        removed.
+        """
+        if not self.is_trained or not event_ids:
+            return 0
+        
+        rows = self.event_registry.encode(event_ids)
+        rows = np.unique(rows[rows >= 0])
+        if not len(rows):
+            return 0
+        
         try:
-            model_dir = settings.MODEL_CACHE_DIR
-            os.makedirs(model_dir, exist_ok=True)
+            kept = np.setdiff1d(np.arange(len(self.event_features)), rows)
+            feature_store = self.feature_store.take(kept)
+            candidate_index = self._create_candidate_index(feature_store)
+            geo_index = self.geo_index.removed(rows)
+            event_embeddings = self.event_embeddings.take(kept)
+            
+            # Renumber a copy so requests in flight keep a consistent table
+            event_neighbours = copy.copy(self.event_neighbours)
+            event_neighbours.remove_with(
+                rows, lambda chunk: feature_store.event_similarities(chunk, event_embeddings)
+            )
+            
+            self.event_registry = IdRegistry(self.event_registry.ids[kept])
+            self.event_features = [self.event_features[row] for row in kept.tolist()]
+            self.content_hashes = [self.content_hashes[row] for row in kept.tolist()]
+            self.feature_store = feature_store
+            self.candidate_index = candidate_index
+            self.geo_index = geo_index
+            self.event_embeddings = event_embeddings
+            self.event_neighbours = event_neighbours
+            self.catalog_generation = next(_catalog_generations)
+            self.preference_cache.clear()
             
-            model_data = {
+            logger.info(f"Removed {len(rows)} events from the content-based model")
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Failed to remove events: {e}")
+            raise
+    
+    async def catch_up_catalog(self) -> Dict[str, int]:
+        """Apply the catalog changes made since the model's catalog was read
+        
+        Events changed in the database after ``catalog_as_of`` are upserted,
+        or removed when no longer published, so a freshly loaded version
+        reflects the changes streamed while it was being trained. Returns the
+        number of events upserted and removed.
+        """
+        counts = {'upserted': 0, 'removed': 0}
+        if not self.is_trained or self.catalog_as_of is None:
+            return counts
+        
+        started_at = time.time()
+        frames = load_event_pages(updated_since=datetime.fromtimestamp(self.catalog_as_of, timezone.utc))
+        while True:
+            frame = await asyncio.to_thread(next, frames, None)
+            if frame is None:
+                break
+            
+            frame['id'] = [str(UUID(bytes=raw.ljust(16, b'\0'))) for raw in frame['id']]
+            published = frame['is_published'].astype(bool)
+            counts['removed'] += await self.remove_events(frame.loc[~published, 'id'].tolist())
+            if published.any():
+                upserted = await self.upsert_events(frame[published].drop(columns='is_published').to_dict('records'))
+                counts['upserted'] += upserted['added'] + upserted['updated']
+        
+        self.catalog_as_of = started_at
+        if counts['upserted'] or counts['removed']:
+            logger.info(f"Caught up the content-based catalog: {counts}")
+        return counts
+    
+    async def _save_model(self):
+        """Publish the trained model as a new artifact version"""
+        try:
+            arrays = {'event_ids': self.event_registry.ids}
+            if self.event_embeddings is not None:
+                arrays.update(self.event_embeddings.to_arrays())
+            if self.event_neighbours is not None:
+                arrays['event_neighbour_indices'] = self.event_neighbours.indices
+                arrays['event_neighbour_scores'] = self.event_neighbours.scores
+            
+            documents = {
                 'event_features': self.event_features,
-                'event_embeddings': self.event_embeddings,
+                'content_hashes': self.content_hashes,
                 'category_encoder': self.category_encoder,
-                'tag_vocabulary': list(self.tag_vocabulary),
-                'model_version': self.model_version
+                'tag_vocabulary': sorted(self.tag_vocabulary)
             }
             
-            model_path = os.path.join(model_dir, 'content_based_model.pkl')
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data, f)
-            
-            logger.info(f"Content-based model saved to {model_path}")
+            self.artifact_version = self.artifact_store.save(
+                arrays, {'model_version': self.model_version, 'catalog_as_of': self.catalog_as_of}, documents
+            )
+            logger.info(f"Content-based model saved as version {self.artifact_version}")
             
         except Exception as e:
             logger.error(f"Failed to save model: {e}")
     
     async def load_model(self):
-        """Load a previously trained model"""
+        """Load the published model version, memory-mapping the embedding matrix"""
+        return self.load()
+    
+    def load(self) -> bool:
+        """Synchronous ``load_model``, for loader threads"""
         try:
-            model_path = os.path.join(settings.MODEL_CACHE_DIR, 'content_based_model.pkl')
-            
-            if not os.path.exists(model_path):
+            artifact = self.artifact_store.load()
+            if artifact is None:
                 logger.info("No saved content-based model found")
                 return False
             
-            with open(model_path, 'rb') as f:
-                model_data = pickle.load(f)
-            
-            self.event_features = model_data['event_features']
-            self.event_embeddings = model_data['event_embeddings']
-            self.category_encoder = model_data['category_encoder']
-            self.tag_vocabulary = set(model_data['tag_vocabulary'])
-            self.model_version = model_data.get('model_version', '1.0.0')
+            event_registry = IdRegistry(artifact.arrays['event_ids'])
+            event_features = artifact.documents['event_features']
+            content_hashes = artifact.documents.get('content_hashes') or [
+                _content_hash(features) for features in event_features
+            ]
+            feature_store = EventFeatureStore.from_features(event_features)
+            candidate_index = self._create_candidate_index(feature_store)
+            geo_index = self._create_geo_index(feature_store)
+            event_embeddings = EmbeddingStore.from_arrays(artifact.arrays)
+            
+            event_neighbours = self._create_neighbour_table()
+            if 'event_neighbour_indices' in artifact.arrays:
+                event_neighbours.load(artifact.arrays['event_neighbour_indices'], artifact.arrays['event_neighbour_scores'])
+            else:
+                event_neighbours.build_with(
+                    len(event_features),
+                    lambda rows: feature_store.event_similarities(rows, event_embeddings)
+                )
+            
+            self.event_registry = event_registry
+            self.event_features = event_features
+            self.content_hashes = content_hashes
+            self.feature_store = feature_store
+            self.candidate_index = candidate_index
+            self.geo_index = geo_index
+            self.event_embeddings = event_embeddings
+            self.event_neighbours = event_neighbours
+            self.catalog_generation = next(_catalog_generations)
+            self.preference_cache.clear()
+            self.category_encoder = artifact.documents['category_encoder']
+            self.tag_vocabulary = set(artifact.documents['tag_vocabulary'])
+            self.model_version = artifact.metadata.get('model_version', '1.0.0')
+            self.catalog_as_of = artifact.metadata.get('catalog_as_of')
+            self.artifact_version = artifact.version
             
             self.is_trained = True
-            logger.info("Content-based model loaded successfully")
+            logger.info(f"Content-based model version {artifact.version} loaded successfully")
             return True
             
         except Exception as e:
@@ -722,5 +999,7 @@ class ContentBasedRecommender:
             "n_events": len(self.event_features),
             "n_categories": len(self.category_encoder),
             "n_tags": len(self.tag_vocabulary),
-            "has_embeddings": len(self.event_embeddings) > 0
+            "has_embeddings": self.event_embeddings is not None,
+            "embedding_dtype": self.event_embeddings.dtype if self.event_embeddings is not None else None,
+            "artifact_version": self.artifact_version
         }
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""Columnar event features for vectorised content-based scoring"""
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix, diags, vstack
+
+from app.algorithms.embedding_store import EmbeddingStore
+from app.algorithms.event_data import normalize_event_frame
+from app.algorithms.geo_index import haversine_km
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400.0
+
+
+def _to_epoch(value: Any) -> float:
+    """Start time as epoch seconds; NaN when missing or unparseable"""
+    if not value:
+        return np.nan
+    
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        # Naive datetimes are local time, as ``datetime.now()`` is
+        return value.timestamp()
+    except Exception:
+        return np.nan
+
+
+class EventFeatureStore:
+    """Catalog features held as one array per feature, row = event index
+    
+    Every ``*_scores`` method scores the whole catalog for one user profile
+    with NumPy operations, mirroring the per-event rules of the content-based
+    recommender.
+    """
+    
+    def __init__(self, category_codes: np.ndarray, categories: Dict[str, int],
+                 tag_matrix: csr_matrix, tags: Dict[str, int], prices: np.ndarray,
+                 is_virtual: np.ndarray, venue_names: np.ndarray, organizer_names: np.ndarray,
+                 latitudes: np.ndarray, longitudes: np.ndarray, start_times: np.ndarray,
+                 end_times: np.ndarray, curation_scores: np.ndarray):
+        self.category_codes = category_codes
+        self.categories = categories
+        self.tag_matrix = tag_matrix
+        self.tags = tags
+        self.tag_counts = np.diff(tag_matrix.indptr)
+        self.prices = prices
+        self.is_virtual = is_virtual
+        self.venue_names = venue_names
+        self.organizer_names = organizer_names
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.start_times = start_times
+        self.end_times = end_times
+        # Events without an end time end when they start; NaN if neither is known
+        self.ends_at = np.fmax(end_times, start_times)
+        self.curation_scores = curation_scores
+        self.curation_multipliers = 0.5 + 0.5 * curation_scores
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "EventFeatureStore":
+        """Build the columns from a normalised event frame"""
+        categories: Dict[str, int] = {}
+        tags: Dict[str, int] = {}
+        return cls.concat([cls.encode_frame(frame, categories, tags)], categories, tags)
+    
+    @classmethod
+    def from_features(cls, event_features: List[Dict[str, Any]]) -> "EventFeatureStore":
+        """Build the columns from per-event feature dicts"""
+        return cls.from_frame(normalize_event_frame(pd.DataFrame.from_records(event_features)))
+    
+    @classmethod
+    def concat(cls, column_chunks: List[Dict[str, Any]], categories: Dict[str, int],
+               tags: Dict[str, int]) -> "EventFeatureStore":
+        """Store over consecutive ``encode_frame`` chunks that share ``categories``/``tags``"""
+        tag_matrices = [chunk['tag_matrix'] for chunk in column_chunks]
+        for tag_matrix in tag_matrices:
+            tag_matrix.resize((tag_matrix.shape[0], len(tags)))
+        
+        store = cls(
+            categories=categories,
+            tags=tags,
+            tag_matrix=vstack(tag_matrices, format='csr', dtype=np.float32),
+            **{
+                name: np.concatenate([chunk[name] for chunk in column_chunks])
+                for name in column_chunks[0] if name != 'tag_matrix'
+            }
+        )
+        logger.info(f"Built feature columns for {len(store)} events "
+                   f"({len(categories)} categories, {len(tags)} tags)")
+        return store
+    
+    @staticmethod
+    def encode_frame(frame: pd.DataFrame, categories: Dict[str, int], tags: Dict[str, int]) -> Dict[str, Any]:
+        """Column arrays for a normalised event frame, adding unseen categories and tags to the vocabularies"""
+        frame = frame.reset_index(drop=True)
+        category = frame['category']
+        for value in pd.unique(category[category != '']):
+            categories.setdefault(value, len(categories))
+        
+        # explode() keeps the row position as index; events without tags become NaN
+        event_tags = frame['tags'].explode().dropna()
+        for tag in pd.unique(event_tags):
+            tags.setdefault(tag, len(tags))
+        
+        tag_matrix = coo_matrix(
+            (np.ones(len(event_tags), dtype=np.float32),
+             (event_tags.index.to_numpy(), event_tags.map(tags).to_numpy(dtype=np.int32))),
+            shape=(len(frame), len(tags))
+        ).tocsr()
+        tag_matrix.data[:] = 1.0  # A tag listed twice still counts once
+        
+        return dict(
+            category_codes=category.map(categories).fillna(-1).to_numpy(dtype=np.int32),
+            tag_matrix=tag_matrix,
+            prices=frame['price'].to_numpy(dtype=np.float64),
+            is_virtual=frame['is_virtual'].to_numpy(dtype=bool),
+            venue_names=frame['venue_name'].str.lower().to_numpy(dtype=str),
+            organizer_names=frame['organizer_name'].str.lower().to_numpy(dtype=str),
+            latitudes=frame['latitude'].to_numpy(dtype=np.float64),
+            longitudes=frame['longitude'].to_numpy(dtype=np.float64),
+            start_times=frame['start_time'].map(_to_epoch).to_numpy(dtype=np.float64),
+            end_times=frame['end_time'].map(_to_epoch).to_numpy(dtype=np.float64),
+            curation_scores=frame['curation_score'].to_numpy(dtype=np.float64)
+        )
+    
+    def patched(self, rows: np.ndarray, frame: pd.DataFrame, n_rows: int) -> "EventFeatureStore":
+        """Copy with ``rows`` set from the normalised event ``frame``, grown to ``n_rows`` events
+        
+        Only the given events are re-encoded; every row past the current end
+        must be among ``rows``.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        categories = dict(self.categories)
+        tags = dict(self.tags)
+        update = self.encode_frame(frame, categories, tags)
+        
+        def patch(column: np.ndarray, values: np.ndarray) -> np.ndarray:
+            # result_type widens fixed-width strings (venue, organizer names) as needed
+            patched = np.empty(n_rows, dtype=np.result_type(column, values))
+            patched[:len(column)] = column
+            patched[rows] = values
+            return patched
+        
+        old = self.tag_matrix
+        indptr = np.concatenate([old.indptr, np.full(n_rows - len(self), old.indptr[-1])])
+        tag_matrix = csr_matrix((old.data, old.indices, indptr), shape=(n_rows, len(tags)))
+        kept = np.ones(n_rows, dtype=np.float32)
+        kept[rows] = 0.0
+        placement = csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, np.arange(len(rows)))),
+                               shape=(n_rows, len(rows)))
+        tag_matrix = (diags(kept) @ tag_matrix + placement @ update['tag_matrix']).tocsr()
+        tag_matrix.eliminate_zeros()
+        tag_matrix.sort_indices()
+        
+        return EventFeatureStore(
+            category_codes=patch(self.category_codes, update['category_codes']),
+            categories=categories,
+            tag_matrix=tag_matrix,
+            tags=tags,
+            prices=patch(self.prices, update['prices']),
+            is_virtual=patch(self.is_virtual, update['is_virtual']),
+            venue_names=patch(self.venue_names, update['venue_names']),
+            organizer_names=patch(self.organizer_names, update['organizer_names']),
+            latitudes=patch(self.latitudes, update['latitudes']),
+            longitudes=patch(self.longitudes, update['longitudes']),
+            start_times=patch(self.start_times, update['start_times']),
+            end_times=patch(self.end_times, update['end_times']),
+            curation_scores=patch(self.curation_scores, update['curation_scores'])
+        )
+    
+    def take(self, rows: np.ndarray) -> "EventFeatureStore":
+        """Copy holding only ``rows``, renumbered in the given order"""
+        return EventFeatureStore(
+            category_codes=self.category_codes[rows],
+            categories=self.categories,
+            tag_matrix=self.tag_matrix[rows],
+            tags=self.tags,
+            prices=self.prices[rows],
+            is_virtual=self.is_virtual[rows],
+            venue_names=self.venue_names[rows],
+            organizer_names=self.organizer_names[rows],
+            latitudes=self.latitudes[rows],
+            longitudes=self.longitudes[rows],
+            start_times=self.start_times[rows],
+            end_times=self.end_times[rows],
+            curation_scores=self.curation_scores[rows]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.category_codes)
+    
+    def tag_similarities(self, rows: np.ndarray) -> np.ndarray:
+        """Tag Jaccard similarity of events ``rows`` to every event; 0 if either has no tags"""
+        intersection = (self.tag_matrix[rows] @ self.tag_matrix.T).toarray()
+        counts = self.tag_counts[rows, np.newaxis]
+        union = counts + self.tag_counts[np.newaxis, :] - intersection
+        return np.divide(intersection, union, out=np.zeros_like(intersection),
+                         where=(counts > 0) & (self.tag_counts[np.newaxis, :] > 0))
+    
+    def event_similarities(self, rows: np.ndarray, embeddings: Optional[EmbeddingStore] = None) -> np.ndarray:
+        """Similarity of events ``rows`` to every event, clipped to ``[0, 1]``
+        
+        0.3 for a shared category, plus 0.25 x tag Jaccard, plus 0.45 x the
+        embedding cosine when embeddings are available.
+        """
+        similarities = np.where(self.category_codes[rows, np.newaxis] == self.category_codes[np.newaxis, :],
+                                0.3, 0.0).astype(np.float32)
+        similarities += 0.25 * self.tag_similarities(rows)
+        
+        if embeddings is not None:
+            scale = embeddings.norms[rows, np.newaxis] * embeddings.norms[np.newaxis, :]
+            cosines = embeddings.dot(embeddings.rows(rows).T).T
+            similarities += 0.45 * np.divide(cosines, scale, out=np.zeros_like(cosines), where=scale > 0)
+        
+        return np.clip(similarities, 0.0, 1.0, out=similarities)
+    
+    def category_scores(self, preferred_categories: Set[str]) -> np.ndarray:
+        """1.0 for preferred categories, 0.1 otherwise; 0.5 without preferences"""
+        if not preferred_categories:
+            return np.full(len(self), 0.5)
+        
+        codes = [self.categories[category] for category in preferred_categories if category in self.categories]
+        return np.where(np.isin(self.category_codes, codes), 1.0, 0.1)
+    
+    def tag_scores(self, preferred_tags: Set[str]) -> np.ndarray:
+        """Jaccard similarity of event tags and preferred tags; 0.5 if either is empty"""
+        if not preferred_tags:
+            return np.full(len(self), 0.5)
+        
+        preferred = np.zeros(len(self.tags), dtype=np.float32)
+        preferred[[self.tags[tag] for tag in preferred_tags if tag in self.tags]] = 1.0
+        
+        intersection = self.tag_matrix @ preferred
+        union = len(preferred_tags) + self.tag_counts - intersection
+        return np.where(self.tag_counts > 0, intersection / np.maximum(union, 1), 0.5)
+    
+    def location_scores(self, preferred_locations: Set[str],
+                        location: Optional[Tuple[float, float]] = None, decay_km: float = 10.0) -> np.ndarray:
+        """1.0 when the venue names a preferred location, 0.5 otherwise
+        
+        Given the user's ``(latitude, longitude)``, events with venue
+        coordinates score ``0.5 + 0.5 * exp(-distance / decay_km)`` instead.
+        Virtual events score 1.0 if the user prefers ``online`` and 0.8 if not.
+        Without location preferences or a location every event scores 1.0.
+        """
+        if not preferred_locations and location is None:
+            return np.ones(len(self))
+        
+        matches = np.zeros(len(self), dtype=bool)
+        for preferred in preferred_locations:
+            matches |= np.char.find(self.venue_names, preferred.lower()) >= 0
+        matches &= np.char.str_len(self.venue_names) > 0
+        scores = np.where(matches, 1.0, 0.5)
+        
+        if location is not None:
+            located = ~np.isnan(self.latitudes) & ~np.isnan(self.longitudes)
+            distances = haversine_km(location[0], location[1], self.latitudes[located], self.longitudes[located])
+            scores[located] = 0.5 + 0.5 * np.exp(-distances / decay_km)
+        
+        virtual_score = 1.0 if 'online' in preferred_locations else 0.8
+        return np.where(self.is_virtual, virtual_score, scores)
+    
+    def price_scores(self, min_price: float, max_price: float) -> np.ndarray:
+        """1.0 within budget, 0.8 below it, ``max_price / price`` (at least 0.1) above it"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            over_budget = np.fmax(0.1, max_price / self.prices) if max_price > 0 else np.full(len(self), 0.1)
+        
+        in_range = (self.prices >= min_price) & (self.prices <= max_price)
+        return np.where(in_range, 1.0, np.where(self.prices < min_price, 0.8, over_budget))
+    
+    def virtual_scores(self, virtual_preference: float) -> np.ndarray:
+        """Between 0.5 and 1.0 depending on how well the format matches the preference"""
+        return np.where(self.is_virtual, 0.5 + 0.5 * virtual_preference, 0.5 + 0.5 * (1 - virtual_preference))
+    
+    def time_relevance(self, now: Optional[float] = None) -> np.ndarray:
+        """Boost for events starting soon: 1.0 within 30 days, 0.9 within 90, 0.7 later, 0.1 if past"""
+        now = time.time() if now is None else now
+        days_until = (self.start_times - now) / DAY_SECONDS
+        
+        relevance = np.select(
+            [days_until < 0, days_until <= 30, days_until <= 90],
+            [0.1, 1.0, 0.9],
+            default=0.7
+        )
+        return np.where(np.isnan(self.start_times), 0.8, relevance)
+    
+    def has_ended(self, now: Optional[float] = None) -> np.ndarray:
+        """Whether each event ended before ``now``; never for events without times"""
+        now = time.time() if now is None else now
+        return self.ends_at < now
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""Shared sentence-embedding service backed by a pool of CPU worker processes"""
+import asyncio
+import logging
+import multiprocessing
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Model loaded once per worker process by ``_init_worker``
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    """Load the embedding model, pinning torch to ``torch_threads`` intra-op threads"""
+    global _worker_model
+    
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=len(texts)), dtype=np.float32)
+
+
+def plan_batches(texts: Sequence[str], max_batch_size: int, max_batch_chars: int) -> List[List[int]]:
+    """Group text positions into length-sorted batches
+    
+    Texts in a batch are padded to its longest one, so similar lengths are
+    batched together and a batch closes once its padded size (longest length
+    x batch size, in characters as a proxy for tokens) would exceed
+    ``max_batch_chars`` or it holds ``max_batch_size`` texts.
+    """
+    order = np.argsort([len(text) for text in texts], kind='stable')
+    batches = []
+    batch = []
+    
+    for position in order.tolist():
+        padded_chars = max(len(texts[position]), 1) * (len(batch) + 1)
+        if batch and (len(batch) >= max_batch_size or padded_chars > max_batch_chars):
+            batches.append(batch)
+            batch = []
+        batch.append(position)
+    
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class EmbeddingService:
+    """Embeds texts with ``EMBEDDING_MODEL`` off the event loop
+    
+    Batches run on ``EMBEDDING_WORKERS`` spawned processes, each with torch
+    pinned to ``EMBEDDING_TORCH_THREADS`` threads. With no workers configured,
+    or inside a daemonic process (the training job), which may not start
+    children, batches are encoded on one background thread instead. At most
+    ``EMBEDDING_MAX_PENDING_BATCHES`` batches are in flight per event loop;
+    further ``embed_many`` calls wait for a free slot.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None, n_workers: Optional[int] = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.n_workers = settings.EMBEDDING_WORKERS if n_workers is None else n_workers
+        self.executor: Optional[Executor] = None
+        self._slots = weakref.WeakKeyDictionary()
+        self.dimension: Optional[int] = None
+    
+    def _get_executor(self) -> Executor:
+        if self.executor is None:
+            if self.n_workers > 0 and not multiprocessing.current_process().daemon:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, settings.EMBEDDING_TORCH_THREADS)
+                )
+                logger.info(f"Started {self.n_workers} embedding workers for {self.model_name}")
+            else:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="embedding",
+                    initializer=_init_worker,
+                    initargs=(self.model_name, max(1, self.n_workers) * settings.EMBEDDING_TORCH_THREADS)
+                )
+                logger.info(f"Embedding in-process with {self.model_name}")
+        return self.executor
+    
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._slots:
+            self._slots[loop] = asyncio.Semaphore(settings.EMBEDDING_MAX_PENDING_BATCHES)
+        return self._slots[loop]
+    
+    async def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), dim)`` float32 embeddings, in input order"""
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        
+        executor = self._get_executor()
+        slots = self._get_slots()
+        loop = asyncio.get_running_loop()
+        
+        async def embed_batch(batch: List[int]) -> np.ndarray:
+            async with slots:
+                return await loop.run_in_executor(executor, _encode_batch, [texts[i] for i in batch])
+        
+        batches = plan_batches(texts, settings.EMBEDDING_MAX_BATCH_SIZE, settings.EMBEDDING_MAX_BATCH_CHARS)
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        
+        self.dimension = results[0].shape[1]
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for batch, batch_embeddings in zip(batches, results):
+            embeddings[batch] = batch_embeddings
+        return embeddings
+    
+    async def embed_one(self, text: str) -> np.ndarray:
+        """Embedding of a single (e.g. ad-hoc query) text"""
+        return (await self.embed_many([text]))[0]
+    
+    def shutdown(self):
+        """Stop the worker processes; they are restarted on the next request"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+_embedding_service: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """The process-wide embedding service"""
+    global _embedding_service
+    if _embedding_service is None:
+        _embedding_service = EmbeddingService()
+    return _embedding_service
+
+
+def close_embedding_service():
+    """Stop the process-wide embedding service's workers"""
+    if _embedding_service is not None:
+        _embedding_service.shutdown()
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""Contiguous, optionally quantised event embedding matrix"""
+from typing import Dict, Optional
+
+import numpy as np
+
+EMBEDDING_DTYPES = ('float32', 'float16', 'int8')
+INT8_MAX = 127
+# Rows up-cast to float32 at a time when multiplying a quantised matrix by many query vectors
+DEQUANTIZE_BLOCK_ROWS = 65536
+# Overlay or dropped rows beyond this share of the store trigger a rebuild into one matrix
+OVERLAY_COMPACT_FRACTION = 0.25
+
+
+class EmbeddingStore:
+    """Embedding matrix (row = event index) stored as float32, float16 or int8
+    
+    int8 codes use symmetric per-dimension scales, ``value = code * scale``.
+    Products never materialise the full float32 matrix: scales are folded
+    into the query vectors, which multiply the codes directly, so a
+    memory-mapped matrix stays shared between processes.
+    
+    ``updated`` and ``take`` leave the matrix untouched too: changed and new
+    rows are appended to a small overlay and rows are addressed through
+    ``row_index``, whose entries past the matrix point into the overlay. Once
+    the overlay or the dropped rows exceed ``OVERLAY_COMPACT_FRACTION`` of
+    the store it is rebuilt once into a single matrix.
+    """
+    
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None,
+                 norms: Optional[np.ndarray] = None, overlay: Optional[np.ndarray] = None,
+                 row_index: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+        self.overlay = np.empty((0, codes.shape[1]), dtype=codes.dtype) if overlay is None else overlay
+        self.row_index = row_index
+        self.norms = self._row_norms() if norms is None else norms
+    
+    @classmethod
+    def quantize(cls, embeddings: np.ndarray, dtype: str = 'float32') -> "EmbeddingStore":
+        """Store float embeddings as ``dtype``"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        
+        if dtype == 'float32':
+            return cls(embeddings)
+        if dtype == 'float16':
+            return cls(embeddings.astype(np.float16))
+        if dtype == 'int8':
+            scales = np.abs(embeddings).max(axis=0) / INT8_MAX if len(embeddings) else np.ones(embeddings.shape[1])
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            return cls(cls._encode_int8(embeddings, scales), scales)
+        
+        raise ValueError(f"Unsupported embedding dtype {dtype!r}; expected one of {', '.join(EMBEDDING_DTYPES)}")
+    
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> Optional["EmbeddingStore"]:
+        """Store over saved (possibly memory-mapped) artifact arrays, if present"""
+        if 'embeddings' not in arrays:
+            return None
+        return cls(arrays['embeddings'], arrays.get('embedding_scales'))
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays to save in a model artifact"""
+        arrays = {'embeddings': self.codes if self.row_index is None else self._codes_of(np.arange(len(self)))}
+        if self.scales is not None:
+            arrays['embedding_scales'] = self.scales
+        return arrays
+    
+    @staticmethod
+    def _encode_int8(embeddings: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(embeddings / scales), -INT8_MAX, INT8_MAX).astype(np.int8)
+    
+    def __len__(self) -> int:
+        return len(self.codes) if self.row_index is None else len(self.row_index)
+    
+    @property
+    def dim(self) -> int:
+        return self.codes.shape[1]
+    
+    @property
+    def dtype(self) -> str:
+        return self.codes.dtype.name
+    
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.overlay.nbytes
+    
+    def rows(self, rows: np.ndarray) -> np.ndarray:
+        """Dequantised float32 embeddings of ``rows``"""
+        values = np.asarray(self._codes_of(rows), dtype=np.float32)
+        return values * self.scales if self.scales is not None else values
+    
+    def dot(self, vectors: np.ndarray) -> np.ndarray:
+        """``embeddings @ vectors`` for a ``(dim,)`` vector or ``(dim, m)`` matrix"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.scales is not None:
+            vectors = vectors * (self.scales if vectors.ndim == 1 else self.scales[:, np.newaxis])
+        
+        result = self._codes_dot(self.codes, vectors)
+        if self.row_index is None:
+            return result
+        if len(self.overlay):
+            result = np.concatenate([result, self._codes_dot(self.overlay, vectors)])
+        return result[self.row_index]
+    
+    def updated(self, rows: np.ndarray, embeddings: np.ndarray, n_rows: int) -> "EmbeddingStore":
+        """New store of ``n_rows`` rows with ``rows`` set to ``embeddings``
+        
+        Values are quantised with the existing scales, so int8 values beyond
+        the original per-dimension range are clipped. Every row past the
+        current end must be among ``rows``.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if self.scales is not None:
+            codes = self._encode_int8(embeddings, self.scales)
+        else:
+            codes = embeddings.astype(self.codes.dtype)
+        
+        n_new = n_rows - len(self)
+        row_index = np.arange(len(self), dtype=np.int64) if self.row_index is None else self.row_index
+        row_index = np.concatenate([row_index, np.full(n_new, -1, dtype=np.int64)])
+        row_index[rows] = len(self.codes) + len(self.overlay) + np.arange(len(codes))
+        
+        store = EmbeddingStore(self.codes, self.scales, np.concatenate([self.norms, np.zeros(n_new, dtype=np.float32)]),
+                               np.concatenate([self.overlay, codes]), row_index)
+        store.norms[rows] = np.linalg.norm(store.rows(rows), axis=1)
+        return store._compacted()
+    
+    def take(self, rows: np.ndarray) -> "EmbeddingStore":
+        """New store holding only ``rows``, renumbered in the given order"""
+        row_index = np.asarray(rows, dtype=np.int64) if self.row_index is None else self.row_index[rows]
+        return EmbeddingStore(self.codes, self.scales, self.norms[rows], self.overlay, row_index)._compacted()
+    
+    def _codes_of(self, rows) -> np.ndarray:
+        """Stored codes of ``rows`` (an index array or slice), from the matrix or the overlay"""
+        if self.row_index is None:
+            return self.codes[rows]
+        
+        physical = self.row_index[rows]
+        in_matrix = physical < len(self.codes)
+        if in_matrix.all():
+            return self.codes[physical]
+        
+        values = np.empty((len(physical), self.dim), dtype=self.codes.dtype)
+        values[in_matrix] = self.codes[physical[in_matrix]]
+        values[~in_matrix] = self.overlay[physical[~in_matrix] - len(self.codes)]
+        return values
+    
+    def _compacted(self) -> "EmbeddingStore":
+        """This store, or one rebuilt into a single matrix once the overlay or dropped rows grow too large"""
+        n_dropped = len(self.codes) + len(self.overlay) - len(self)
+        limit = OVERLAY_COMPACT_FRACTION * len(self)
+        if len(self.overlay) <= limit and n_dropped <= limit:
+            return self
+        return EmbeddingStore(self._codes_of(np.arange(len(self))), self.scales, self.norms)
+    
+    @staticmethod
+    def _codes_dot(codes: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        if codes.dtype == np.float32:
+            return codes @ vectors
+        
+        # A single query multiplies the codes directly; einsum casts through a small buffer
+        if vectors.ndim == 1:
+            return np.einsum('ij,j->i', codes, vectors, dtype=np.float32, casting='unsafe')
+        
+        # Many queries keep the product on BLAS; each up-cast block is reused across every column
+        result = np.empty((len(codes),) + vectors.shape[1:], dtype=np.float32)
+        for start in range(0, len(codes), DEQUANTIZE_BLOCK_ROWS):
+            stop = start + DEQUANTIZE_BLOCK_ROWS
+            result[start:stop] = codes[start:stop].astype(np.float32) @ vectors
+        return result
+    
+    def _row_norms(self) -> np.ndarray:
+        norms = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), DEQUANTIZE_BLOCK_ROWS):
+            stop = start + DEQUANTIZE_BLOCK_ROWS
+            norms[start:stop] = np.linalg.norm(self.rows(slice(start, stop)), axis=1)
+        return norms
\ No newline at end of file
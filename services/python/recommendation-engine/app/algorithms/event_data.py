@@ -0,0 +1,147 @@
+"""Columnar event catalog data for content-based training"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database import get_engine
+from app.utils.id_registry import UUID_DTYPE
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Feature columns and the value used when an event omits one (or it is null)
+TEXT_COLUMNS = ['title', 'description', 'short_description', 'category', 'organizer_name', 'venue_name']
+FEATURE_COLUMNS = TEXT_COLUMNS + [
+    'tags', 'is_virtual', 'price', 'text_content', 'start_time', 'end_time', 'location', 'latitude', 'longitude',
+    'images_count', 'curation_score'
+]
+DEFAULT_PRICE = 0.0
+DEFAULT_CURATION_SCORE = 0.5
+
+# Keyset pagination over the primary key; uuid_send() returns the raw 16 bytes.
+# The catalog has no curation scores, so they fall back to DEFAULT_CURATION_SCORE.
+# ``condition`` selects the published events, or every event changed since a time.
+EVENTS_QUERY = """
+    SELECT uuid_send(e.id) AS id, e.title, e.long_description AS description, e.short_description,
+           c.name AS category, e.tags, NULLIF(TRIM(CONCAT(u.first_name, ' ', u.last_name)), '') AS organizer_name,
+           e.venue_name, jsonb_build_object('city', e.venue_city) AS location,
+           e.venue_latitude::float8 AS latitude, e.venue_longitude::float8 AS longitude,
+           e.is_virtual, e.base_price::float8 AS price, e.start_time, e.end_time,
+           CASE WHEN jsonb_typeof(e.images) = 'array' THEN jsonb_array_length(e.images) ELSE 0 END AS images_count,
+           e.status = 'published' AS is_published
+    FROM events e
+    LEFT JOIN event_categories c ON c.id = e.category_id
+    LEFT JOIN users u ON u.id = e.organizer_id
+    WHERE {condition} AND e.end_time >= :ended_after AND e.id > CAST(:after AS uuid)
+    ORDER BY e.id
+    LIMIT :page_size
+"""
+PUBLISHED_CONDITION = "e.status = 'published'"
+CHANGED_CONDITION = "e.updated_at >= :updated_since"
+
+
+def event_frame(events: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Normalised frame of raw event dicts (API payloads, stream messages)"""
+    frame = pd.DataFrame.from_records(list(events))
+    if 'images_count' not in frame:
+        images = frame['images'] if 'images' in frame else pd.Series([None] * len(frame), index=frame.index)
+        frame['images_count'] = [len(value) if isinstance(value, list) else 0 for value in images]
+    return normalize_event_frame(frame)
+
+
+def normalize_event_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Fill missing columns and nulls with the feature defaults"""
+    frame = frame.reset_index(drop=True)
+    
+    def column(name: str) -> pd.Series:
+        return frame[name] if name in frame else pd.Series([None] * len(frame), dtype=object)
+    
+    for name in TEXT_COLUMNS:
+        frame[name] = column(name).fillna('').astype(str)
+    frame['tags'] = [value if isinstance(value, list) else list(value) if isinstance(value, tuple) else []
+                     for value in column('tags')]
+    frame['location'] = [value if isinstance(value, dict) else {} for value in column('location')]
+    frame['is_virtual'] = column('is_virtual').fillna(False).astype(bool)
+    frame['price'] = pd.to_numeric(column('price'), errors='coerce').fillna(DEFAULT_PRICE)
+    frame['curation_score'] = pd.to_numeric(column('curation_score'), errors='coerce').fillna(DEFAULT_CURATION_SCORE)
+    frame['images_count'] = pd.to_numeric(column('images_count'), errors='coerce').fillna(0).astype(int)
+    
+    # Venue coordinates come as columns (database rows) or inside ``location`` (API payloads); NaN if unknown
+    for name in ('latitude', 'longitude'):
+        nested = pd.Series([location.get(name) for location in frame['location']], dtype=object)
+        frame[name] = pd.to_numeric(column(name).astype(object).fillna(nested), errors='coerce').astype(float)
+    
+    for name in ('start_time', 'end_time'):
+        values = column(name).astype(object)
+        frame[name] = values.where(values.notna(), None)
+    return frame
+
+
+def _repeated(values: pd.Series, times: int) -> pd.Series:
+    """``times`` space-terminated copies of each non-empty value"""
+    return ((values + ' ') * times).where(values != '', '')
+
+
+def combine_text(frame: pd.DataFrame) -> pd.Series:
+    """Text embedded for each event, title and category/tags weighted by repetition"""
+    combined = (
+        _repeated(frame['title'], 3)
+        + _repeated(frame['description'], 1)
+        + _repeated(frame['short_description'], 1)
+        + _repeated(frame['category'], 2)
+        + _repeated(frame['tags'].str.join(' ').fillna(''), 2)
+        + _repeated(frame['organizer_name'], 1)
+        + _repeated(frame['venue_name'], 1)
+    )
+    return combined.str[:-1]
+
+
+def frame_features(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Per-event feature dicts (combined text included) of a normalised frame"""
+    return frame.assign(text_content=combine_text(frame))[FEATURE_COLUMNS].to_dict('records')
+
+
+def load_event_pages(page_size: Optional[int] = None,
+                     updated_since: Optional[datetime] = None) -> Iterator[pd.DataFrame]:
+    """Published events from Postgres, one normalised frame per page
+    
+    Pages are fetched by primary-key keyset, so each is a short indexed
+    query and only one page of raw rows is held at a time. ``id`` holds raw
+    16-byte UUIDs. Events that ended more than
+    ``CATALOG_PAST_EVENT_RETENTION_HOURS`` ago are skipped. With
+    ``updated_since``, every event changed since then is returned instead,
+    ``is_published`` telling whether it is still in the catalog.
+    """
+    page_size = page_size or settings.CONTENT_TRAINING_PAGE_SIZE
+    ended_after = datetime.now(timezone.utc) - timedelta(hours=settings.CATALOG_PAST_EVENT_RETENTION_HOURS)
+    query = text(EVENTS_QUERY.format(
+        condition=PUBLISHED_CONDITION if updated_since is None else CHANGED_CONDITION
+    ))
+    after = UUID(int=0)
+    n_events = 0
+    
+    while True:
+        with get_engine().connect() as conn:
+            result = conn.execute(query, {
+                'after': str(after), 'ended_after': ended_after, 'page_size': page_size,
+                'updated_since': updated_since
+            })
+            frame = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+        
+        if frame.empty:
+            return
+        
+        frame['id'] = np.frombuffer(b''.join(frame['id']), dtype=UUID_DTYPE)
+        after = UUID(bytes=frame['id'].iloc[-1].ljust(16, b'\0'))
+        n_events += len(frame)
+        logger.info(f"Loaded {n_events} events")
+        
+        yield normalize_event_frame(frame)
+        if len(frame) < page_size:
+            return
\ No newline at end of file
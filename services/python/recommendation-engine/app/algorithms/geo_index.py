@@ -0,0 +1,146 @@
+"""In-memory geospatial grid index over event venues"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to each of ``latitudes``/``longitudes``"""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoGridIndex:
+    """Event rows bucketed into a fixed latitude/longitude grid
+    
+    Entries are sorted by cell key ``lat_cell * n_lon_cells + lon_cell``, so
+    the cells of one grid row across a longitude range form a contiguous
+    slice found by binary search. A radius query scans one or two slices per
+    grid row it touches and filters them by great-circle distance. Events
+    without coordinates are not indexed. Updates return a new index, so
+    requests in flight keep a consistent one.
+    """
+    
+    def __init__(self, cell_degrees: float = 0.1):
+        self.cell_degrees = cell_degrees
+        self.n_lat_cells = math.ceil(180.0 / cell_degrees)
+        self.n_lon_cells = math.ceil(360.0 / cell_degrees)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.latitudes = np.zeros(0, dtype=np.float64)
+        self.longitudes = np.zeros(0, dtype=np.float64)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def build(self, latitudes: np.ndarray, longitudes: np.ndarray) -> None:
+        """Index every row with coordinates; NaN marks an event without a location"""
+        self._set(*self._entries(np.arange(len(latitudes)), latitudes, longitudes))
+    
+    def updated(self, rows: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray) -> "GeoGridIndex":
+        """Copy with the entries of ``rows`` replaced by the given coordinates"""
+        kept = ~np.isin(self.rows, rows)
+        keys, new_rows, new_latitudes, new_longitudes = self._entries(np.asarray(rows, dtype=np.int64),
+                                                                       latitudes, longitudes)
+        positions = np.searchsorted(self.keys[kept], keys)
+        
+        index = GeoGridIndex(self.cell_degrees)
+        index._set(
+            np.insert(self.keys[kept], positions, keys),
+            np.insert(self.rows[kept], positions, new_rows),
+            np.insert(self.latitudes[kept], positions, new_latitudes),
+            np.insert(self.longitudes[kept], positions, new_longitudes)
+        )
+        return index
+    
+    def removed(self, rows: np.ndarray) -> "GeoGridIndex":
+        """Copy without ``rows``, the remaining rows renumbered as when they are deleted in order"""
+        rows = np.unique(rows)
+        kept = ~np.isin(self.rows, rows)
+        
+        index = GeoGridIndex(self.cell_degrees)
+        index._set(
+            self.keys[kept],
+            self.rows[kept] - np.searchsorted(rows, self.rows[kept]),
+            self.latitudes[kept],
+            self.longitudes[kept]
+        )
+        return index
+    
+    def within(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """``(rows, distances_km)`` of events within ``radius_km``, nearest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        lat_low, lat_high = max(latitude - lat_span, -90.0), min(latitude + lat_span, 90.0)
+        
+        # Degrees of longitude shrink towards the poles; use the widest span in the band
+        cos_lat = math.cos(math.radians(max(abs(lat_low), abs(lat_high))))
+        lon_span = 180.0 if cos_lat < 1e-9 else min(180.0, lat_span / cos_lat)
+        
+        lat_cells = np.arange(self._lat_cell(lat_low), self._lat_cell(lat_high) + 1, dtype=np.int64)
+        lower, upper = np.array(self._lon_ranges(longitude - lon_span, longitude + lon_span)).T
+        starts = np.searchsorted(self.keys, (lat_cells[:, np.newaxis] * self.n_lon_cells + lower).ravel(), 'left')
+        stops = np.searchsorted(self.keys, (lat_cells[:, np.newaxis] * self.n_lon_cells + upper).ravel(), 'right')
+        
+        entries = np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+        distances = haversine_km(latitude, longitude, self.latitudes[entries], self.longitudes[entries])
+        inside = distances <= radius_km
+        entries, distances = entries[inside], distances[inside]
+        
+        order = np.argsort(distances, kind='stable')
+        return self.rows[entries[order]], distances[order]
+    
+    def nearest(self, latitude: float, longitude: float, k: int, max_radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """``(rows, distances_km)`` of the ``k`` nearest events within ``max_radius_km``
+        
+        The search radius starts at one cell and doubles until ``k`` events
+        are inside it; every event closer than the k-th is then inside too.
+        """
+        radius = min(self.cell_degrees * KM_PER_DEGREE, max_radius_km)
+        while True:
+            rows, distances = self.within(latitude, longitude, radius)
+            if len(rows) >= k or radius >= max_radius_km:
+                return rows[:k], distances[:k]
+            radius = min(2 * radius, max_radius_km)
+    
+    def _entries(self, rows: np.ndarray, latitudes: np.ndarray,
+                 longitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Sorted ``(keys, rows, latitudes, longitudes)`` of the rows with valid coordinates"""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        valid = (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+        
+        latitudes, longitudes, rows = latitudes[valid], longitudes[valid], rows[valid]
+        keys = self._lat_cell(latitudes) * self.n_lon_cells + self._lon_cell(longitudes)
+        order = np.argsort(keys, kind='stable')
+        return keys[order], rows[order], latitudes[order], longitudes[order]
+    
+    def _set(self, keys: np.ndarray, rows: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray):
+        self.keys = keys
+        self.rows = rows
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+    
+    def _lat_cell(self, latitude):
+        return np.minimum(np.floor((np.asarray(latitude) + 90.0) / self.cell_degrees),
+                          self.n_lat_cells - 1).astype(np.int64)
+    
+    def _lon_cell(self, longitude):
+        return np.floor((np.asarray(longitude) + 180.0) / self.cell_degrees).astype(np.int64) % self.n_lon_cells
+    
+    def _lon_ranges(self, low: float, high: float) -> List[Tuple[int, int]]:
+        """Inclusive longitude cell ranges covering ``[low, high]``, split at the antimeridian"""
+        first = int(math.floor((low + 180.0) / self.cell_degrees))
+        last = int(math.floor((high + 180.0) / self.cell_degrees))
+        if last - first + 1 >= self.n_lon_cells:
+            return [(0, self.n_lon_cells - 1)]
+        if first < 0:
+            return [(first + self.n_lon_cells, self.n_lon_cells - 1), (0, last)]
+        if last >= self.n_lon_cells:
+            return [(first, self.n_lon_cells - 1), (0, last - self.n_lon_cells)]
+        return [(first, last)]
\ No newline at end of file
@@ -1,9 +1,12 @@
 """Hybrid recommendation algorithm combining multiple approaches"""
+import copy
 import logging
+import time
 import numpy as np
-from typing import Dict, List, Optional, Any
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Set, Tuple
 from uuid import UUID
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from app.config import get_settings
@@ -13,6 +16,11 @@ from app.models.recommendation import (
 )
 from app.algorithms.collaborative_filtering import CollaborativeFilteringRecommender
 from app.algorithms.content_based import ContentBasedRecommender
+from app.algorithms.interaction_data import user_interaction_ratings
+from app.algorithms.leaderboards import GLOBAL_SEGMENT, DecayedLeaderboards
+from app.algorithms.slates import SlateStore
+from app.training import TrainingExecutor
+from app.utils.result_cache import RecommendationCache, cache_field
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -24,6 +32,27 @@ class HybridRecommender:
     def __init__(self):
         self.collaborative_recommender = CollaborativeFilteringRecommender()
         self.content_recommender = ContentBasedRecommender()
+        self.training_executor = TrainingExecutor()
+        self.training_task: Optional[asyncio.Task] = None
+        self.scoring_executor = ThreadPoolExecutor(max_workers=settings.PARALLEL_WORKERS,
+                                                   thread_name_prefix="scoring")
+        self.expired_event_ids: Set[UUID] = set()
+        # Serialises every change to the model instances (stream updates, expiry, hot swaps)
+        self.model_update_lock = asyncio.Lock()
+        self.result_cache = RecommendationCache()
+        self.slate_store = SlateStore()
+        self.trending_leaderboards = DecayedLeaderboards(
+            settings.TRENDING_HALF_LIFE_HOURS,
+            settings.TRENDING_TOP_N,
+            settings.LEADERBOARD_SKETCH_WIDTH,
+            settings.LEADERBOARD_SKETCH_DEPTH
+        )
+        self.popularity_leaderboards = DecayedLeaderboards(
+            settings.POPULARITY_HALF_LIFE_HOURS,
+            settings.POPULARITY_TOP_N,
+            settings.LEADERBOARD_SKETCH_WIDTH,
+            settings.LEADERBOARD_SKETCH_DEPTH
+        )
         self.model_version = "1.0.0"
         self.is_initialized = False
         
@@ -32,6 +61,7 @@ class HybridRecommender:
             'collaborative': settings.COLLABORATIVE_WEIGHT,
             'content': settings.CONTENT_WEIGHT,
             'popularity': settings.POPULARITY_WEIGHT,
+            'trending': settings.TRENDING_WEIGHT,
             'diversity': settings.DIVERSITY_WEIGHT
         }
         
@@ -50,12 +80,18 @@ class HybridRecommender:
         logger.info("Initializing hybrid recommender...")
         
         try:
-            # Initialize content-based recommender
-            await self.content_recommender.initialize()
+            # Initialize content-based recommender; its model is loaded below
+            self.content_recommender.setup_encoders()
             
             # Load existing models if available
             await self.collaborative_recommender.load_model()
             await self.content_recommender.load_model()
+            async with self.model_update_lock:
+                await self._update_copy('collaborative_recommender', self._catch_up_interactions)
+                await self._update_copy('content_recommender', self._catch_up_catalog)
+            if settings.ENABLE_PRECOMPUTED_SLATES:
+                await self.slate_store.load_model()
+            self.reset_popularity()
             
             self.is_initialized = True
             logger.info("Hybrid recommender initialized successfully")
@@ -67,10 +103,41 @@ class HybridRecommender:
     async def get_recommendations(self, request: RecommendationRequest,
                                 user_preferences: Dict[str, Any],
                                 user_interactions: List[Dict[str, Any]]) -> RecommendationResponse:
-        """Generate hybrid recommendations"""
+        """Generate hybrid recommendations, reusing a cached response while the inputs are unchanged"""
         if not self.is_initialized:
             await self.initialize()
         
+        if not settings.RESULT_CACHE_ENABLED:
+            return await self._generate_recommendations(request, user_preferences, user_interactions)
+        
+        return await self.result_cache.get_or_compute(
+            request.user_id,
+            self._cache_field(request, user_preferences, user_interactions),
+            lambda: self._generate_recommendations(request, user_preferences, user_interactions)
+        )
+    
+    def _cache_field(self, request: RecommendationRequest, user_preferences: Dict[str, Any],
+                     user_interactions: List[Dict[str, Any]]) -> str:
+        """Cache key of a request within its user's entries
+        
+        Covers every request option, the model versions serving it and the
+        user's preferences and latest interaction, so a response is only
+        reused for the same inputs even before an invalidation arrives.
+        """
+        location = request.location and (round(request.location['latitude'], 3),
+                                          round(request.location['longitude'], 3))
+        return cache_field(
+            request.context, request.algorithm, request.count, request.filters or {},
+            sorted(map(str, request.exclude_events)), request.include_past_events, location,
+            request.diversity_factor, request.explanation_level,
+            self.model_version, self.collaborative_recommender.artifact_version,
+            self.content_recommender.artifact_version, self.slate_store.artifact_version,
+            user_preferences, len(user_interactions), user_interactions[-1] if user_interactions else None
+        )
+    
+    async def _generate_recommendations(self, request: RecommendationRequest,
+                                        user_preferences: Dict[str, Any],
+                                        user_interactions: List[Dict[str, Any]]) -> RecommendationResponse:
         start_time = datetime.now()
         logger.info(f"Generating hybrid recommendations for user {request.user_id}")
         
@@ -78,20 +145,26 @@ class HybridRecommender:
             # Determine user type for algorithm selection
             user_type = self._determine_user_type(user_interactions)
             
-            # Get recommendations from different algorithms
-            recommendations_by_algorithm = await self._get_multi_algorithm_recommendations(
-                request, user_preferences, user_interactions, user_type
-            )
-            
-            # Combine recommendations using hybrid approach
-            hybrid_recommendations = await self._combine_recommendations(
-                recommendations_by_algorithm, request, user_type
-            )
-            
-            # Apply diversity and exploration
-            final_recommendations = await self._apply_diversity_and_exploration(
-                hybrid_recommendations, request
-            )
+            # Re-rank the user's precomputed slate when there is one for this request
+            final_recommendations = await self._get_slate_recommendations(request, user_interactions)
+            if final_recommendations is not None:
+                recommendations_by_algorithm = {'hybrid': final_recommendations}
+                timed_out = []
+            else:
+                # Get recommendations from different algorithms
+                recommendations_by_algorithm, timed_out = await self._get_multi_algorithm_recommendations(
+                    request, user_preferences, user_interactions, user_type
+                )
+                
+                # Combine recommendations using hybrid approach
+                hybrid_recommendations = await self._combine_recommendations(
+                    recommendations_by_algorithm, request, user_type
+                )
+                
+                # Apply diversity and exploration
+                final_recommendations = await self._apply_diversity_and_exploration(
+                    hybrid_recommendations, request
+                )
             
             # Calculate metadata
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -112,7 +185,8 @@ class HybridRecommender:
                 model_version=self.model_version,
                 user_profile_completeness=user_profile_completeness,
                 cold_start_user=user_type == 'cold_start',
-                fallback_used=len(user_interactions) < settings.MIN_INTERACTIONS_FOR_CF
+                fallback_used=len(user_interactions) < settings.MIN_INTERACTIONS_FOR_CF,
+                timed_out_algorithms=timed_out
             )
             
             logger.info(f"Generated {len(final_recommendations)} hybrid recommendations "
@@ -124,94 +198,113 @@ class HybridRecommender:
             logger.error(f"Failed to generate hybrid recommendations: {e}")
             raise
     
+    async def _get_slate_recommendations(self, request: RecommendationRequest,
+                                         user_interactions: List[Dict[str, Any]]
+                                         ) -> Optional[List[RecommendationItem]]:
+        """Recommendations from the user's precomputed slate; ``None`` to score online instead
+        
+        Only plain hybrid requests - no location, no past events - are served
+        from slates. Events excluded by the request, interacted with since the
+        slate was built, ended or not matching the filters are dropped before
+        diversity and exploration are applied; if fewer than ``request.count``
+        remain, the request is scored online.
+        """
+        if (not settings.ENABLE_PRECOMPUTED_SLATES or request.location or request.include_past_events
+                or request.algorithm not in (None, RecommendationAlgorithm.HYBRID)):
+            return None
+        
+        slate = self.slate_store.get(request.user_id)
+        if not slate:
+            return None
+        
+        seen_events = [interaction['event_id'] for interaction in user_interactions]
+        recommendations = self.content_recommender.get_ranked_events(
+            slate, request.count * 2, RecommendationAlgorithm.HYBRID, "Recommended for you",
+            request.exclude_events + seen_events, request.filters
+        )
+        if len(recommendations) < request.count:
+            return None
+        
+        return await self._apply_diversity_and_exploration(recommendations, request)
+    
     async def _get_multi_algorithm_recommendations(self, request: RecommendationRequest,
                                                  user_preferences: Dict[str, Any],
                                                  user_interactions: List[Dict[str, Any]],
-                                                 user_type: str) -> Dict[str, List[RecommendationItem]]:
-        """Get recommendations from multiple algorithms"""
-        recommendations = {}
-        
-        # Convert interactions for collaborative filtering
-        cf_interactions = [
-            UserInteraction(
-                user_id=UUID(interaction['user_id']),
-                event_id=UUID(interaction['event_id']),
-                interaction_type=interaction['interaction_type'],
-                rating=interaction.get('rating')
-            )
-            for interaction in user_interactions
-        ]
+                                                 user_type: str) -> Tuple[Dict[str, List[RecommendationItem]],
+                                                                          List[str]]:
+        """Get recommendations from every applicable algorithm concurrently
+        
+        Collaborative and content scoring run on the scoring thread pool, the
+        in-memory sources on the event loop. Each algorithm has
+        ``ALGORITHM_TIMEOUT_SECONDS``; one that misses it contributes nothing
+        and is returned in the list of timed-out algorithms.
+        """
+        # Pin the models for this request; updates and hot swaps replace the instances, never modify them
+        collaborative_recommender = self.collaborative_recommender
+        content_recommender = self.content_recommender
+        model_count = min(request.count * 2, 50)  # Get more than needed for diversity
+        
+        algorithms: Dict[str, Optional[Awaitable[List[RecommendationItem]]]] = {
+            'collaborative': None,
+            'content': None,
+            'popularity': self._get_popularity_recommendations(request, min(request.count, 20))
+        }
         
         # Collaborative Filtering (if user has enough interactions)
-        if user_type != 'cold_start' and self.collaborative_recommender.is_trained:
-            try:
-                cf_recs = await self.collaborative_recommender.get_recommendations(
-                    request.user_id, 
-                    min(request.count * 2, 50),  # Get more than needed for diversity
-                    request.exclude_events
-                )
-                recommendations['collaborative'] = cf_recs
-                logger.info(f"Got {len(cf_recs)} collaborative filtering recommendations")
-            except Exception as e:
-                logger.warning(f"Collaborative filtering failed: {e}")
-                recommendations['collaborative'] = []
-        else:
-            recommendations['collaborative'] = []
-        
-        # Content-Based Filtering
-        if self.content_recommender.is_trained:
-            try:
-                content_recs = await self.content_recommender.get_recommendations(
-                    request.user_id,
-                    user_preferences,
-                    user_interactions,
-                    min(request.count * 2, 50),
-                    request.exclude_events
-                )
-                recommendations['content'] = content_recs
-                logger.info(f"Got {len(content_recs)} content-based recommendations")
-            except Exception as e:
-                logger.warning(f"Content-based filtering failed: {e}")
-                recommendations['content'] = []
-        else:
-            recommendations['content'] = []
+        if user_type != 'cold_start' and collaborative_recommender.is_trained:
+            algorithms['collaborative'] = self._run_scorer(lambda: collaborative_recommender.recommend(
+                request.user_id, model_count, request.exclude_events
+            ))
         
-        # Popularity-based (fallback)
-        try:
-            popularity_recs = await self._get_popularity_recommendations(
-                request, min(request.count, 20)
-            )
-            recommendations['popularity'] = popularity_recs
-            logger.info(f"Got {len(popularity_recs)} popularity-based recommendations")
-        except Exception as e:
-            logger.warning(f"Popularity-based recommendations failed: {e}")
-            recommendations['popularity'] = []
+        if content_recommender.is_trained:
+            algorithms['content'] = self._run_scorer(lambda: content_recommender.recommend(
+                request.user_id,
+                user_preferences,
+                user_interactions,
+                model_count,
+                request.exclude_events,
+                request.include_past_events,
+                request.location
+            ))
         
-        # Location-based (if location provided)
         if request.location and settings.ENABLE_LOCATION_BASED:
-            try:
-                location_recs = await self._get_location_based_recommendations(
-                    request, min(request.count, 15)
-                )
-                recommendations['location'] = location_recs
-                logger.info(f"Got {len(location_recs)} location-based recommendations")
-            except Exception as e:
-                logger.warning(f"Location-based recommendations failed: {e}")
-                recommendations['location'] = []
+            algorithms['location'] = self._get_location_based_recommendations(request, min(request.count, 15))
         
-        # Trending events (if enabled)
         if settings.ENABLE_TRENDING_BOOST:
-            try:
-                trending_recs = await self._get_trending_recommendations(
-                    request, min(request.count // 2, 10)
-                )
-                recommendations['trending'] = trending_recs
-                logger.info(f"Got {len(trending_recs)} trending recommendations")
-            except Exception as e:
-                logger.warning(f"Trending recommendations failed: {e}")
-                recommendations['trending'] = []
+            algorithms['trending'] = self._get_trending_recommendations(request, min(request.count // 2, 10))
+        
+        names = list(algorithms)
+        results = await asyncio.gather(*(self._with_deadline(name, algorithms[name]) for name in names))
         
-        return recommendations
+        recommendations = {name: recs for name, (recs, _) in zip(names, results)}
+        timed_out = [name for name, (_, missed) in zip(names, results) if missed]
+        return recommendations, timed_out
+    
+    def _run_scorer(self, scorer: Callable[[], List[RecommendationItem]]) -> asyncio.Future:
+        """Run a model's (CPU-bound) synchronous scorer on the scoring thread pool"""
+        return asyncio.get_running_loop().run_in_executor(self.scoring_executor, scorer)
+    
+    @staticmethod
+    async def _with_deadline(name: str, recommendations: Optional[Awaitable[List[RecommendationItem]]]
+                             ) -> Tuple[List[RecommendationItem], bool]:
+        """``(recommendations, timed_out)`` of one algorithm; failures and timeouts yield no items
+        
+        A scorer running on a thread can't be interrupted; after a timeout it
+        finishes in the background and its result is dropped.
+        """
+        if recommendations is None:
+            return [], False
+        
+        try:
+            recs = await asyncio.wait_for(recommendations, timeout=settings.ALGORITHM_TIMEOUT_SECONDS)
+            logger.info(f"Got {len(recs)} {name} recommendations")
+            return recs, False
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} recommendations missed the {settings.ALGORITHM_TIMEOUT_SECONDS}s deadline")
+            return [], True
+        except Exception as e:
+            logger.warning(f"{name} recommendations failed: {e}")
+            return [], False
     
     async def _combine_recommendations(self, recommendations_by_algorithm: Dict[str, List[RecommendationItem]],
                                      request: RecommendationRequest, user_type: str) -> List[RecommendationItem]:
@@ -488,24 +581,55 @@ class HybridRecommender:
     
     async def _get_popularity_recommendations(self, request: RecommendationRequest,
                                             count: int) -> List[RecommendationItem]:
-        """Get popularity-based recommendations as fallback"""
-        # This would typically query the database for most popular events
-        # For now, return empty list - would be implemented with actual data access
-        return []
+        """Most popular events over the past weeks, from the in-memory leaderboards"""
+        segment, label = self._leaderboard_segment(request)
+        
+        # Over-fetch so the list is still full once ended and excluded events are dropped
+        ranked = self.popularity_leaderboards.top(segment, 2 * count + len(request.exclude_events))
+        return self.content_recommender.get_ranked_events(
+            ranked, count, RecommendationAlgorithm.POPULARITY_BASED,
+            f"Popular {label}" if label else "Popular event among all users", request.exclude_events
+        )
     
     async def _get_location_based_recommendations(self, request: RecommendationRequest,
                                                 count: int) -> List[RecommendationItem]:
-        """Get location-based recommendations"""
-        # This would use geolocation to find nearby events
-        # For now, return empty list - would be implemented with actual data access
-        return []
+        """Upcoming events nearest to the request location, from the in-memory geo index"""
+        return await self.content_recommender.get_nearby_events(
+            request.location['latitude'],
+            request.location['longitude'],
+            count,
+            exclude_events=request.exclude_events
+        )
     
     async def _get_trending_recommendations(self, request: RecommendationRequest,
                                           count: int) -> List[RecommendationItem]:
-        """Get trending/viral events"""
-        # This would identify events with high recent engagement
-        # For now, return empty list - would be implemented with actual data access
-        return []
+        """Events with the most decayed recent engagement, from the in-memory trending slates"""
+        segment, label = self._leaderboard_segment(request)
+        
+        ranked = self.trending_leaderboards.top(segment, 2 * count + len(request.exclude_events))
+        return self.content_recommender.get_ranked_events(
+            ranked, count, RecommendationAlgorithm.TRENDING,
+            f"Trending {label}" if label else "Trending now", request.exclude_events
+        )
+    
+    @staticmethod
+    def _leaderboard_segment(request: RecommendationRequest) -> Tuple[Tuple[str, str], Optional[str]]:
+        """Leaderboard segment selected by the request filters and its label for explanations
+        
+        A ``category``, ``city`` or ``is_virtual`` filter selects that
+        segment, in that order; otherwise the global one is served.
+        """
+        filters = request.filters or {}
+        for kind in ('category', 'city'):
+            if isinstance(filters.get(kind), str) and filters[kind]:
+                return (kind, filters[kind].lower()), f"in {filters[kind]}"
+        
+        if isinstance(filters.get('is_virtual'), bool):
+            if filters['is_virtual']:
+                return ('format', 'virtual'), "among virtual events"
+            return ('format', 'in_person'), "among in-person events"
+        
+        return GLOBAL_SEGMENT, None
     
     def _calculate_profile_completeness(self, preferences: Dict[str, Any],
                                        interactions: List[Dict[str, Any]]) -> float:
@@ -559,19 +683,21 @@ class HybridRecommender:
         
         return algorithm_mapping.get(dominant_alg, RecommendationAlgorithm.HYBRID)
     
-    async def train_models(self, events_data: List[Dict[str, Any]], 
-                          interactions_data: List[UserInteraction]):
-        """Train all recommendation models"""
+    async def train_models(self, events_data: Optional[List[Dict[str, Any]]], 
+                          interactions_data: Optional[List[UserInteraction]] = None):
+        """Train all recommendation models and swap them in
+        
+        Training runs in a separate process, so requests keep being served by
+        the current models until the new versions are published and loaded.
+        Without ``interactions_data`` collaborative filtering streams the whole
+        ``user_interactions`` table from the database, and without
+        ``events_data`` the content model pages through the published events.
+        """
         logger.info("Training hybrid recommendation models...")
         
         try:
-            # Train collaborative filtering if enough interactions
-            if len(interactions_data) >= settings.MIN_INTERACTIONS_FOR_CF:
-                await self.collaborative_recommender.train(interactions_data)
-            
-            # Train content-based filtering
-            if events_data:
-                await self.content_recommender.train(events_data)
+            await self.training_executor.run(events_data, interactions_data)
+            await self.reload_models()
             
             logger.info("Hybrid recommendation models trained successfully")
             
@@ -579,13 +705,268 @@ class HybridRecommender:
             logger.error(f"Failed to train models: {e}")
             raise
     
+    def start_training(self, events_data: List[Dict[str, Any]],
+                       interactions_data: Optional[List[UserInteraction]] = None) -> bool:
+        """Start ``train_models`` in the background; ``False`` if a job is already running"""
+        if self.training_task is not None and not self.training_task.done():
+            return False
+        
+        self.training_task = asyncio.create_task(self._train_in_background(events_data, interactions_data))
+        return True
+    
+    async def _train_in_background(self, events_data: List[Dict[str, Any]],
+                                   interactions_data: Optional[List[UserInteraction]]):
+        try:
+            await self.train_models(events_data, interactions_data)
+        except Exception:
+            # Nothing awaits this task; the failure is also reported through get_training_status()
+            logger.exception("Background model training failed")
+    
+    def get_training_status(self) -> Dict[str, Any]:
+        """State, stage and progress of the current (or last) training job"""
+        return self.training_executor.get_status()
+    
+    async def process_interactions(self, interactions: List[UserInteraction]):
+        """Apply a batch of streamed interactions to the models and the leaderboards
+        
+        The users' cached recommendations are dropped whether or not the
+        models learn in real time, since their history is a request input.
+        """
+        self.record_leaderboards(interactions)
+        
+        if settings.ENABLE_REAL_TIME_LEARNING:
+            async with self.model_update_lock:
+                if self.collaborative_recommender.is_trained:
+                    await self._update_copy(
+                        'collaborative_recommender',
+                        lambda collaborative_recommender: collaborative_recommender.update_interactions(interactions)
+                    )
+        
+        user_ids = {interaction.user_id for interaction in interactions}
+        self.content_recommender.invalidate_user_profiles(user_ids)
+        await self.result_cache.invalidate(user_ids)
+    
+    async def refresh_similar_users(self) -> int:
+        """Apply the users folded in since the last refresh to the collaborative similar-users table"""
+        async with self.model_update_lock:
+            if not len(self.collaborative_recommender.stale_neighbour_users):
+                return 0
+            return await self._update_copy(
+                'collaborative_recommender',
+                lambda collaborative_recommender: collaborative_recommender.refresh_user_neighbours()
+            )
+    
+    def record_leaderboards(self, interactions: List[UserInteraction]):
+        """Count interactions towards popularity and trending, weighted by their implicit rating"""
+        event_ids = [interaction.event_id for interaction in interactions]
+        ratings = user_interaction_ratings(interactions)
+        segments = self.content_recommender.event_segments(event_ids)
+        
+        self.popularity_leaderboards.record(event_ids, ratings, segments)
+        if settings.ENABLE_TRENDING_BOOST:
+            self.trending_leaderboards.record(event_ids, ratings, segments)
+    
+    def reset_popularity(self):
+        """Restart the popularity leaderboards from the collaborative model's rating totals
+        
+        The model keeps no interaction times, so its totals count as of now;
+        interactions streamed afterwards are added as they arrive.
+        """
+        collaborative_recommender = self.collaborative_recommender
+        if collaborative_recommender.event_popularity is None:
+            return
+        
+        event_ids = collaborative_recommender.event_registry.decode(
+            np.arange(len(collaborative_recommender.event_popularity))
+        )
+        self.popularity_leaderboards.reset(
+            event_ids,
+            collaborative_recommender.event_popularity,
+            self.content_recommender.event_segments(event_ids)
+        )
+        logger.info(f"Rebuilt popularity leaderboards over {len(event_ids)} events")
+    
+    async def process_preference_updates(self, user_ids: List[UUID]):
+        """Drop cached recommendations of users whose preferences changed"""
+        await self.result_cache.invalidate(user_ids)
+    
+    async def process_event_changes(self, upserted_events: List[Dict[str, Any]], removed_event_ids: List[UUID]):
+        """Apply a batch of streamed catalog changes to the content-based model
+        
+        Changes arriving before the first training run are skipped; that run
+        reads the whole catalog anyway.
+        """
+        if not self.content_recommender.is_trained:
+            return
+        
+        async def apply(content_recommender: ContentBasedRecommender):
+            if removed_event_ids:
+                await content_recommender.remove_events(removed_event_ids)
+            if upserted_events:
+                await content_recommender.upsert_events(upserted_events)
+        
+        async with self.model_update_lock:
+            await self._update_copy('content_recommender', apply)
+    
+    async def expire_events(self) -> Dict[str, int]:
+        """Evict events that have ended from both models
+        
+        Ended events stay servable to ``include_past_events`` requests for
+        ``CATALOG_PAST_EVENT_RETENTION_HOURS`` before they are dropped.
+        Collaborative filtering has no event times, so it drops the events
+        the content model has reported as ended, including ones a streamed
+        interaction brought back since the last sweep. An ID is forgotten once
+        the collaborative model no longer holds it.
+        """
+        # Every serving process sweeps its own models
+        async with self.model_update_lock:
+            ended = self.content_recommender.ended_event_ids(
+                time.time() - settings.CATALOG_PAST_EVENT_RETENTION_HOURS * 3600
+            )
+            self.expired_event_ids.update(ended)
+            self.popularity_leaderboards.remove(ended)
+            self.trending_leaderboards.remove(ended)
+            
+            expired_event_ids = list(self.expired_event_ids)
+            present = self.collaborative_recommender.event_registry.encode(expired_event_ids) >= 0
+            expired_event_ids = [event_id for event_id, keep in zip(expired_event_ids, present.tolist()) if keep]
+            
+            removed = {
+                'content_based': await self._update_copy(
+                    'content_recommender', lambda content_recommender: content_recommender.remove_events(ended)
+                ),
+                'collaborative': await self._update_copy(
+                    'collaborative_recommender',
+                    lambda collaborative_recommender: collaborative_recommender.remove_events(expired_event_ids)
+                )
+            }
+            # Kept only while a fold-in may still have to be undone by the next sweep
+            self.expired_event_ids = set(expired_event_ids)
+        
+        if any(removed.values()):
+            logger.info(f"Evicted ended events: {removed}")
+        
+        return removed
+    
+    async def reload_models(self) -> Dict[str, bool]:
+        """Hot-swap any model that has a newer published artifact version
+        
+        Each new version is loaded into a fresh instance off the event loop and
+        then swapped in with a single reference assignment. Requests already in
+        flight keep the instance they started with, so they finish on the old
+        version while new requests see the new one. A new collaborative version
+        first folds in the interactions recorded since it was trained, and a new
+        content version the catalog changes.
+        """
+        reloaded = {'collaborative': False, 'content_based': False, 'slates': False}
+        
+        if self._has_newer_version(self.collaborative_recommender):
+            candidate = CollaborativeFilteringRecommender()
+            if await self._load_in_background(candidate):
+                # Under the lock no streamed interaction can land on the outgoing instance and be lost
+                async with self.model_update_lock:
+                    await self._catch_up_interactions(candidate)
+                    await self._drop_swept_events(candidate)
+                    self.collaborative_recommender = candidate
+                reloaded['collaborative'] = True
+        
+        if self._has_newer_version(self.content_recommender):
+            candidate = ContentBasedRecommender()
+            # The encoders are stateless across versions; share them instead of reloading
+            candidate.embedding_service = self.content_recommender.embedding_service
+            candidate.text_vectorizer = self.content_recommender.text_vectorizer
+            if await self._load_in_background(candidate):
+                # Under the lock no streamed change can land on the outgoing instance and be lost
+                async with self.model_update_lock:
+                    await self._catch_up_catalog(candidate)
+                    self.content_recommender = candidate
+                reloaded['content_based'] = True
+        
+        if settings.ENABLE_PRECOMPUTED_SLATES and self._has_newer_version(self.slate_store):
+            candidate = SlateStore()
+            if await self._load_in_background(candidate):
+                self.slate_store = candidate
+                reloaded['slates'] = True
+        
+        if any(reloaded.values()):
+            logger.info(f"Swapped in new model versions: {reloaded}")
+            if reloaded['collaborative']:
+                self.reset_popularity()
+            if reloaded['collaborative'] or reloaded['content_based']:
+                await self.expire_events()
+        
+        return reloaded
+    
+    @staticmethod
+    def _has_newer_version(recommender) -> bool:
+        version = recommender.artifact_store.current_version()
+        return version is not None and version != recommender.artifact_version
+    
+    async def _update_copy(self, attribute: str, update: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Run ``update`` on a shallow copy of a model instance, then swap the copy in
+        
+        Callers hold ``model_update_lock``. Model updates assign new objects
+        instead of changing shared ones in place, so requests in flight keep
+        reading a consistent instance; if ``update`` fails nothing is swapped.
+        """
+        candidate = copy.copy(getattr(self, attribute))
+        result = await update(candidate)
+        setattr(self, attribute, candidate)
+        return result
+    
+    async def _drop_swept_events(self, candidate: CollaborativeFilteringRecommender):
+        """Remove from a new collaborative version the events the serving one has swept
+        
+        Training reads the whole interaction history, so ended events come
+        back with every version. While streamed interactions are folded in,
+        the serving instance holds every event of the new snapshot that has
+        not been swept, so the ones it lacks are dropped.
+        """
+        outgoing = self.collaborative_recommender
+        if not outgoing.is_trained or not settings.ENABLE_REAL_TIME_LEARNING:
+            return
+        
+        swept = outgoing.event_registry.encode(candidate.event_registry.ids) < 0
+        if swept.any():
+            await candidate.remove_events(candidate.event_registry.decode(np.flatnonzero(swept)))
+    
+    @staticmethod
+    async def _catch_up_interactions(collaborative_recommender: CollaborativeFilteringRecommender):
+        """Fold in interactions recorded since the loaded version was trained; skipped if the database is down
+        
+        Only with real-time learning, which is what folds them into the serving model in the first place.
+        """
+        if not settings.ENABLE_REAL_TIME_LEARNING:
+            return
+        try:
+            await collaborative_recommender.catch_up_interactions()
+        except Exception as e:
+            logger.error(f"Failed to catch up the collaborative filtering interactions: {e}")
+    
+    @staticmethod
+    async def _catch_up_catalog(content_recommender: ContentBasedRecommender):
+        """Apply catalog changes made since the loaded version was trained; skipped if the database is down"""
+        try:
+            await content_recommender.catch_up_catalog()
+        except Exception as e:
+            logger.error(f"Failed to catch up the content-based catalog: {e}")
+    
+    @staticmethod
+    async def _load_in_background(recommender) -> bool:
+        """Run ``recommender.load()`` on a worker thread (index builds are CPU-bound)"""
+        return await asyncio.to_thread(recommender.load)
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about all models"""
         return {
             "hybrid": {
                 "version": self.model_version,
                 "weights": self.weights,
-                "performance": self.algorithm_performance
+                "performance": self.algorithm_performance,
+                "training": self.training_executor.get_status(),
+                "popularity": self.popularity_leaderboards.get_stats(),
+                "trending": self.trending_leaderboards.get_stats(),
+                "slates": self.slate_store.get_stats()
             },
             "collaborative": self.collaborative_recommender.get_model_info(),
             "content_based": self.content_recommender.get_model_info()
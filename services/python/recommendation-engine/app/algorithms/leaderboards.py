@@ -0,0 +1,249 @@
+"""Segmented event leaderboards over exponentially decayed interaction counts"""
+import heapq
+import math
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+# Segment of every event; the others are ('category', name), ('city', name) and ('format', name)
+GLOBAL_SEGMENT = ('all', '')
+
+# Rebase the decay landmark before growth factors leave comfortable float64 range
+MAX_LANDMARK_EXPONENT = 30.0
+
+
+def uuid_keys(event_ids: Sequence[UUID]) -> np.ndarray:
+    """64-bit sketch keys of event IDs: the two halves of the UUID xor-ed together"""
+    ints = [event_id.int for event_id in event_ids]
+    return np.array([(value >> 64) ^ (value & 0xFFFFFFFFFFFFFFFF) for value in ints], dtype=np.uint64)
+
+
+class CountMinSketch:
+    """Count-min sketch of non-negative weights with conservative updates
+    
+    ``depth`` rows of ``width`` counters (a power of two), each row indexed
+    by multiply-shift hashing of 64-bit keys. An estimate is the minimum
+    over the rows, so it never undercounts; conservative updates only raise
+    a counter as far as the key's new estimate, which keeps collisions from
+    inflating it further.
+    """
+    
+    def __init__(self, width: int, depth: int, seed: int = 0):
+        if width & (width - 1):
+            raise ValueError("Sketch width must be a power of two")
+        
+        self.shift = np.uint64(64 - width.bit_length() + 1)
+        self.multipliers = np.random.default_rng(seed).integers(
+            0, 2 ** 63, size=depth, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((depth, width), dtype=np.float64)
+    
+    def add(self, keys: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Add ``weights`` to unique ``keys``; returns their new estimates"""
+        columns = self._columns(keys)
+        rows = np.arange(len(self.table))[:, np.newaxis]
+        estimates = self.table[rows, columns].min(axis=0) + weights
+        np.maximum.at(self.table, (np.broadcast_to(rows, columns.shape), columns), estimates)
+        return estimates
+    
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        return self.table[np.arange(len(self.table))[:, np.newaxis], self._columns(keys)].min(axis=0)
+    
+    def scale(self, factor: float) -> None:
+        self.table *= factor
+    
+    def _columns(self, keys: np.ndarray) -> np.ndarray:
+        return (keys[np.newaxis, :] * self.multipliers[:, np.newaxis]) >> self.shift
+
+
+class TopN:
+    """The ``n`` highest-scoring keys, with a lazily pruned min-heap for eviction
+    
+    A key's score only ever grows, so the heap holds a stale entry for
+    every earlier score of a key; they are skipped when they reach the top
+    and compacted away once they outnumber the live ones.
+    """
+    
+    def __init__(self, n: int):
+        self.n = n
+        self.scores: Dict[Hashable, float] = {}
+        self.heap: List[Tuple[float, Hashable]] = []
+    
+    def __len__(self) -> int:
+        return len(self.scores)
+    
+    def get(self, key: Hashable) -> Optional[float]:
+        return self.scores.get(key)
+    
+    def offer(self, key: Hashable, score: float) -> bool:
+        """Set ``key``'s score if it is, or now belongs, in the top ``n``; ``True`` if it is"""
+        if key not in self.scores and len(self.scores) >= self.n:
+            if score <= self._min_score():
+                return False
+            del self.scores[heapq.heappop(self.heap)[1]]
+        
+        self.scores[key] = score
+        heapq.heappush(self.heap, (score, key))
+        if len(self.heap) > 4 * self.n:
+            self._compact()
+        return True
+    
+    def discard(self, key: Hashable) -> bool:
+        return self.scores.pop(key, None) is not None
+    
+    def assign(self, scores: Dict[Hashable, float]) -> None:
+        """Replace the contents with at most ``n`` scores"""
+        self.scores = scores
+        self._compact()
+    
+    def ranked(self) -> List[Tuple[Hashable, float]]:
+        """``(key, score)`` pairs, highest score first"""
+        return sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+    
+    def scale(self, factor: float) -> None:
+        self.scores = {key: score * factor for key, score in self.scores.items()}
+        self._compact()
+    
+    def _min_score(self) -> float:
+        while self.scores.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0]
+    
+    def _compact(self):
+        self.heap = [(score, key) for key, score in self.scores.items()]
+        heapq.heapify(self.heap)
+
+
+class DecayedLeaderboards:
+    """Exponentially time-decayed interaction counts and top-N slates per segment
+    
+    Counts use forward decay: an interaction of weight ``w`` at time ``t``
+    adds ``w * exp(rate * (t - landmark))``, and the decayed count at
+    ``now`` is the sum divided by ``exp(rate * (now - landmark))``. Stored
+    values never need decaying in place, and since every count shares the
+    divisor, the order of events changes only when they are counted.
+    
+    Every event is counted in a count-min sketch, so the long tail costs
+    fixed memory. Only the top ``top_n`` events of each segment - globally,
+    per category, city and format - hold an exact counter: an event is admitted
+    with its sketch estimate once that beats the segment's smallest count,
+    then counted exactly while it stays in. Ranked slates are refreshed
+    after each batch, so serving one is a dictionary lookup.
+    """
+    
+    def __init__(self, half_life_hours: float, top_n: int, sketch_width: int, sketch_depth: int,
+                 now: Optional[float] = None):
+        self.rate = math.log(2) / (half_life_hours * 3600.0)
+        self.top_n = top_n
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.landmark = time.time() if now is None else now
+        self.sketch = CountMinSketch(sketch_width, sketch_depth)
+        self.segments: Dict[Tuple[str, str], TopN] = {}
+        self.slates: Dict[Tuple[str, str], List[Tuple[UUID, float]]] = {}
+        self.n_interactions = 0
+    
+    def record(self, event_ids: Sequence[UUID], weights: Sequence[float],
+               segments: Sequence[Iterable[Tuple[str, str]]], now: Optional[float] = None) -> None:
+        """Count a batch of interactions at ``now``
+        
+        ``segments[i]`` are the segments of ``event_ids[i]`` besides the
+        global one.
+        """
+        if not event_ids:
+            return
+        
+        now = time.time() if now is None else now
+        self._rebase(now)
+        growth = math.exp(self.rate * (now - self.landmark))
+        
+        unique_ids, first, inverse = np.unique(uuid_keys(event_ids), return_index=True, return_inverse=True)
+        increments = np.bincount(inverse.ravel(), weights=np.asarray(weights, dtype=np.float64)) * growth
+        estimates = self.sketch.add(unique_ids, increments)
+        
+        dirty = set()
+        for position, increment, estimate in zip(first.tolist(), increments.tolist(), estimates.tolist()):
+            event_id = event_ids[position]
+            for segment in (GLOBAL_SEGMENT, *segments[position]):
+                top = self.segments.get(segment)
+                if top is None:
+                    top = self.segments[segment] = TopN(self.top_n)
+                
+                current = top.get(event_id)
+                if top.offer(event_id, estimate if current is None else current + increment):
+                    dirty.add(segment)
+        
+        for segment in dirty:
+            self.slates[segment] = self.segments[segment].ranked()
+        self.n_interactions += len(event_ids)
+    
+    def reset(self, event_ids: Sequence[UUID], weights: Sequence[float],
+              segments: Sequence[Iterable[Tuple[str, str]]], now: Optional[float] = None) -> None:
+        """Replace every count with ``weights`` recorded at ``now`` (e.g. a trained model's totals)
+        
+        Each segment's top events are picked by one sort rather than offered
+        one at a time, and the new state is swapped in at the end.
+        """
+        now = time.time() if now is None else now
+        sketch = CountMinSketch(self.sketch_width, self.sketch_depth)
+        
+        unique_ids, first, inverse = np.unique(uuid_keys(event_ids), return_index=True, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=np.asarray(weights, dtype=np.float64), minlength=len(first))
+        sketch.add(unique_ids, totals)
+        
+        positions = first.tolist()
+        members: Dict[Tuple[str, str], List[int]] = {GLOBAL_SEGMENT: list(range(len(positions)))}
+        for unique, position in enumerate(positions):
+            for segment in segments[position]:
+                members.setdefault(segment, []).append(unique)
+        
+        tops: Dict[Tuple[str, str], TopN] = {}
+        for segment, uniques in members.items():
+            uniques = np.array(uniques, dtype=np.int64)
+            best = uniques[np.argsort(-totals[uniques], kind='stable')[:self.top_n]]
+            tops[segment] = TopN(self.top_n)
+            tops[segment].assign({event_ids[positions[unique]]: float(totals[unique]) for unique in best.tolist()})
+        
+        self.landmark = now
+        self.sketch = sketch
+        self.segments = tops
+        self.slates = {segment: top.ranked() for segment, top in tops.items()}
+        self.n_interactions = len(event_ids)
+    
+    def top(self, segment: Tuple[str, str] = GLOBAL_SEGMENT, count: Optional[int] = None,
+            now: Optional[float] = None) -> List[Tuple[UUID, float]]:
+        """``(event_id, decayed_count)`` of a segment's top events, highest first"""
+        slate = self.slates.get(segment, [])[:count]
+        now = time.time() if now is None else now
+        decay = math.exp(-self.rate * (now - self.landmark))
+        return [(event_id, score * decay) for event_id, score in slate]
+    
+    def remove(self, event_ids: Iterable[UUID]) -> None:
+        """Drop events from every slate; later interactions can bring them back"""
+        event_ids = set(event_ids)
+        for segment, top in self.segments.items():
+            if any([top.discard(event_id) for event_id in event_ids]):
+                self.slates[segment] = top.ranked()
+    
+    def _rebase(self, now: float):
+        """Move the landmark to ``now`` once growth factors get large, rescaling every count"""
+        exponent = self.rate * (now - self.landmark)
+        if exponent < MAX_LANDMARK_EXPONENT:
+            return
+        
+        factor = math.exp(-exponent)
+        self.sketch.scale(factor)
+        for top in self.segments.values():
+            top.scale(factor)
+        self.slates = {segment: [(event_id, score * factor) for event_id, score in slate]
+                       for segment, slate in self.slates.items()}
+        self.landmark = now
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'interactions': self.n_interactions,
+            'segments': len(self.segments),
+            'tracked_events': len(self.segments.get(GLOBAL_SEGMENT, ()))
+        }
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""Precomputed top-K cosine neighbour tables"""
+import copy
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length float32 rows; all-zero rows stay zero"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def blocked_top_k(queries: np.ndarray, corpus: np.ndarray, k: int,
+                  query_offset: Optional[int] = 0, block_size: int = 1024,
+                  n_workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-``k`` inner products of each query row against ``corpus``
+    
+    See ``blocked_top_k_scores``; the queries are scored with one matrix
+    multiply per block.
+    """
+    return blocked_top_k_scores(
+        lambda start, stop: queries[start:stop] @ corpus.T,
+        len(queries), len(corpus), k, query_offset=query_offset,
+        block_size=block_size, n_workers=n_workers
+    )
+
+
+def blocked_top_k_scores(score_block: Callable[[int, int], np.ndarray], n_queries: int,
+                         n_corpus: int, k: int, query_offset: Optional[int] = 0,
+                         block_size: int = 1024, n_workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-``k`` corpus rows for each query under an arbitrary score
+    
+    ``score_block(start, stop)`` returns the ``(stop - start, n_corpus)``
+    scores of queries ``start..stop``. Queries are processed in blocks of
+    ``block_size`` rows (one scoring call plus ``argpartition`` each) spread
+    over a thread pool. When the queries are themselves corpus rows starting
+    at ``query_offset``, each row is excluded from its own results; pass
+    ``None`` for external queries. Returns ``(indices, scores)`` of shape
+    ``(n_queries, k)`` ordered by descending score, padded with ``-1``/``-inf``
+    when the corpus is smaller.
+    """
+    indices = np.full((n_queries, k), -1, dtype=np.int32)
+    scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+    
+    available = n_corpus - (query_offset is not None)
+    width = min(k, max(available, 0))
+    if not n_queries or width <= 0:
+        return indices, scores
+    
+    def solve_block(start: int):
+        stop = min(start + block_size, n_queries)
+        block_scores = np.asarray(score_block(start, stop), dtype=np.float32)
+        
+        if query_offset is not None:
+            rows = np.arange(stop - start)
+            block_scores[rows, query_offset + start + rows] = -np.inf
+        
+        top = np.argpartition(-block_scores, width - 1, axis=1)[:, :width]
+        top_scores = np.take_along_axis(block_scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        
+        indices[start:stop, :width] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop, :width] = np.take_along_axis(top_scores, order, axis=1)
+    
+    with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+        list(executor.map(solve_block, range(0, n_queries, block_size)))
+    
+    return indices, scores
+
+
+class NeighbourTable:
+    """Top-K most similar rows for every row of a factor matrix
+    
+    Similarities are cosines, built with ``blocked_top_k`` over normalised
+    vectors so a lookup is an O(K) row read instead of a scan of every row.
+    ``update`` keeps the table current when a few vectors change.
+    ``build_with``/``update_with`` do the same for any similarity function,
+    and ``remove_with`` drops rows.
+    """
+    
+    def __init__(self, k: int = 50, block_size: int = 1024, n_workers: int = 1):
+        self.k = k
+        self.block_size = block_size
+        self.n_workers = n_workers
+        self.indices = None
+        self.scores = None
+        self.norms = None
+    
+    def __len__(self) -> int:
+        return 0 if self.indices is None else len(self.indices)
+    
+    def build(self, vectors: np.ndarray) -> None:
+        """Compute neighbours for every row of ``vectors``"""
+        self.norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+        normalized = normalize_rows(vectors)
+        self.indices, self.scores = blocked_top_k(
+            normalized, normalized, self.k, query_offset=0,
+            block_size=self.block_size, n_workers=self.n_workers
+        )
+        logger.info(f"Built top-{self.k} neighbour table over {len(normalized)} rows")
+    
+    def build_with(self, n_rows: int, similarities: Callable[[np.ndarray], np.ndarray]) -> None:
+        """Compute neighbours under ``similarities(rows)``, which returns the
+        ``(len(rows), n_rows)`` similarities of ``rows`` to every row"""
+        self.norms = None
+        self.indices, self.scores = blocked_top_k_scores(
+            lambda start, stop: similarities(np.arange(start, stop)),
+            n_rows, n_rows, self.k, query_offset=0,
+            block_size=self.block_size, n_workers=self.n_workers
+        )
+        logger.info(f"Built top-{self.k} neighbour table over {n_rows} rows")
+    
+    def load(self, indices: np.ndarray, scores: np.ndarray) -> None:
+        """Adopt a previously built table (e.g. memory-mapped from an artifact)"""
+        self.indices = indices
+        self.scores = scores
+        self.norms = None
+        self.k = indices.shape[1]
+    
+    def copy(self) -> "NeighbourTable":
+        """Table with private arrays, to update while this one keeps serving"""
+        table = copy.copy(self)
+        table.indices = np.array(self.indices)
+        table.scores = np.array(self.scores)
+        if self.norms is not None:
+            table.norms = np.array(self.norms)
+        return table
+    
+    def neighbours(self, row: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Up to ``count`` ``(indices, scores)`` for one row, best first"""
+        indices = self.indices[row, :count]
+        valid = indices >= 0
+        return indices[valid], self.scores[row, :count][valid]
+    
+    def update(self, rows: np.ndarray, vectors: np.ndarray, max_block_elements: int = 1 << 24) -> None:
+        """Refresh the table after ``vectors[rows]`` changed
+        
+        ``vectors`` is the full, current matrix; rows beyond the table's length
+        are new and are appended. Changed rows get exact neighbour lists. In
+        every other row, entries pointing at a changed row are rescored and a
+        changed row is inserted wherever it now beats the K-th neighbour. A
+        neighbour pushed out of a list by a rescore is not backfilled until the
+        next full build - the usual trade-off for incremental kNN graphs.
+        Changed rows are compared against the matrix in chunks of at most
+        ``max_block_elements`` similarities.
+        """
+        n_rows = len(vectors)
+        rows = self._prepare_update(rows, n_rows)
+        
+        if self.norms is None:
+            self.norms = np.linalg.norm(vectors, axis=1).astype(np.float32)
+        else:
+            self.norms = np.concatenate([self.norms, np.zeros(n_rows - len(self.norms), dtype=np.float32)])
+            self.norms[rows] = np.linalg.norm(vectors[rows], axis=1)
+        
+        def cosine_similarities(chunk: np.ndarray) -> np.ndarray:
+            scale = self.norms[chunk, np.newaxis] * self.norms[np.newaxis, :]
+            similarities = np.asarray(vectors[chunk] @ vectors.T, dtype=np.float32)
+            return np.divide(similarities, scale, out=np.zeros_like(similarities), where=scale > 0)
+        
+        self._refresh(rows, n_rows, cosine_similarities, max_block_elements)
+    
+    def update_with(self, rows: np.ndarray, n_rows: int, similarities: Callable[[np.ndarray], np.ndarray],
+                    max_block_elements: int = 1 << 24) -> None:
+        """``update`` for a table built with ``build_with``; the table grows to ``n_rows``"""
+        rows = self._prepare_update(rows, n_rows)
+        self._refresh(rows, n_rows, similarities, max_block_elements)
+    
+    def remove_with(self, rows: np.ndarray, similarities: Callable[[np.ndarray], np.ndarray],
+                    max_block_elements: int = 1 << 24) -> None:
+        """Drop ``rows`` and renumber the remaining rows in order
+        
+        Lists that pointed at a dropped row are recomputed exactly under
+        ``similarities``, which must already address the renumbered rows.
+        """
+        keep = np.ones(len(self), dtype=bool)
+        keep[rows] = False
+        
+        new_position = np.full(len(self) + 1, -1, dtype=np.int32)  # trailing slot maps -1 padding
+        new_position[np.flatnonzero(keep)] = np.arange(int(keep.sum()), dtype=np.int32)
+        
+        indices = self.indices[keep]
+        lost = (indices >= 0) & ~keep[indices]
+        self.indices = new_position[indices]
+        self.scores = np.where(lost, -np.inf, self.scores[keep]).astype(np.float32)
+        if self.norms is not None:
+            self.norms = self.norms[keep]
+        
+        affected = np.flatnonzero(lost.any(axis=1))
+        self._refresh(affected, len(self.indices), similarities, max_block_elements)
+    
+    def _prepare_update(self, rows: np.ndarray, n_rows: int) -> np.ndarray:
+        """Grow the table to ``n_rows``; returns the sorted changed rows, new rows included"""
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        n_new = n_rows - len(self)
+        
+        # Memory-mapped tables are read-only; take a private copy on first update
+        if n_new > 0:
+            self.indices = np.vstack([self.indices, np.full((n_new, self.k), -1, dtype=np.int32)])
+            self.scores = np.vstack([self.scores, np.full((n_new, self.k), -np.inf, dtype=np.float32)])
+            rows = np.union1d(rows, np.arange(n_rows - n_new, n_rows))
+        elif not self.indices.flags.writeable:
+            self.indices = np.array(self.indices)
+            self.scores = np.array(self.scores)
+        
+        return rows
+    
+    def _refresh(self, rows: np.ndarray, n_rows: int, similarities: Callable[[np.ndarray], np.ndarray],
+                 max_block_elements: int):
+        if not len(rows) or n_rows < 2:
+            return
+        
+        changed = np.zeros(n_rows + 1, dtype=bool)  # trailing slot absorbs -1 padding
+        changed[rows] = True
+        chunk_size = max(1, max_block_elements // n_rows)
+        
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            self._update_chunk(chunk, np.asarray(similarities(chunk), dtype=np.float32), changed)
+    
+    def _update_chunk(self, chunk: np.ndarray, similarities: np.ndarray, changed: np.ndarray):
+        n_rows = similarities.shape[1]
+        position = np.full(n_rows + 1, -1, dtype=np.int64)
+        position[chunk] = np.arange(len(chunk))
+        
+        similarities[np.arange(len(chunk)), chunk] = -np.inf
+        
+        # Exact lists for the changed rows themselves
+        width = min(self.k, n_rows - 1)
+        top = np.argpartition(-similarities, width - 1, axis=1)[:, :width]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        self.indices[chunk] = -1
+        self.scores[chunk] = -np.inf
+        self.indices[chunk, :width] = np.take_along_axis(top, order, axis=1)
+        self.scores[chunk, :width] = np.take_along_axis(top_scores, order, axis=1)
+        
+        # Rescore entries of unchanged rows that point at a row of this chunk
+        in_chunk = position >= 0
+        owners, slots = np.nonzero(in_chunk[self.indices])
+        keep = ~changed[owners]
+        owners, slots = owners[keep], slots[keep]
+        hits = position[self.indices[owners, slots]]
+        self.scores[owners, slots] = similarities[hits, owners]
+        
+        present = np.zeros(similarities.shape, dtype=bool)
+        present[hits, owners] = True
+        
+        # Insert chunk rows into unchanged rows where they beat the K-th neighbour
+        candidates = (similarities > self.scores[:, -1]) & ~present & ~changed[np.newaxis, :n_rows]
+        touched = np.union1d(owners, np.nonzero(candidates.any(axis=0))[0])
+        
+        for start in range(0, len(touched), self.block_size):
+            block = touched[start:start + self.block_size]
+            inserted = candidates[:, block].T
+            merged_indices = np.hstack([
+                self.indices[block], np.where(inserted, chunk[np.newaxis, :], -1).astype(np.int32)
+            ])
+            merged_scores = np.hstack([
+                self.scores[block], np.where(inserted, similarities[:, block].T, -np.inf)
+            ])
+            
+            order = np.argsort(-merged_scores, axis=1, kind='stable')[:, :self.k]
+            self.indices[block] = np.take_along_axis(merged_indices, order, axis=1)
+            self.scores[block] = np.take_along_axis(merged_scores, order, axis=1)
\ No newline at end of file
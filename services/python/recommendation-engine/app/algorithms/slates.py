@@ -0,0 +1,332 @@
+"""Offline top-N hybrid candidate slates for recently active users"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database import get_engine
+from app.algorithms.collaborative_filtering import CollaborativeFilteringRecommender
+from app.algorithms.content_based import ContentBasedRecommender
+from app.algorithms.neighbours import normalize_rows
+from app.utils.id_registry import IdLike, IdRegistry, UUID_DTYPE, to_uuid_array
+from app.utils.model_artifacts import ModelArtifactStore
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# uuid_send() returns the raw 16 bytes, so IDs never round-trip through text
+ACTIVE_USERS_QUERY = """
+    SELECT DISTINCT uuid_send(user_id)
+    FROM user_interactions
+    WHERE created_at >= :since
+"""
+
+# Scorer loaded once per builder process by ``_init_scorer``
+_worker_scorer: Optional["SlateScorer"] = None
+
+
+def load_active_user_ids(since: datetime) -> np.ndarray:
+    """``UUID_DTYPE`` ids of the users with an interaction since ``since``"""
+    with get_engine().connect() as conn:
+        rows = conn.execute(text(ACTIVE_USERS_QUERY), {'since': since}).fetchall()
+    return np.frombuffer(b''.join(row[0] for row in rows), dtype=UUID_DTYPE)
+
+
+class SlateScorer:
+    """Blended collaborative and content scores for blocks of users, batched as matrix products
+    
+    Collaborative scores are the predicted ratings of the published model,
+    content scores the cosine similarity to the user's interaction-weighted
+    history centroid, boosted for the categories in that history and scaled
+    by the time and curation multipliers of the online content scorer. Both
+    are min-max scaled per user and blended with ``COLLABORATIVE_WEIGHT`` and
+    ``CONTENT_WEIGHT``. Only upcoming events of the content catalog are
+    ranked, and events in the user's history are left out.
+    """
+    
+    def __init__(self, collaborative: CollaborativeFilteringRecommender, content: ContentBasedRecommender):
+        self.collaborative = collaborative
+        self.content = content
+        
+        # Collaborative columns of the events in the content catalog, and their content rows
+        content_rows = content.event_registry.encode(collaborative.event_registry.ids)
+        self.cf_columns = np.flatnonzero(content_rows >= 0)
+        self.content_rows = content_rows[self.cf_columns]
+        
+        feature_store = content.feature_store
+        # Category columns shifted by one; column 0 holds uncategorised events and is never preferred
+        self.category_columns = feature_store.category_codes.astype(np.int64) + 1
+        self.n_categories = int(self.category_columns.max(initial=0)) + 1
+        self.prior = (feature_store.time_relevance() * feature_store.curation_multipliers).astype(np.float32)
+        self.ended = feature_store.has_ended()
+        
+        norms = content.event_embeddings.norms
+        self.inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        
+        total_weight = settings.COLLABORATIVE_WEIGHT + settings.CONTENT_WEIGHT
+        self.collaborative_weight = settings.COLLABORATIVE_WEIGHT / total_weight
+        self.content_weight = settings.CONTENT_WEIGHT / total_weight
+        text_weight = settings.CATEGORY_WEIGHT + settings.DESCRIPTION_WEIGHT
+        self.category_weight = settings.CATEGORY_WEIGHT / text_weight
+        self.description_weight = settings.DESCRIPTION_WEIGHT / text_weight
+    
+    @classmethod
+    def load(cls) -> Optional["SlateScorer"]:
+        """Scorer over the published model versions; ``None`` until both exist"""
+        collaborative = CollaborativeFilteringRecommender()
+        content = ContentBasedRecommender()
+        if not collaborative.load() or not content.load():
+            return None
+        if content.event_embeddings is None:
+            return None
+        return cls(collaborative, content)
+    
+    @property
+    def versions(self) -> Dict[str, Optional[str]]:
+        return {
+            'collaborative': self.collaborative.artifact_version,
+            'content_based': self.content.artifact_version
+        }
+    
+    def score_users(self, user_ids: np.ndarray, slate_size: int,
+                    block_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(user_ids, event_ids, scores)`` of the users known to the collaborative model
+        
+        ``event_ids`` (``UUID_DTYPE``) and ``scores`` are ``(n_users, slate_size)``
+        and ordered by descending score; slates short of candidates are padded
+        with empty ids scoring ``-inf``.
+        """
+        user_indices = self.collaborative.user_registry.encode(user_ids)
+        known = user_indices >= 0
+        user_ids, user_indices = user_ids[known], user_indices[known]
+        
+        slate_rows = np.full((len(user_ids), slate_size), -1, dtype=np.int64)
+        slate_scores = np.full((len(user_ids), slate_size), -np.inf, dtype=np.float32)
+        for start in range(0, len(user_ids), block_size):
+            stop = start + block_size
+            rows, scores = self._score_block(user_indices[start:stop], slate_size)
+            slate_rows[start:stop, :rows.shape[1]] = rows
+            slate_scores[start:stop, :rows.shape[1]] = scores
+        
+        slate_rows[slate_scores == -np.inf] = -1
+        event_ids = np.where(slate_rows >= 0, self.content.event_registry.ids[slate_rows], b'')
+        return user_ids, event_ids.astype(UUID_DTYPE), slate_scores
+    
+    def _score_block(self, user_indices: np.ndarray, slate_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top ``slate_size`` content rows and blended scores for a block of collaborative users"""
+        collaborative = self.collaborative
+        n_users = len(user_indices)
+        
+        # History restricted to catalog events, as a users x content-rows matrix
+        history = collaborative.interaction_rows(user_indices)[:, self.cf_columns].tocsr()
+        history = csr_matrix((history.data, self.content_rows[history.indices], history.indptr),
+                             shape=(n_users, len(self.prior)))
+        
+        # Collaborative: predicted ratings of every catalog event in one matrix multiply
+        predicted = collaborative.user_factors[user_indices] @ collaborative.item_factors[self.cf_columns].T
+        predicted += collaborative.item_bias[self.cf_columns]
+        scores = np.zeros((n_users, len(self.prior)), dtype=np.float32)
+        scores[:, self.content_rows] = self.collaborative_weight * self._scale_rows(predicted)
+        
+        # Content: cosine similarity to the history centroid plus a boost for the history's categories
+        used, columns = np.unique(history.indices, return_inverse=True)
+        history = csr_matrix((history.data, columns.ravel(), history.indptr), shape=(n_users, len(used)))
+        centroids = normalize_rows(history @ normalize_rows(self.content.event_embeddings.rows(used)))
+        similarities = np.maximum(self.content.event_embeddings.dot(centroids.T).T * self.inverse_norms, 0.0)
+        
+        history_categories = csr_matrix(
+            (np.ones(history.nnz, dtype=np.float32), self.category_columns[used][history.indices], history.indptr),
+            shape=(n_users, self.n_categories)
+        ).toarray() > 0
+        history_categories[:, 0] = False
+        category_scores = np.where(history_categories[:, self.category_columns], 1.0, 0.1)
+        
+        content_scores = (self.description_weight * similarities + self.category_weight * category_scores) * self.prior
+        scores += self.content_weight * self._scale_rows(content_scores)
+        
+        # Mask ended events and each user's history
+        scores[:, self.ended] = -np.inf
+        scores[np.repeat(np.arange(n_users), np.diff(history.indptr)), used[history.indices]] = -np.inf
+        
+        return CollaborativeFilteringRecommender._select_top_k(scores, slate_size)
+    
+    @staticmethod
+    def _scale_rows(scores: np.ndarray) -> np.ndarray:
+        """Min-max scale each row to [0, 1]; constant rows become 0"""
+        low = scores.min(axis=1, keepdims=True)
+        spread = scores.max(axis=1, keepdims=True) - low
+        return np.divide(scores - low, spread, out=np.zeros_like(scores, dtype=np.float32), where=spread > 0)
+
+
+def _init_scorer():
+    global _worker_scorer
+    _worker_scorer = SlateScorer.load()
+
+
+def _score_shard(user_ids: np.ndarray, slate_size: int,
+                 block_size: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, Optional[str]]]]:
+    if _worker_scorer is None:
+        return None
+    return _worker_scorer.score_users(user_ids, slate_size, block_size) + (_worker_scorer.versions,)
+
+
+class SlateBuilder:
+    """Scores every recently active user offline and publishes the slates
+    
+    Users with an interaction in the last ``SLATE_ACTIVE_USER_DAYS`` days are
+    split into ``SLATE_SHARD_SIZE`` shards scored on ``SLATE_WORKERS``
+    spawned processes, each memory-mapping the published models once. With
+    no workers configured, or inside a daemonic process, shards are scored on
+    one background thread instead. The slates are published as a
+    ``recommendation_slates`` artifact version, which serving processes
+    memory-map through ``SlateStore``.
+    """
+    
+    def __init__(self, n_workers: Optional[int] = None):
+        self.n_workers = settings.SLATE_WORKERS if n_workers is None else n_workers
+        self.artifact_store = ModelArtifactStore("recommendation_slates")
+    
+    async def build(self, user_ids: Optional[Sequence[IdLike]] = None) -> Optional[str]:
+        """Score and publish slates for ``user_ids`` (the recently active users by default)
+        
+        Returns the published version, or ``None`` when there was nothing to
+        publish (no users, or no trained models yet).
+        """
+        if user_ids is None:
+            since = datetime.utcnow() - timedelta(days=settings.SLATE_ACTIVE_USER_DAYS)
+            user_ids = await asyncio.to_thread(load_active_user_ids, since)
+        user_ids = to_uuid_array(user_ids)
+        if not len(user_ids):
+            logger.info("No active users to build slates for")
+            return None
+        
+        started_at = time.time()
+        shards = [user_ids[start:start + settings.SLATE_SHARD_SIZE]
+                  for start in range(0, len(user_ids), settings.SLATE_SHARD_SIZE)]
+        
+        executor = self._create_executor(len(shards))
+        try:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, _score_shard, shard, settings.SLATE_SIZE, settings.SLATE_BLOCK_SIZE)
+                for shard in shards
+            ))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if any(result is None for result in results):
+            logger.info("Skipping slate build, the models are not trained yet")
+            return None
+        
+        version = await asyncio.to_thread(self._publish, results, started_at)
+        logger.info(f"Built slates for {sum(len(result[0]) for result in results)} users "
+                   f"in {time.time() - started_at:.1f}s")
+        return version
+    
+    def _create_executor(self, n_shards: int) -> Executor:
+        if self.n_workers > 0 and not multiprocessing.current_process().daemon:
+            return ProcessPoolExecutor(
+                max_workers=min(self.n_workers, n_shards),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_scorer
+            )
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="slates", initializer=_init_scorer)
+    
+    def _publish(self, results: List[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, Optional[str]]]],
+                 generated_at: float) -> str:
+        """Save the shard results as one artifact, events stored once and referenced by index"""
+        user_ids = np.concatenate([result[0] for result in results])
+        event_ids = np.concatenate([result[1] for result in results])
+        scores = np.concatenate([result[2] for result in results])
+        
+        unique_events, slate_events = np.unique(event_ids, return_inverse=True)
+        slate_events = slate_events.reshape(event_ids.shape).astype(np.int32)
+        slate_events[scores == -np.inf] = -1
+        if len(unique_events) and unique_events[0] == b'':
+            slate_events[slate_events >= 0] -= 1
+            unique_events = unique_events[1:]
+        
+        arrays = {
+            'user_ids': user_ids,
+            'event_ids': unique_events,
+            'slate_events': slate_events,
+            'slate_scores': np.where(scores == -np.inf, 0.0, scores).astype(np.float16)
+        }
+        metadata = {'generated_at': generated_at, 'model_versions': results[0][3]}
+        return self.artifact_store.save(arrays, metadata)
+
+
+class SlateStore:
+    """Published slates, memory-mapped and looked up by user
+    
+    Slates older than ``SLATE_MAX_AGE_SECONDS`` are not served; requests then
+    take the online scoring path.
+    """
+    
+    def __init__(self):
+        self.user_registry = IdRegistry()
+        self.event_registry = IdRegistry()
+        self.slate_events: Optional[np.ndarray] = None
+        self.slate_scores: Optional[np.ndarray] = None
+        self.generated_at = 0.0
+        self.artifact_store = ModelArtifactStore("recommendation_slates")
+        self.artifact_version = None
+    
+    async def load_model(self) -> bool:
+        """Load the published slates version; everything is built before it is swapped in"""
+        return self.load()
+    
+    def load(self) -> bool:
+        """Synchronous ``load_model``, for loader threads"""
+        try:
+            artifact = self.artifact_store.load()
+            if artifact is None:
+                logger.info("No published recommendation slates found")
+                return False
+            
+            user_registry = IdRegistry(artifact.arrays['user_ids'])
+            event_registry = IdRegistry(artifact.arrays['event_ids'])
+            
+            self.user_registry = user_registry
+            self.event_registry = event_registry
+            self.slate_events = artifact.arrays['slate_events']
+            self.slate_scores = artifact.arrays['slate_scores']
+            self.generated_at = artifact.metadata.get('generated_at', 0.0)
+            self.artifact_version = artifact.version
+            
+            logger.info(f"Recommendation slates version {artifact.version} loaded for {len(user_registry)} users")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to load recommendation slates: {e}")
+            return False
+    
+    def get(self, user_id: UUID) -> Optional[List[Tuple[UUID, float]]]:
+        """``(event_id, score)`` pairs of the user's slate, best first; ``None`` if there is none"""
+        if time.time() - self.generated_at > settings.SLATE_MAX_AGE_SECONDS:
+            return None
+        
+        row = self.user_registry.encode_one(user_id)
+        if row is None:
+            return None
+        
+        events = np.asarray(self.slate_events[row])
+        valid = events >= 0
+        return list(zip(self.event_registry.decode(events[valid]),
+                        np.asarray(self.slate_scores[row], dtype=np.float32)[valid].tolist()))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'artifact_version': self.artifact_version,
+            'n_users': len(self.user_registry),
+            'generated_at': datetime.utcfromtimestamp(self.generated_at) if self.generated_at else None
+        }
\ No newline at end of file
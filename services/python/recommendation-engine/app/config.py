@@ -30,16 +30,35 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_DECODE_RESPONSES: bool = True
     CACHE_TTL: int = 3600  # 1 hour
+    REDIS_SOCKET_TIMEOUT: float = 0.1  # Seconds; a slow Redis turns cache lookups into misses
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_SIZE: int = 50000  # Responses kept in process
+    RESULT_CACHE_FRESH_SECONDS: float = 300.0  # Older responses (up to CACHE_TTL) are served while refreshed
+    RESULT_CACHE_LOCAL_SECONDS: float = 30.0  # In-process copies are re-checked against Redis after this long
     
     # Kafka settings
     KAFKA_BOOTSTRAP_SERVERS: str = "localhost:9092"
     KAFKA_GROUP_ID: str = "recommendation-engine"
     KAFKA_AUTO_OFFSET_RESET: str = "earliest"
     KAFKA_ENABLE_AUTO_COMMIT: bool = True
+    KAFKA_BROADCAST_OFFSET_RESET: str = "latest"  # Broadcast topics are read from here on each start
+    KAFKA_USER_INTERACTIONS_TOPIC: str = "user-interactions"
+    KAFKA_EVENT_CREATED_TOPIC: str = "events.event.created"
+    KAFKA_EVENT_UPDATED_TOPIC: str = "events.event.updated"
+    KAFKA_EVENT_DELETED_TOPIC: str = "events.event.deleted"
+    KAFKA_USER_PREFERENCES_TOPIC: str = "users.preferences.updated"
     
     # ML Model settings
     MODEL_CACHE_DIR: str = "./models"
+    MODEL_ARTIFACT_KEEP_VERSIONS: int = 3  # Published versions kept on disk per model
+    MODEL_RELOAD_INTERVAL_SECONDS: float = 30.0  # How often workers check for a newer version
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    CONTENT_EMBEDDING_DTYPE: str = "float32"  # Stored event embeddings: float32, float16 or int8
+    EMBEDDING_WORKERS: int = 2  # Embedding processes; 0 encodes in-process on a background thread
+    EMBEDDING_TORCH_THREADS: int = 1  # torch intra-op threads per embedding worker
+    EMBEDDING_MAX_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_BATCH_CHARS: int = 32768  # Padded characters per length-sorted batch
+    EMBEDDING_MAX_PENDING_BATCHES: int = 8  # Batches in flight before embed_many callers wait
     
     # Recommendation algorithm settings
     DEFAULT_RECOMMENDATIONS_COUNT: int = 20
@@ -53,6 +72,26 @@ class Settings(BaseSettings):
     CF_REG_ALL: float = 0.02
     CF_MIN_RATING: int = 1
     CF_MAX_RATING: int = 5
+    CF_TRAINER: str = "nmf"  # "nmf" or "als" (implicit-feedback ALS)
+    CF_ALS_ITERATIONS: int = 15
+    CF_ALS_REGULARIZATION: float = 0.1
+    CF_ALS_ALPHA: float = 10.0  # Confidence = 1 + alpha * rating
+    CF_ALS_CG_STEPS: int = 3
+    CF_ALS_BLOCK_SIZE: int = 2048  # Rows per conjugate-gradient block
+    CF_BATCH_SCORING_SIZE: int = 1024  # Users scored per matrix multiply in batch requests
+    TRAINING_DATA_CHUNK_SIZE: int = 100000  # Interaction rows fetched per server-side cursor batch
+    TRAINING_STATUS_POLL_SECONDS: float = 0.5  # How often the server polls a background training job
+    CF_SIMILAR_USERS_K: int = 50  # Neighbours precomputed per user for similar-user lookups
+    CF_NEIGHBOUR_BLOCK_SIZE: int = 1024  # Users per matrix multiply when building the table
+    CF_NEIGHBOUR_REFRESH_INTERVAL_SECONDS: float = 300.0  # How often streamed users' neighbour lists are refreshed
+    
+    # Approximate nearest-neighbour index over CF item factors
+    CF_ANN_INDEX: str = "ivf"  # "ivf" or "exact"
+    CF_ANN_MIN_EVENTS: int = 10000  # Exact scoring below this catalog size
+    CF_ANN_N_LISTS: int = 0  # 0 = sqrt(number of events)
+    CF_ANN_N_PROBE: int = 16  # Lists scanned per query; higher = better recall, slower
+    CF_ANN_KMEANS_ITERATIONS: int = 10
+    CF_ANN_TRAIN_SAMPLE: int = 100000
     
     # Content-based filtering settings
     CONTENT_SIMILARITY_THRESHOLD: float = 0.3
@@ -60,11 +99,24 @@ class Settings(BaseSettings):
     TAG_WEIGHT: float = 0.25
     DESCRIPTION_WEIGHT: float = 0.25
     LOCATION_WEIGHT: float = 0.2
+    LOCATION_GRID_CELL_DEGREES: float = 0.1  # Geo index cell size (about 11 km of latitude)
+    LOCATION_SEARCH_RADIUS_KM: float = 50.0  # Radius searched for nearby events
+    LOCATION_DECAY_KM: float = 10.0  # Distance at which the nearby-event boost falls to 1/e
+    LOCATION_CANDIDATES: int = 500  # Nearest events added to the content candidates of located requests
+    CONTENT_PROFILE_CACHE_SIZE: int = 10000  # Users whose history embedding is kept between requests
+    CONTENT_SIMILAR_EVENTS_K: int = 50  # Neighbours precomputed per event for similar-event lookups
+    CONTENT_NEIGHBOUR_BLOCK_SIZE: int = 256  # Events per block when building the table
+    CONTENT_TRAINING_PAGE_SIZE: int = 5000  # Events read, featurised and embedded per training chunk
+    CONTENT_CANDIDATE_MIN_CATALOG: int = 5000  # Smaller catalogs are scored in full, without candidate generation
+    CONTENT_CANDIDATES_PER_KEY: int = 500  # Events taken per preferred category, tag, organizer or venue
+    CONTENT_CANDIDATE_BACKFILL: int = 200  # Top curated, upcoming events added to every candidate set
+    CONTENT_CANDIDATE_HISTORY_EVENTS: int = 20  # Recent history events whose similar events become candidates
     
     # Hybrid algorithm weights
     COLLABORATIVE_WEIGHT: float = 0.4
     CONTENT_WEIGHT: float = 0.35
     POPULARITY_WEIGHT: float = 0.15
+    TRENDING_WEIGHT: float = 0.1
     DIVERSITY_WEIGHT: float = 0.1
     
     # Deep learning settings
@@ -79,6 +131,19 @@ class Settings(BaseSettings):
     REAL_TIME_UPDATES: bool = True
     UPDATE_FREQUENCY_MINUTES: int = 30
     BATCH_SIZE: int = 1000
+    INTERACTION_STREAM_BATCH_SIZE: int = 500  # Streamed interactions folded in per batch
+    INTERACTION_STREAM_FLUSH_SECONDS: float = 2.0
+    CF_INTERACTION_DELTA_FRACTION: float = 0.05  # Folded-in ratings kept beside the interaction matrix up to this share
+    CATALOG_STREAM_BATCH_SIZE: int = 200  # Streamed event changes applied to the content model per batch
+    CATALOG_STREAM_FLUSH_SECONDS: float = 10.0
+    CATALOG_EXPIRY_INTERVAL_SECONDS: float = 900.0  # How often ended events are evicted from the models
+    CATALOG_PAST_EVENT_RETENTION_HOURS: float = 24.0  # Ended events stay servable to include_past_events this long
+    TRENDING_HALF_LIFE_HOURS: float = 6.0  # Age at which an interaction counts half towards trending
+    TRENDING_TOP_N: int = 100  # Events ranked per trending segment (global, category, city, format)
+    POPULARITY_HALF_LIFE_HOURS: float = 168.0  # Age at which an interaction counts half towards popularity
+    POPULARITY_TOP_N: int = 200  # Events ranked per popularity segment and in the cold-start fallback
+    LEADERBOARD_SKETCH_WIDTH: int = 65536  # Counters per count-min sketch row; a power of two
+    LEADERBOARD_SKETCH_DEPTH: int = 4
     
     # Cold start handling
     COLD_START_FALLBACK_ENABLED: bool = True
@@ -93,7 +158,15 @@ class Settings(BaseSettings):
     # Performance settings
     PARALLEL_WORKERS: int = 4
     MODEL_INFERENCE_TIMEOUT: int = 30
+    ALGORITHM_TIMEOUT_SECONDS: float = 2.0  # Budget of each algorithm within a hybrid request
     CACHE_WARM_UP: bool = True
+    SLATE_SIZE: int = 100  # Candidates precomputed per user for the slate path
+    SLATE_WORKERS: int = 2  # Slate scoring processes; 0 scores in-process on a background thread
+    SLATE_SHARD_SIZE: int = 5000  # Users per task handed to a slate scoring process
+    SLATE_BLOCK_SIZE: int = 64  # Users per matrix multiply within a shard
+    SLATE_ACTIVE_USER_DAYS: int = 14  # Users with an interaction this recent get a slate
+    SLATE_REFRESH_INTERVAL_SECONDS: float = 3600.0  # How often the slates are rebuilt
+    SLATE_MAX_AGE_SECONDS: float = 7200.0  # Older slates are ignored and requests scored online
     
     # A/B Testing settings
     AB_TESTING_ENABLED: bool = True
@@ -122,6 +195,7 @@ class Settings(BaseSettings):
     ENABLE_LOCATION_BASED: bool = True
     ENABLE_SOCIAL_RECOMMENDATIONS: bool = True
     ENABLE_TRENDING_BOOST: bool = True
+    ENABLE_PRECOMPUTED_SLATES: bool = False
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,49 @@
+"""Database access for model training jobs"""
+import logging
+from typing import Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Global engine, created on first use
+engine: Optional[Engine] = None
+
+
+def get_engine() -> Engine:
+    """Shared synchronous engine for bulk reads
+    
+    Training reads run in worker threads/processes and stream large result
+    sets through server-side cursors, which the synchronous psycopg2 driver
+    supports directly.
+    """
+    global engine
+    
+    if engine is None:
+        logger.info("Creating database engine...")
+        engine = create_engine(
+            settings.DATABASE_URL,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            echo=settings.DEBUG
+        )
+    
+    return engine
+
+
+def close_engine():
+    """Dispose of pooled connections"""
+    global engine
+    
+    try:
+        if engine is not None:
+            engine.dispose()
+            engine = None
+            logger.info("Database connections closed")
+    except Exception as e:
+        logger.error(f"Error closing database: {e}")
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""Kafka client for consuming platform event streams"""
+import json
+import logging
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from aiokafka import AIOKafkaConsumer
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MessageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class KafkaClient:
+    """Kafka client feeding recommendation models from platform topics
+    
+    Topics are consumed by one of two consumers. Shared topics use the
+    ``KAFKA_GROUP_ID`` consumer group, so each message reaches one process.
+    Broadcast topics are read without a group, every partition by every
+    process, starting at the latest offset. They carry the changes each
+    serving process applies to its own in-memory models.
+    """
+    
+    def __init__(self):
+        self.consumers: List[AIOKafkaConsumer] = []
+        self.handlers: Dict[str, List[MessageHandler]] = {}
+        self.broadcast_topics: Set[str] = set()
+        self.consume_tasks: List[asyncio.Task] = []
+        self.is_connected = False
+    
+    def subscribe(self, topic: str, handler: MessageHandler, broadcast: bool = False):
+        """Register a handler for decoded messages of a topic (before connect)
+        
+        With ``broadcast`` every process receives every message of the topic.
+        """
+        self.handlers.setdefault(topic, []).append(handler)
+        if broadcast:
+            self.broadcast_topics.add(topic)
+    
+    async def connect(self):
+        """Connect to Kafka and start consuming subscribed topics"""
+        if not self.handlers:
+            logger.info("No Kafka subscriptions registered, skipping connection")
+            return
+        
+        try:
+            shared_topics = [topic for topic in self.handlers if topic not in self.broadcast_topics]
+            logger.info(f"Connecting to Kafka, shared topics: {shared_topics}, "
+                       f"broadcast topics: {sorted(self.broadcast_topics)}")
+            
+            if shared_topics:
+                await self._start_consumer(shared_topics, settings.KAFKA_GROUP_ID,
+                                           settings.KAFKA_AUTO_OFFSET_RESET, settings.KAFKA_ENABLE_AUTO_COMMIT)
+            if self.broadcast_topics:
+                await self._start_consumer(sorted(self.broadcast_topics), None,
+                                           settings.KAFKA_BROADCAST_OFFSET_RESET, False)
+            
+            self.is_connected = True
+            logger.info("Kafka client connected successfully")
+            
+        except Exception as e:
+            logger.error(f"Failed to connect to Kafka: {e}")
+            await self.disconnect()
+            raise
+    
+    async def _start_consumer(self, topics: List[str], group_id: Optional[str],
+                              auto_offset_reset: str, enable_auto_commit: bool):
+        consumer = AIOKafkaConsumer(
+            *topics,
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=group_id,
+            auto_offset_reset=auto_offset_reset,
+            enable_auto_commit=enable_auto_commit,
+            value_deserializer=lambda x: x.decode('utf-8')
+        )
+        await consumer.start()
+        self.consumers.append(consumer)
+        self.consume_tasks.append(asyncio.create_task(self._consume_messages(consumer)))
+    
+    async def disconnect(self):
+        """Disconnect from Kafka"""
+        try:
+            for task in self.consume_tasks:
+                task.cancel()
+            await asyncio.gather(*self.consume_tasks, return_exceptions=True)
+            self.consume_tasks = []
+            
+            for consumer in self.consumers:
+                await consumer.stop()
+            self.consumers = []
+            
+            if self.is_connected:
+                self.is_connected = False
+                logger.info("Kafka client disconnected")
+        except Exception as e:
+            logger.error(f"Error disconnecting from Kafka: {e}")
+    
+    async def _consume_messages(self, consumer: AIOKafkaConsumer):
+        """Decode messages and dispatch them to the topic's handlers"""
+        while True:
+            try:
+                async for msg in consumer:
+                    try:
+                        message = json.loads(msg.value)
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"Skipping undecodable message on {msg.topic}: {e}")
+                        continue
+                    
+                    for handler in self.handlers.get(msg.topic, []):
+                        try:
+                            await handler(message)
+                        except Exception as e:
+                            logger.error(f"Handler error for topic {msg.topic}: {e}")
+                            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Kafka consumer error: {e}")
+                await asyncio.sleep(5)  # Wait before retrying
+
+
+# Global Kafka client instance
+kafka_client = KafkaClient()
+
+
+async def init_kafka():
+    """Initialize Kafka connection"""
+    await kafka_client.connect()
+
+
+async def close_kafka():
+    """Close Kafka connection"""
+    await kafka_client.disconnect()
\ No newline at end of file
@@ -89,7 +89,7 @@ class RecommendationRequest(BaseModel):
     location: Optional[Dict[str, float]] = None  # {"latitude": x, "longitude": y}
     filters: Optional[Dict[str, Any]] = Field(default_factory=dict)
     diversity_factor: Optional[float] = Field(None, ge=0.0, le=1.0)
-    explanation_level: str = Field(default="basic", regex="^(none|basic|detailed)$")
+    explanation_level: str = Field(default="basic", pattern="^(none|basic|detailed)$")
     
     @validator("location")
     def validate_location(cls, v):
@@ -133,7 +133,7 @@ class RecommendationItem(BaseModel):
     short_description: Optional[str] = None
     category: str
     tags: List[str] = Field(default_factory=list)
-    start_time: datetime
+    start_time: Optional[datetime] = None
     is_virtual: bool
     price: Optional[float] = None
     venue_name: Optional[str] = None
@@ -176,6 +176,7 @@ class RecommendationResponse(BaseModel):
     user_profile_completeness: float = Field(..., ge=0.0, le=1.0)
     cold_start_user: bool = False
     fallback_used: bool = False
+    timed_out_algorithms: List[str] = Field(default_factory=list)  # Left out for missing their deadline
     
     class Config:
         schema_extra = {
@@ -189,7 +190,8 @@ class RecommendationResponse(BaseModel):
                 "model_version": "1.0.0",
                 "user_profile_completeness": 0.75,
                 "cold_start_user": False,
-                "fallback_used": False
+                "fallback_used": False,
+                "timed_out_algorithms": []
             }
         }
 
@@ -335,7 +337,7 @@ class UserInteractionDB(Base):
     rating = Column(Integer)
     duration_seconds = Column(Integer)
     context = Column(String(50))
-    metadata = Column(JSON, default=dict)
+    interaction_metadata = Column("metadata", JSON, default=dict)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -348,7 +350,7 @@ class UserInteractionDB(Base):
             "rating": self.rating,
             "duration_seconds": self.duration_seconds,
             "context": self.context,
-            "metadata": self.metadata or {},
+            "metadata": self.interaction_metadata or {},
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
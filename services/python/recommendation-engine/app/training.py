@@ -0,0 +1,175 @@
+"""Out-of-process model training"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_settings
+from app.models.recommendation import UserInteraction
+from app.algorithms.collaborative_filtering import CollaborativeFilteringRecommender
+from app.algorithms.content_based import ContentBasedRecommender
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Share of overall progress attributed to each model when both are trained
+COLLABORATIVE_PROGRESS_SHARE = 0.7
+
+ProgressCallback = Callable[[str, float], None]
+
+
+def run_training_job(events_data: Optional[List[Dict[str, Any]]],
+                     interactions_data: Optional[List[UserInteraction]],
+                     progress_queue: multiprocessing.Queue):
+    """Training process entry point
+    
+    Trains fresh model instances and publishes them as new artifact versions;
+    serving processes pick them up from ``MODEL_CACHE_DIR``. Progress and the
+    final result are reported on ``progress_queue``.
+    """
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    
+    def report(stage: str, progress: float):
+        progress_queue.put({'stage': stage, 'progress': progress})
+    
+    try:
+        versions = asyncio.run(_train_models(events_data, interactions_data, report))
+        progress_queue.put({'stage': 'completed', 'progress': 1.0, 'versions': versions})
+    except Exception as e:
+        logger.error(f"Training job failed: {e}")
+        progress_queue.put({'stage': 'failed', 'error': str(e)})
+
+
+async def _train_models(events_data: Optional[List[Dict[str, Any]]],
+                        interactions_data: Optional[List[UserInteraction]],
+                        report: ProgressCallback) -> Dict[str, Optional[str]]:
+    versions = {'collaborative': None, 'content_based': None}
+    train_content = events_data is None or len(events_data) > 0
+    collaborative_share = COLLABORATIVE_PROGRESS_SHARE if train_content else 1.0
+    
+    def collaborative_progress(stage: str, progress: float):
+        report(stage, collaborative_share * progress)
+    
+    collaborative = CollaborativeFilteringRecommender()
+    report('training_collaborative', 0.0)
+    if interactions_data is None:
+        await collaborative.train_from_database(progress_callback=collaborative_progress)
+        versions['collaborative'] = collaborative.artifact_version
+    elif len(interactions_data) >= settings.MIN_INTERACTIONS_FOR_CF:
+        await collaborative.train(interactions_data, progress_callback=collaborative_progress)
+        versions['collaborative'] = collaborative.artifact_version
+    
+    if train_content:
+        report('training_content', collaborative_share)
+        content = ContentBasedRecommender()
+        # Trained from scratch, so the published version is not loaded first
+        content.setup_encoders()
+        if events_data is None:
+            await content.train_from_database()
+        else:
+            await content.train(events_data)
+        versions['content_based'] = content.artifact_version
+    
+    return versions
+
+
+class TrainingExecutor:
+    """Runs model training in a separate process and tracks its progress
+    
+    Only one job runs at a time. The event loop just polls the child for
+    progress messages, so serving is never blocked by training work.
+    """
+    
+    def __init__(self):
+        self.status = self._idle_status()
+    
+    @property
+    def is_running(self) -> bool:
+        return self.status['state'] == 'running'
+    
+    async def run(self, events_data: Optional[List[Dict[str, Any]]] = None,
+                  interactions_data: Optional[List[UserInteraction]] = None) -> Dict[str, Optional[str]]:
+        """Train in a child process and wait for it; returns the published versions"""
+        if self.is_running:
+            raise RuntimeError("A training job is already running")
+        
+        context = multiprocessing.get_context('spawn')
+        progress_queue = context.Queue()
+        process = context.Process(
+            target=run_training_job,
+            args=(events_data, interactions_data, progress_queue),
+            name="model-training",
+            daemon=True
+        )
+        
+        self.status = self._idle_status()
+        self.status.update({'state': 'running', 'stage': 'starting', 'started_at': datetime.utcnow()})
+        logger.info("Starting background model training")
+        
+        try:
+            process.start()
+            self.status['pid'] = process.pid
+            
+            while True:
+                self._drain(progress_queue)
+                if self.status['state'] != 'running' or not process.is_alive():
+                    break
+                await asyncio.sleep(settings.TRAINING_STATUS_POLL_SECONDS)
+            
+            await asyncio.to_thread(process.join)
+            self._drain(progress_queue)
+            
+            if self.status['state'] == 'running':
+                self.status.update({'state': 'failed', 'error': f"Training process exited with code {process.exitcode}"})
+                
+        except Exception as e:
+            self.status.update({'state': 'failed', 'error': str(e)})
+            if process.is_alive():
+                process.terminate()
+                
+        finally:
+            self.status['finished_at'] = datetime.utcnow()
+        
+        if self.status['state'] == 'failed':
+            logger.error(f"Background model training failed: {self.status['error']}")
+            raise RuntimeError(f"Model training failed: {self.status['error']}")
+        
+        logger.info(f"Background model training completed: {self.status['versions']}")
+        return self.status['versions']
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot of the current (or last) training job"""
+        return dict(self.status)
+    
+    def _drain(self, progress_queue: multiprocessing.Queue):
+        """Apply every progress message the child has sent so far"""
+        while True:
+            try:
+                message = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            
+            stage = message['stage']
+            self.status['stage'] = stage
+            if 'progress' in message:
+                self.status['progress'] = message['progress']
+            
+            if stage == 'completed':
+                self.status.update({'state': 'completed', 'versions': message['versions']})
+            elif stage == 'failed':
+                self.status.update({'state': 'failed', 'error': message['error']})
+    
+    @staticmethod
+    def _idle_status() -> Dict[str, Any]:
+        return {
+            'state': 'idle',
+            'stage': None,
+            'progress': 0.0,
+            'started_at': None,
+            'finished_at': None,
+            'pid': None,
+            'versions': {},
+            'error': None
+        }
\ No newline at end of file
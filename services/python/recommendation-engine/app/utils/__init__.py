@@ -0,0 +1 @@
+"""Utility modules for the Recommendation Engine"""
\ No newline at end of file
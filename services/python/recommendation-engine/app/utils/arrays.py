@@ -0,0 +1,27 @@
+"""Row-appendable NumPy arrays"""
+import numpy as np
+
+# Spare rows allocated when an array outgrows its buffer
+CAPACITY_GROWTH = 1.5
+
+
+def grown_rows(array: np.ndarray, n_rows: int, copy: bool = False) -> np.ndarray:
+    """``array`` extended with zeroed rows to ``n_rows``, without copying it when its buffer has room
+    
+    The result is a view of a buffer with spare capacity, so appending a few
+    rows per streamed batch is amortised O(1). The rows appended lie past the
+    end of ``array``, which therefore never sees them. With ``copy`` the
+    result always gets a new buffer, so its existing rows can be rewritten
+    too.
+    """
+    buffer = array.base
+    if (not copy and type(buffer) is np.ndarray and buffer.dtype == array.dtype
+            and buffer.shape[1:] == array.shape[1:] and buffer.strides == array.strides
+            and buffer.ctypes.data == array.ctypes.data and len(buffer) >= n_rows and buffer.flags.writeable):
+        grown = buffer[:n_rows]
+        grown[len(array):] = 0
+        return grown
+    
+    buffer = np.zeros((max(n_rows, int(len(array) * CAPACITY_GROWTH)),) + array.shape[1:], dtype=array.dtype)
+    buffer[:len(array)] = array
+    return buffer[:n_rows]
@@ -0,0 +1,130 @@
+"""Compact UUID to dense-index mapping for recommendation models"""
+import copy
+import logging
+from typing import Dict, Iterable, List, Optional, Union
+from uuid import UUID
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Raw 16-byte UUIDs; fixed-width byte strings sort and compare bytewise
+UUID_DTYPE = np.dtype('S16')
+
+IdLike = Union[UUID, str, bytes]
+
+
+def to_uuid_array(ids: Iterable[IdLike]) -> np.ndarray:
+    """Pack UUIDs (or their string/byte forms) into a ``UUID_DTYPE`` array"""
+    if isinstance(ids, np.ndarray) and ids.dtype == UUID_DTYPE:
+        return ids
+    return np.array([_uuid_bytes(value) for value in ids], dtype=UUID_DTYPE)
+
+
+def _uuid_bytes(value: IdLike) -> bytes:
+    if isinstance(value, UUID):
+        return value.bytes
+    if isinstance(value, bytes):
+        return value
+    return UUID(str(value)).bytes
+
+
+class IdRegistry:
+    """Append-only mapping between UUIDs and dense indices ``0..n-1``
+    
+    IDs live in one ``S16`` array (16 bytes each, position = index) with a
+    sorted permutation for vectorised ``searchsorted`` lookups. IDs appended
+    after the last sort are kept in a small overflow dict until there are
+    enough of them to be worth merging, so streaming updates don't re-sort the
+    whole table per batch.
+    """
+    
+    def __init__(self, ids: Optional[np.ndarray] = None):
+        self._ids = to_uuid_array([] if ids is None else ids)
+        self._recent: Dict[bytes, int] = {}
+        self._reindex()
+    
+    @classmethod
+    def from_ids(cls, ids: Iterable[IdLike]) -> "IdRegistry":
+        """Registry over ``ids`` in the given order (they must be unique)"""
+        return cls(to_uuid_array(ids))
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __contains__(self, value: IdLike) -> bool:
+        return self.encode_one(value) is not None
+    
+    @property
+    def ids(self) -> np.ndarray:
+        """The raw ``S16`` array, indexed by dense index (e.g. for saving)"""
+        return self._ids
+    
+    def copy(self) -> "IdRegistry":
+        """Registry over the same IDs that can be appended to without changing this one"""
+        registry = copy.copy(self)
+        registry._recent = dict(self._recent)
+        return registry
+    
+    def encode(self, ids: Iterable[IdLike]) -> np.ndarray:
+        """Dense indices for ``ids``; ``-1`` marks unknown IDs"""
+        keys = to_uuid_array(ids)
+        indices = np.full(len(keys), -1, dtype=np.int64)
+        
+        if len(self._sorted_ids) and len(keys):
+            positions = np.searchsorted(self._sorted_ids, keys)
+            positions = np.minimum(positions, len(self._sorted_ids) - 1)
+            found = self._sorted_ids[positions] == keys
+            indices[found] = self._order[positions[found]]
+        
+        if self._recent:
+            for i in np.flatnonzero(indices < 0):
+                indices[i] = self._recent.get(keys[i].ljust(16, b'\0'), -1)
+        
+        return indices
+    
+    def encode_one(self, value: IdLike) -> Optional[int]:
+        """Dense index for one ID, or ``None`` if unknown"""
+        idx = int(self.encode([value])[0])
+        return idx if idx >= 0 else None
+    
+    def encode_or_add(self, ids: Iterable[IdLike]) -> np.ndarray:
+        """Dense indices for ``ids``, appending unseen IDs in first-seen order"""
+        keys = to_uuid_array(ids)
+        indices = self.encode(keys)
+        
+        missing = np.flatnonzero(indices < 0)
+        if len(missing):
+            new_keys, first_seen, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+            order = np.argsort(first_seen, kind='stable')
+            
+            # Rank of each new key in first-seen order becomes its offset past the end
+            offsets = np.empty(len(order), dtype=np.int64)
+            offsets[order] = np.arange(len(order))
+            start = len(self._ids)
+            
+            self._ids = np.concatenate([self._ids, new_keys[order]])
+            indices[missing] = start + offsets[inverse.ravel()]
+            
+            for offset, key in enumerate(new_keys[order].tolist()):
+                self._recent[key.ljust(16, b'\0')] = start + offset
+            
+            if len(self._recent) > max(1024, len(self._ids) // 64):
+                self._reindex()
+        
+        return indices
+    
+    def decode(self, indices: Iterable[int]) -> List[UUID]:
+        """UUIDs for dense indices"""
+        raw = self._ids[np.asarray(indices, dtype=np.int64)].tobytes()
+        return [UUID(bytes=raw[offset:offset + 16]) for offset in range(0, len(raw), 16)]
+    
+    def decode_one(self, idx: int) -> UUID:
+        """UUID for one dense index"""
+        return UUID(bytes=self._ids[idx:idx + 1].tobytes())
+    
+    def _reindex(self):
+        """Rebuild the sorted lookup over every ID and clear the overflow dict"""
+        self._order = np.argsort(self._ids, kind='stable')
+        self._sorted_ids = self._ids[self._order]
+        self._recent = {}
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""Versioned, memory-mappable model artifacts"""
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+def _json_default(value: Any) -> Any:
+    """Encode NumPy scalars/arrays and datetimes found in model documents"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass
+class ModelArtifact:
+    """One loaded artifact version"""
+    version: str
+    arrays: Dict[str, np.ndarray]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    documents: Dict[str, Any] = field(default_factory=dict)
+
+
+class ModelArtifactStore:
+    """Directory of immutable model versions for one model
+    
+    Layout under ``MODEL_CACHE_DIR/<name>/``::
+        
+        <version>/manifest.json   array dtypes/shapes plus model metadata
+        <version>/<array>.npy     raw arrays, loadable with ``mmap_mode``
+        <version>/<doc>.json      small JSON documents (vocabularies etc.)
+        CURRENT                   name of the published version
+    
+    A version directory is written under a temporary name and renamed into
+    place, then ``CURRENT`` is replaced atomically, so readers never observe
+    a partially written model. Every worker process that memory-maps the same
+    version shares its pages through the OS page cache.
+    """
+    
+    def __init__(self, name: str, root: Optional[str] = None):
+        self.name = name
+        self.root = os.path.join(root or settings.MODEL_CACHE_DIR, name)
+    
+    def save(self, arrays: Dict[str, np.ndarray], metadata: Optional[Dict[str, Any]] = None,
+             documents: Optional[Dict[str, Any]] = None) -> str:
+        """Write and publish a new version; returns its name"""
+        os.makedirs(self.root, exist_ok=True)
+        
+        version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+        staging_dir = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(staging_dir)
+        
+        try:
+            manifest = {
+                "name": self.name,
+                "version": version,
+                "created_at": datetime.utcnow().isoformat(),
+                "arrays": {},
+                "documents": sorted(documents or {}),
+                "metadata": metadata or {}
+            }
+            
+            for array_name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                np.save(os.path.join(staging_dir, f"{array_name}.npy"), array, allow_pickle=False)
+                manifest["arrays"][array_name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+            
+            for doc_name, document in (documents or {}).items():
+                with open(os.path.join(staging_dir, f"{doc_name}.json"), "w") as f:
+                    json.dump(document, f, default=_json_default)
+            
+            with open(os.path.join(staging_dir, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2)
+            
+            os.rename(staging_dir, os.path.join(self.root, version))
+            
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        
+        self._publish(version)
+        self._prune()
+        
+        logger.info(f"Saved {self.name} model artifact version {version}")
+        return version
+    
+    def current_version(self) -> Optional[str]:
+        """Name of the published version, if any"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def load(self, version: Optional[str] = None, mmap_mode: Optional[str] = "r") -> Optional[ModelArtifact]:
+        """Open a version (the published one by default) with memory-mapped arrays"""
+        version = version or self.current_version()
+        if version is None:
+            return None
+        
+        version_dir = os.path.join(self.root, version)
+        with open(os.path.join(version_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        
+        arrays = {
+            array_name: np.load(os.path.join(version_dir, f"{array_name}.npy"),
+                                mmap_mode=mmap_mode, allow_pickle=False)
+            for array_name in manifest["arrays"]
+        }
+        
+        documents = {}
+        for doc_name in manifest.get("documents", []):
+            with open(os.path.join(version_dir, f"{doc_name}.json")) as f:
+                documents[doc_name] = json.load(f)
+        
+        return ModelArtifact(
+            version=version,
+            arrays=arrays,
+            metadata=manifest.get("metadata", {}),
+            documents=documents
+        )
+    
+    def _publish(self, version: str):
+        """Point CURRENT at ``version`` with an atomic rename"""
+        staging_file = os.path.join(self.root, f".{CURRENT_FILE}.{version}.tmp")
+        with open(staging_file, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staging_file, os.path.join(self.root, CURRENT_FILE))
+    
+    def _prune(self):
+        """Drop old versions beyond ``MODEL_ARTIFACT_KEEP_VERSIONS``
+        
+        Processes still mapping a removed version keep reading it safely; the
+        files disappear once the last mapping is closed.
+        """
+        current = self.current_version()
+        versions = sorted(
+            entry for entry in os.listdir(self.root)
+            if not entry.startswith(".") and os.path.isdir(os.path.join(self.root, entry))
+        )
+        
+        for version in versions[:-max(1, settings.MODEL_ARTIFACT_KEEP_VERSIONS)]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""Two-level (in-process LRU + Redis) cache of recommendation responses"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from app.config import get_settings
+from app.models.recommendation import RecommendationResponse
+from app.utils.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REDIS_KEY_PREFIX = "recommendations:"
+# Hash field holding the user's last invalidation time; response fields are hex digests
+INVALIDATED_FIELD = "invalidated_at"
+
+
+def cache_field(*parts: Any) -> str:
+    """Digest of the request parts a cached response depends on; dicts are normalised"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class RecommendationCache:
+    """Recommendation responses cached per user, in process and in Redis
+    
+    Each user's responses live in one Redis hash. Invalidating a user
+    replaces the hash with just its invalidation time, which every process
+    reads along with a response, so a response computed from older inputs -
+    even one another process stores afterwards - is never served from Redis.
+    Entries younger than ``RESULT_CACHE_FRESH_SECONDS`` are served as they
+    are; older ones, up to ``CACHE_TTL``, are served while one background
+    refresh replaces them. Concurrent misses for the same key share one
+    computation. In-process copies are re-checked against Redis after
+    ``RESULT_CACHE_LOCAL_SECONDS``, which bounds how long another process's
+    invalidation can go unseen. Redis being unavailable only turns it into a
+    miss.
+    """
+    
+    def __init__(self):
+        self.local = LRUCache(settings.RESULT_CACHE_SIZE)
+        self.invalidated_at = LRUCache(settings.RESULT_CACHE_SIZE)
+        self.inflight: Dict[Tuple[UUID, str], asyncio.Future] = {}
+        self.refreshing: Set[Tuple[UUID, str]] = set()
+        self.redis = None
+        self.cache_stats = {
+            'local_hits': 0,
+            'redis_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+            'errors': 0
+        }
+    
+    async def get_or_compute(self, user_id: UUID, field: str,
+                             compute: Callable[[], Awaitable[RecommendationResponse]]) -> RecommendationResponse:
+        """Cached response for ``(user_id, field)``, computing it on a miss"""
+        key = (user_id, field)
+        entry = await self._lookup(key)
+        
+        if entry is not None:
+            created_at, response = entry
+            if time.time() - created_at >= settings.RESULT_CACHE_FRESH_SECONDS:
+                self.cache_stats['stale_hits'] += 1
+                if key not in self.refreshing:
+                    self.refreshing.add(key)
+                    asyncio.create_task(self._refresh(key, compute))
+            return response
+        
+        self.cache_stats['misses'] += 1
+        pending = self.inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        pending = asyncio.get_running_loop().create_future()
+        self.inflight[key] = pending
+        try:
+            response = await self._compute_and_store(key, compute)
+            pending.set_result(response)
+            return response
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception()  # Waiters re-raise it; don't report it as never retrieved
+            raise
+        finally:
+            del self.inflight[key]
+    
+    async def invalidate(self, user_ids: Iterable[UUID]):
+        """Drop every cached response of ``user_ids``, here and in Redis"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        
+        now = time.time()
+        for user_id in user_ids:
+            self.invalidated_at.put(user_id, now)
+        self.cache_stats['invalidations'] += len(user_ids)
+        
+        client = self._client()
+        if client is None:
+            return
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                for user_id in user_ids:
+                    redis_key = REDIS_KEY_PREFIX + str(user_id)
+                    pipe.delete(redis_key)
+                    pipe.hset(redis_key, INVALIDATED_FIELD, now)
+                    pipe.expire(redis_key, settings.CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cached recommendations in Redis: {e}")
+            self.cache_stats['errors'] += 1
+    
+    async def _lookup(self, key: Tuple[UUID, str]) -> Optional[Tuple[float, RecommendationResponse]]:
+        """``(created_at, response)`` from the nearest level holding a valid entry"""
+        user_id, field = key
+        invalidated_at = self.invalidated_at.get(user_id) or 0.0
+        now = time.time()
+        
+        local = self.local.get(key)
+        if local is not None:
+            created_at, fetched_at, response = local
+            if created_at > invalidated_at and now - fetched_at < settings.RESULT_CACHE_LOCAL_SECONDS:
+                self.cache_stats['local_hits'] += 1
+                return created_at, response
+        
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            cached, shared_invalidated_at = await client.hmget(REDIS_KEY_PREFIX + str(user_id), field, INVALIDATED_FIELD)
+            if shared_invalidated_at is not None and float(shared_invalidated_at) > invalidated_at:
+                invalidated_at = float(shared_invalidated_at)
+                self.invalidated_at.put(user_id, invalidated_at)
+            if cached is None:
+                return None
+            
+            cached = json.loads(cached)
+            created_at = cached['created_at']
+            if created_at <= invalidated_at or now - created_at >= settings.CACHE_TTL:
+                return None
+            
+            response = RecommendationResponse.model_validate_json(cached['response'])
+            self.local.put(key, (created_at, now, response))
+            self.cache_stats['redis_hits'] += 1
+            return created_at, response
+            
+        except Exception as e:
+            logger.warning(f"Failed to read cached recommendations from Redis: {e}")
+            self.cache_stats['errors'] += 1
+            return None
+    
+    async def _compute_and_store(self, key: Tuple[UUID, str],
+                                 compute: Callable[[], Awaitable[RecommendationResponse]]) -> RecommendationResponse:
+        """Compute a response and cache it, unless the user was invalidated meanwhile"""
+        user_id, field = key
+        started_at = time.time()
+        response = await compute()
+        
+        if started_at <= (self.invalidated_at.get(user_id) or 0.0):
+            return response
+        
+        self.local.put(key, (started_at, time.time(), response))
+        client = self._client()
+        if client is None:
+            return response
+        try:
+            redis_key = REDIS_KEY_PREFIX + str(user_id)
+            value = json.dumps({'created_at': started_at, 'response': response.model_dump_json()})
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(redis_key, field, value)
+                pipe.expire(redis_key, settings.CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache recommendations in Redis: {e}")
+            self.cache_stats['errors'] += 1
+        
+        return response
+    
+    async def _refresh(self, key: Tuple[UUID, str], compute: Callable[[], Awaitable[RecommendationResponse]]):
+        try:
+            await self._compute_and_store(key, compute)
+        except Exception as e:
+            logger.warning(f"Failed to refresh cached recommendations: {e}")
+        finally:
+            self.refreshing.discard(key)
+    
+    def _client(self):
+        if self.redis is None:
+            try:
+                self.redis = aioredis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=settings.REDIS_DECODE_RESPONSES,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+                )
+            except Exception as e:
+                logger.warning(f"Redis unavailable, caching recommendations in process only: {e}")
+                return None
+        return self.redis
+    
+    async def close(self):
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
\ No newline at end of file
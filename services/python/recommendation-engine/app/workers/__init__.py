@@ -0,0 +1,102 @@
+"""Background workers keeping recommendation models up to date"""
+import logging
+import asyncio
+from typing import List
+
+from app.config import get_settings
+from app.kafka_client import kafka_client
+from app.algorithms.embedding_service import close_embedding_service
+from app.algorithms.hybrid_recommender import HybridRecommender
+from .catalog_expiry import CatalogExpiryWorker
+from .catalog_stream import CatalogStreamProcessor
+from .interaction_stream import InteractionStreamProcessor
+from .model_reloader import ModelReloader
+from .neighbour_refresh import NeighbourRefreshWorker
+from .preference_stream import PreferenceStreamProcessor
+from .slate_refresh import SlateRefreshWorker
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def start_background_workers(recommender: HybridRecommender) -> List[asyncio.Task]:
+    """Subscribe the recommender to its Kafka topics and start worker tasks"""
+    logger.info("Starting background workers...")
+    
+    try:
+        worker_tasks = []
+        
+        model_reloader = ModelReloader(recommender)
+        worker_tasks.append(asyncio.create_task(model_reloader.run()))
+        
+        catalog_expiry = CatalogExpiryWorker(recommender)
+        worker_tasks.append(asyncio.create_task(catalog_expiry.run()))
+        
+        neighbour_refresh = NeighbourRefreshWorker(recommender)
+        worker_tasks.append(asyncio.create_task(neighbour_refresh.run()))
+        
+        if settings.ENABLE_PRECOMPUTED_SLATES:
+            slate_refresh = SlateRefreshWorker(recommender)
+            worker_tasks.append(asyncio.create_task(slate_refresh.run()))
+        
+        # Every process applies every catalog change to its own content model
+        catalog_processor = CatalogStreamProcessor(recommender.process_event_changes)
+        for topic in (settings.KAFKA_EVENT_CREATED_TOPIC, settings.KAFKA_EVENT_UPDATED_TOPIC,
+                      settings.KAFKA_EVENT_DELETED_TOPIC):
+            kafka_client.subscribe(topic, catalog_processor.handle_message, broadcast=True)
+        worker_tasks.append(asyncio.create_task(catalog_processor.run()))
+        
+        # Always consumed, and by every process: each keeps its own leaderboards and collaborative model,
+        # which must count every interaction rather than those of the partitions a shared group assigns it
+        interaction_processor = InteractionStreamProcessor(recommender.process_interactions)
+        kafka_client.subscribe(settings.KAFKA_USER_INTERACTIONS_TOPIC, interaction_processor.handle_message,
+                               broadcast=True)
+        worker_tasks.append(asyncio.create_task(interaction_processor.run()))
+        
+        # Every process drops its own in-process copies of the users' cached responses
+        preference_processor = PreferenceStreamProcessor(recommender.process_preference_updates)
+        kafka_client.subscribe(settings.KAFKA_USER_PREFERENCES_TOPIC, preference_processor.handle_message,
+                               broadcast=True)
+        
+        await kafka_client.connect()
+        
+        logger.info(f"Started {len(worker_tasks)} background workers")
+        
+        return worker_tasks
+        
+    except Exception as e:
+        logger.error(f"Failed to start background workers: {e}")
+        raise
+
+
+async def stop_background_workers(worker_tasks: List[asyncio.Task]):
+    """Stop all background worker tasks"""
+    logger.info("Stopping background workers...")
+    
+    try:
+        await kafka_client.disconnect()
+        
+        for task in worker_tasks:
+            if not task.done():
+                task.cancel()
+        
+        await asyncio.gather(*worker_tasks, return_exceptions=True)
+        close_embedding_service()
+        
+        logger.info("Background workers stopped successfully")
+        
+    except Exception as e:
+        logger.error(f"Error stopping background workers: {e}")
+
+
+__all__ = [
+    "start_background_workers",
+    "stop_background_workers",
+    "CatalogExpiryWorker",
+    "CatalogStreamProcessor",
+    "InteractionStreamProcessor",
+    "ModelReloader",
+    "NeighbourRefreshWorker",
+    "PreferenceStreamProcessor",
+    "SlateRefreshWorker"
+]
\ No newline at end of file
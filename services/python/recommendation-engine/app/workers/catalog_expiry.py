@@ -0,0 +1,55 @@
+"""Worker evicting events that have ended from the serving models"""
+import asyncio
+import logging
+from datetime import datetime
+
+from app.config import get_settings
+from app.algorithms.hybrid_recommender import HybridRecommender
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CatalogExpiryWorker:
+    """Sweeps ended events out of the models every ``CATALOG_EXPIRY_INTERVAL_SECONDS``
+    
+    Keeps the scoring structures and indexes sized to the upcoming catalog
+    instead of every event ever published.
+    """
+    
+    def __init__(self, recommender: HybridRecommender):
+        self.recommender = recommender
+        self.is_running = False
+        self.expiry_stats = {
+            'sweeps': 0,
+            'events_evicted': 0,
+            'errors': 0,
+            'last_swept_at': None
+        }
+    
+    async def run(self):
+        """Sweep loop; runs until ``stop`` is called or the task is cancelled"""
+        logger.info("Starting catalog expiry worker...")
+        self.is_running = True
+        
+        while self.is_running:
+            await asyncio.sleep(settings.CATALOG_EXPIRY_INTERVAL_SECONDS)
+            await self.sweep()
+    
+    def stop(self):
+        """Stop the sweep loop"""
+        self.is_running = False
+    
+    async def sweep(self):
+        """Evict every event that has ended from the models"""
+        self.expiry_stats['sweeps'] += 1
+        
+        try:
+            removed = await self.recommender.expire_events()
+            
+            self.expiry_stats['events_evicted'] += removed['content_based']
+            self.expiry_stats['last_swept_at'] = datetime.utcnow()
+            
+        except Exception as e:
+            logger.error(f"Failed to evict ended events: {e}")
+            self.expiry_stats['errors'] += 1
\ No newline at end of file
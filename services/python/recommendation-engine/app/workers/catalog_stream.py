@@ -0,0 +1,108 @@
+"""Worker applying event catalog changes to the content-based model"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Event statuses that take an event out of the recommendable catalog
+REMOVED_STATUSES = {'cancelled', 'completed'}
+
+CatalogHandler = Callable[[List[Dict[str, Any]], List[UUID]], Awaitable[Any]]
+
+
+def parse_catalog_message(message: Dict[str, Any]) -> Optional[Tuple[UUID, Optional[Dict[str, Any]]]]:
+    """``(event_id, event)`` from an ``events.event.*`` message; ``event`` is ``None`` for a removal"""
+    event = message.get('event') or None
+    
+    try:
+        event_id = UUID(str(message.get('event_id') or (event or {})['id']))
+    except (KeyError, ValueError, TypeError):
+        return None
+    
+    if event is None or event.get('status') in REMOVED_STATUSES:
+        return event_id, None
+    return event_id, dict(event, id=str(event_id))
+
+
+class CatalogStreamProcessor:
+    """Buffers event created/updated/deleted messages and applies them in batches
+    
+    Only the latest change per event is kept, and batches are flushed every
+    ``CATALOG_STREAM_FLUSH_SECONDS`` or once ``CATALOG_STREAM_BATCH_SIZE``
+    events are pending, so an event edited several times is re-embedded once.
+    """
+    
+    def __init__(self, handler: CatalogHandler):
+        self.handler = handler
+        self.pending: Dict[UUID, Optional[Dict[str, Any]]] = {}
+        self.flush_event = asyncio.Event()
+        self.is_running = False
+        self.processing_stats = {
+            'messages_received': 0,
+            'messages_skipped': 0,
+            'events_upserted': 0,
+            'events_removed': 0,
+            'batches_applied': 0,
+            'errors': 0,
+            'last_applied_at': None
+        }
+    
+    async def handle_message(self, message: Dict[str, Any]):
+        """Kafka handler for the event created, updated and deleted topics"""
+        self.processing_stats['messages_received'] += 1
+        
+        change = parse_catalog_message(message)
+        if change is None:
+            self.processing_stats['messages_skipped'] += 1
+            return
+        
+        event_id, event = change
+        self.pending[event_id] = event
+        if len(self.pending) >= settings.CATALOG_STREAM_BATCH_SIZE:
+            self.flush_event.set()
+    
+    async def run(self):
+        """Flush loop; runs until ``stop`` is called or the task is cancelled"""
+        logger.info("Starting catalog stream processing...")
+        self.is_running = True
+        
+        while self.is_running:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(),
+                                       timeout=settings.CATALOG_STREAM_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            
+            self.flush_event.clear()
+            await self.flush()
+    
+    async def stop(self):
+        """Stop the flush loop after applying whatever is still pending"""
+        self.is_running = False
+        self.flush_event.set()
+        await self.flush()
+    
+    async def flush(self):
+        """Apply the pending catalog changes"""
+        if not self.pending:
+            return
+        
+        batch, self.pending = self.pending, {}
+        upserted = [event for event in batch.values() if event is not None]
+        removed = [event_id for event_id, event in batch.items() if event is None]
+        
+        try:
+            await self.handler(upserted, removed)
+            self.processing_stats['events_upserted'] += len(upserted)
+            self.processing_stats['events_removed'] += len(removed)
+            self.processing_stats['batches_applied'] += 1
+            self.processing_stats['last_applied_at'] = datetime.utcnow()
+        except Exception as e:
+            logger.error(f"Failed to apply {len(batch)} streamed catalog changes: {e}")
+            self.processing_stats['errors'] += 1
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Worker turning the user-interactions stream into incremental model updates"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.config import get_settings
+from app.models.recommendation import InteractionType, UserInteraction
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Platform event types that imply an interaction when the payload carries none
+EVENT_TYPE_INTERACTIONS = {
+    'event_view': InteractionType.VIEW,
+    'event_registration': InteractionType.REGISTER,
+    'registration_created': InteractionType.REGISTER,
+    'event_favorite': InteractionType.SAVE,
+    'event_share': InteractionType.SHARE,
+    'recommendation_click': InteractionType.CLICK,
+}
+
+InteractionHandler = Callable[[List[UserInteraction]], Awaitable[Any]]
+
+
+def parse_interaction_message(message: Dict[str, Any]) -> Optional[UserInteraction]:
+    """Build a UserInteraction from a ``user-interactions`` message, if it describes one"""
+    data = message.get('data') or {}
+    properties = data.get('properties') or {}
+    
+    interaction_type = data.get('interaction_type') or message.get('event_type')
+    interaction_type = EVENT_TYPE_INTERACTIONS.get(interaction_type, interaction_type)
+    
+    try:
+        return UserInteraction(
+            user_id=UUID(str(data['user_id'])),
+            event_id=UUID(str(data['event_id'])),
+            interaction_type=InteractionType(interaction_type),
+            rating=data.get('rating', properties.get('rating')),
+            duration_seconds=data.get('duration_seconds', properties.get('duration_seconds')),
+            metadata=properties
+        )
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+class InteractionStreamProcessor:
+    """Buffers interactions from Kafka and hands them to the models in micro-batches
+    
+    Folding in one interaction at a time would rebuild the interaction matrix
+    per message, so interactions are flushed every
+    ``INTERACTION_STREAM_FLUSH_SECONDS`` or once ``INTERACTION_STREAM_BATCH_SIZE``
+    are pending, whichever comes first.
+    """
+    
+    def __init__(self, handler: InteractionHandler):
+        self.handler = handler
+        self.pending: List[UserInteraction] = []
+        self.flush_event = asyncio.Event()
+        self.is_running = False
+        self.processing_stats = {
+            'messages_received': 0,
+            'messages_skipped': 0,
+            'interactions_applied': 0,
+            'batches_applied': 0,
+            'errors': 0,
+            'last_applied_at': None
+        }
+    
+    async def handle_message(self, message: Dict[str, Any]):
+        """Kafka handler for the user-interactions topic"""
+        self.processing_stats['messages_received'] += 1
+        
+        interaction = parse_interaction_message(message)
+        if interaction is None:
+            self.processing_stats['messages_skipped'] += 1
+            return
+        
+        self.pending.append(interaction)
+        if len(self.pending) >= settings.INTERACTION_STREAM_BATCH_SIZE:
+            self.flush_event.set()
+    
+    async def run(self):
+        """Flush loop; runs until ``stop`` is called or the task is cancelled"""
+        logger.info("Starting interaction stream processing...")
+        self.is_running = True
+        
+        while self.is_running:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(),
+                                       timeout=settings.INTERACTION_STREAM_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            
+            self.flush_event.clear()
+            await self.flush()
+    
+    async def stop(self):
+        """Stop the flush loop after applying whatever is still pending"""
+        self.is_running = False
+        self.flush_event.set()
+        await self.flush()
+    
+    async def flush(self):
+        """Apply the pending interactions"""
+        if not self.pending:
+            return
+        
+        batch, self.pending = self.pending, []
+        
+        try:
+            await self.handler(batch)
+            self.processing_stats['interactions_applied'] += len(batch)
+            self.processing_stats['batches_applied'] += 1
+            self.processing_stats['last_applied_at'] = datetime.utcnow()
+        except Exception as e:
+            logger.error(f"Failed to apply {len(batch)} streamed interactions: {e}")
+            self.processing_stats['errors'] += 1
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""Worker swapping in newly published model versions"""
+import asyncio
+import logging
+from datetime import datetime
+
+from app.config import get_settings
+from app.algorithms.hybrid_recommender import HybridRecommender
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ModelReloader:
+    """Polls ``MODEL_CACHE_DIR`` for new artifact versions and hot-swaps them
+    
+    Training publishes a version by atomically replacing the model's
+    ``CURRENT`` pointer, so every serving worker picks the new model up within
+    ``MODEL_RELOAD_INTERVAL_SECONDS`` without a restart.
+    """
+    
+    def __init__(self, recommender: HybridRecommender):
+        self.recommender = recommender
+        self.is_running = False
+        self.reload_stats = {
+            'checks': 0,
+            'reloads': 0,
+            'errors': 0,
+            'last_reloaded_at': None
+        }
+    
+    async def run(self):
+        """Polling loop; runs until ``stop`` is called or the task is cancelled"""
+        logger.info("Starting model reloader...")
+        self.is_running = True
+        
+        while self.is_running:
+            await asyncio.sleep(settings.MODEL_RELOAD_INTERVAL_SECONDS)
+            await self.check()
+    
+    def stop(self):
+        """Stop the polling loop"""
+        self.is_running = False
+    
+    async def check(self):
+        """Reload every model whose published version changed"""
+        self.reload_stats['checks'] += 1
+        
+        try:
+            reloaded = await self.recommender.reload_models()
+            
+            swapped = [name for name, changed in reloaded.items() if changed]
+            if swapped:
+                self.reload_stats['reloads'] += len(swapped)
+                self.reload_stats['last_reloaded_at'] = datetime.utcnow()
+                logger.info(f"Hot-swapped model versions: {swapped}")
+                
+        except Exception as e:
+            logger.error(f"Failed to reload models: {e}")
+            self.reload_stats['errors'] += 1
\ No newline at end of file
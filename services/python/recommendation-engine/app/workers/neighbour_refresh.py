@@ -0,0 +1,53 @@
+"""Worker refreshing the similar-users table after streamed interactions"""
+import asyncio
+import logging
+from datetime import datetime
+
+from app.config import get_settings
+from app.algorithms.hybrid_recommender import HybridRecommender
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class NeighbourRefreshWorker:
+    """Applies folded-in users to the similar-users table every ``CF_NEIGHBOUR_REFRESH_INTERVAL_SECONDS``
+    
+    Streamed batches only mark their users stale; similar-user lookups scan
+    for those users until the table is patched here in one pass.
+    """
+    
+    def __init__(self, recommender: HybridRecommender):
+        self.recommender = recommender
+        self.is_running = False
+        self.refresh_stats = {
+            'refreshes': 0,
+            'users_refreshed': 0,
+            'errors': 0,
+            'last_refreshed_at': None
+        }
+    
+    async def run(self):
+        """Refresh loop; runs until ``stop`` is called or the task is cancelled"""
+        logger.info("Starting similar-users refresh worker...")
+        self.is_running = True
+        
+        while self.is_running:
+            await asyncio.sleep(settings.CF_NEIGHBOUR_REFRESH_INTERVAL_SECONDS)
+            await self.refresh()
+    
+    def stop(self):
+        """Stop the refresh loop"""
+        self.is_running = False
+    
+    async def refresh(self):
+        """Patch the similar-user lists of every stale user"""
+        self.refresh_stats['refreshes'] += 1
+        
+        try:
+            self.refresh_stats['users_refreshed'] += await self.recommender.refresh_similar_users()
+            self.refresh_stats['last_refreshed_at'] = datetime.utcnow()
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh similar users: {e}")
+            self.refresh_stats['errors'] += 1
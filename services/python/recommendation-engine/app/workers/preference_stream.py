@@ -0,0 +1,55 @@
+"""Worker dropping cached recommendations when a user's preferences change"""
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PreferenceHandler = Callable[[List[UUID]], Awaitable[Any]]
+
+
+def parse_preference_message(message: Dict[str, Any]) -> Optional[UUID]:
+    """User ID of a ``users.preferences.updated`` message"""
+    data = message.get('data') or {}
+    
+    try:
+        return UUID(str(data.get('user_id') or message['user_id']))
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+class PreferenceStreamProcessor:
+    """Hands each preference update to the recommender as it arrives
+    
+    Unlike interactions these are rare and only invalidate cached results,
+    so they are applied one message at a time rather than batched.
+    """
+    
+    def __init__(self, handler: PreferenceHandler):
+        self.handler = handler
+        self.processing_stats = {
+            'messages_received': 0,
+            'messages_skipped': 0,
+            'errors': 0,
+            'last_applied_at': None
+        }
+    
+    async def handle_message(self, message: Dict[str, Any]):
+        """Kafka handler for the user preferences topic"""
+        self.processing_stats['messages_received'] += 1
+        
+        user_id = parse_preference_message(message)
+        if user_id is None:
+            self.processing_stats['messages_skipped'] += 1
+            return
+        
+        try:
+            await self.handler([user_id])
+            self.processing_stats['last_applied_at'] = datetime.utcnow()
+        except Exception as e:
+            logger.error(f"Failed to apply preference update for user {user_id}: {e}")
+            self.processing_stats['errors'] += 1
\ No newline at end of file
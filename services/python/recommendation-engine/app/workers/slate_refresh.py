@@ -0,0 +1,65 @@
+"""Worker rebuilding the precomputed recommendation slates"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from app.config import get_settings
+from app.algorithms.hybrid_recommender import HybridRecommender
+from app.algorithms.slates import SlateBuilder
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class SlateRefreshWorker:
+    """Rebuilds the slates of recently active users every ``SLATE_REFRESH_INTERVAL_SECONDS``
+    
+    A build is skipped while the published slates are younger than the
+    interval, so when several serving processes run this worker only the
+    first one due rebuilds them; the others pick the new version up through
+    ``reload_models``.
+    """
+    
+    def __init__(self, recommender: HybridRecommender):
+        self.recommender = recommender
+        self.builder = SlateBuilder()
+        self.is_running = False
+        self.refresh_stats = {
+            'builds': 0,
+            'skipped': 0,
+            'errors': 0,
+            'last_built_at': None
+        }
+    
+    async def run(self):
+        """Refresh loop; runs until ``stop`` is called or the task is cancelled"""
+        logger.info("Starting slate refresh worker...")
+        self.is_running = True
+        
+        while self.is_running:
+            await self.refresh()
+            await asyncio.sleep(settings.SLATE_REFRESH_INTERVAL_SECONDS)
+    
+    def stop(self):
+        """Stop the refresh loop"""
+        self.is_running = False
+    
+    async def refresh(self):
+        """Build and publish new slates if the published ones are due, then swap them in"""
+        try:
+            artifact = await asyncio.to_thread(self.builder.artifact_store.load)
+            generated_at = artifact.metadata.get('generated_at', 0.0) if artifact is not None else 0.0
+            if time.time() - generated_at < settings.SLATE_REFRESH_INTERVAL_SECONDS:
+                self.refresh_stats['skipped'] += 1
+                return
+            
+            version = await self.builder.build()
+            if version is not None:
+                self.refresh_stats['builds'] += 1
+                self.refresh_stats['last_built_at'] = datetime.utcnow()
+                await self.recommender.reload_models()
+                
+        except Exception as e:
+            logger.error(f"Failed to refresh recommendation slates: {e}")
+            self.refresh_stats['errors'] += 1
\ No newline at end of file
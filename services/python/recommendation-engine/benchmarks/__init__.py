@@ -0,0 +1,6 @@
+"""Benchmarks and offline evaluation for the Recommendation Engine
+
+Run from the service root::
+    
+    python -m benchmarks.run --scale 100k
+"""
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Time-split holdout, ranking metrics and latency measurement"""
+import resource
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from benchmarks.synthetic import SyntheticDataset
+
+
+@dataclass
+class HoldoutSplit:
+    """Interaction rows before/after a cut-off time, with per-user relevant events"""
+    train_rows: np.ndarray
+    test_rows: np.ndarray
+    cutoff: float
+    train_rows_by_user: Dict[int, np.ndarray]
+    relevant_by_user: Dict[int, Set[int]]  # Held-out events the user had not seen in training
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency, throughput, memory and (optionally) ranking quality of one benchmark"""
+    name: str
+    calls: int
+    p50_ms: float
+    p99_ms: float
+    throughput_per_s: float
+    peak_rss_mb: float
+    recall_at_k: Optional[float] = None
+    ndcg_at_k: Optional[float] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def time_split(dataset: SyntheticDataset, holdout_fraction: float = 0.2) -> HoldoutSplit:
+    """Hold out the most recent ``holdout_fraction`` of interactions"""
+    cutoff = float(np.quantile(dataset.interaction_times, 1.0 - holdout_fraction))
+    is_train = dataset.interaction_times < cutoff
+    train_rows = np.flatnonzero(is_train)
+    test_rows = np.flatnonzero(~is_train)
+    
+    train_rows_by_user = _group_rows(dataset.interaction_users[train_rows], train_rows)
+    seen = {
+        user: set(dataset.interaction_events[rows].tolist())
+        for user, rows in train_rows_by_user.items()
+    }
+    
+    relevant_by_user = {}
+    for user, rows in _group_rows(dataset.interaction_users[test_rows], test_rows).items():
+        if user not in seen:
+            continue
+        relevant = set(dataset.interaction_events[rows].tolist()) - seen[user]
+        if relevant:
+            relevant_by_user[user] = relevant
+    
+    return HoldoutSplit(train_rows, test_rows, cutoff, train_rows_by_user, relevant_by_user)
+
+
+def _group_rows(keys: np.ndarray, rows: np.ndarray) -> Dict[int, np.ndarray]:
+    order = np.argsort(keys, kind='stable')
+    unique_keys, starts = np.unique(keys[order], return_index=True)
+    groups = np.split(rows[order], starts[1:])
+    return dict(zip(unique_keys.tolist(), groups))
+
+
+def recall_at_k(recommended: Sequence[int], relevant: Set[int], k: int) -> float:
+    """Share of relevant items found in the top ``k``"""
+    if not relevant:
+        return 0.0
+    return len(set(recommended[:k]) & relevant) / len(relevant)
+
+
+def ndcg_at_k(recommended: Sequence[int], relevant: Set[int], k: int) -> float:
+    """Binary-relevance NDCG of the top ``k``"""
+    if not relevant:
+        return 0.0
+    dcg = sum(1.0 / np.log2(rank + 2) for rank, item in enumerate(recommended[:k]) if item in relevant)
+    ideal = sum(1.0 / np.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (Linux reports KiB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+async def measure(name: str, calls: Sequence[Callable[[], Awaitable[Any]]],
+                  score: Optional[Callable[[int, Any], Dict[str, float]]] = None,
+                  **extra) -> BenchmarkResult:
+    """Await each call in turn, timing it and optionally scoring its result
+    
+    ``score(i, result)`` returns ``{'recall': ..., 'ndcg': ...}`` for call ``i``.
+    """
+    latencies = []
+    recalls = []
+    ndcgs = []
+    
+    started = time.perf_counter()
+    for i, call in enumerate(calls):
+        call_started = time.perf_counter()
+        result = await call()
+        latencies.append(time.perf_counter() - call_started)
+        
+        if score is not None:
+            quality = score(i, result)
+            recalls.append(quality['recall'])
+            ndcgs.append(quality['ndcg'])
+    elapsed = time.perf_counter() - started
+    
+    latencies_ms = np.array(latencies) * 1000.0
+    return BenchmarkResult(
+        name=name,
+        calls=len(latencies),
+        p50_ms=float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else 0.0,
+        p99_ms=float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else 0.0,
+        throughput_per_s=len(latencies) / elapsed if elapsed > 0 else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+        recall_at_k=float(np.mean(recalls)) if recalls else None,
+        ndcg_at_k=float(np.mean(ndcgs)) if ndcgs else None,
+        extra=extra
+    )
+
+
+def format_results(results: List[BenchmarkResult], k: int) -> str:
+    """Fixed-width table of benchmark results"""
+    header = (f"{'benchmark':<22}{'calls':>7}{'p50 ms':>11}{'p99 ms':>11}{'ops/s':>10}"
+              f"{'rss MB':>9}{f'recall@{k}':>11}{f'ndcg@{k}':>9}")
+    lines = [header, '-' * len(header)]
+    
+    for result in results:
+        recall = f"{result.recall_at_k:.4f}" if result.recall_at_k is not None else '-'
+        ndcg = f"{result.ndcg_at_k:.4f}" if result.ndcg_at_k is not None else '-'
+        lines.append(
+            f"{result.name:<22}{result.calls:>7}{result.p50_ms:>11.2f}{result.p99_ms:>11.2f}"
+            f"{result.throughput_per_s:>10.1f}{result.peak_rss_mb:>9.0f}{recall:>11}{ndcg:>9}"
+        )
+    
+    return '\n'.join(lines)
\ No newline at end of file
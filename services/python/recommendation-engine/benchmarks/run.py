@@ -0,0 +1,152 @@
+"""Run the recommendation benchmarks on a synthetic dataset
+
+Usage::
+    
+    python -m benchmarks.run --scale 10k|100k|1m [--queries 200] [--k 10] [--json results.json]
+
+Models are trained on the oldest 80% of interactions and evaluated on the
+users' unseen events in the newest 20%. Models are written to a temporary
+``MODEL_CACHE_DIR`` so published artifacts are never touched. Peak RSS is
+the process high-water mark at the end of each benchmark.
+
+Run it from the service directory with ``services/python/requirements.txt``
+installed. The content-based and hybrid benchmarks embed event text with
+``EMBEDDING_MODEL``, which must be in the local Hugging Face cache or
+downloadable.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.config import get_settings
+from app.models.recommendation import RecommendationRequest
+from app.algorithms.collaborative_filtering import CollaborativeFilteringRecommender
+from app.algorithms.content_based import ContentBasedRecommender
+from app.algorithms.hybrid_recommender import HybridRecommender
+from benchmarks.evaluation import (
+    BenchmarkResult, format_results, measure, ndcg_at_k, peak_rss_mb, recall_at_k, time_split
+)
+from benchmarks.synthetic import SyntheticDataset, generate_dataset, scale_size
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def run_benchmarks(dataset: SyntheticDataset, n_queries: int, k: int, seed: int = 0) -> List[BenchmarkResult]:
+    """Train on the time-split training rows, then benchmark every serving path"""
+    rng = np.random.default_rng(seed)
+    split = time_split(dataset)
+    event_positions = {event_id: position for position, event_id in enumerate(dataset.event_ids)}
+    
+    eligible = np.array(sorted(split.relevant_by_user))
+    query_users = rng.choice(eligible, min(n_queries, len(eligible)), replace=False).tolist()
+    query_events = rng.choice(len(dataset.event_ids), min(n_queries, len(dataset.event_ids)), replace=False).tolist()
+    logger.info(f"{len(split.train_rows)} training and {len(split.test_rows)} held-out interactions, "
+                f"{len(query_users)} evaluation users")
+    
+    def score(i: int, recommendations) -> Dict[str, float]:
+        recommended = [event_positions.get(rec.event_id) for rec in recommendations]
+        relevant = split.relevant_by_user[query_users[i]]
+        return {'recall': recall_at_k(recommended, relevant, k), 'ndcg': ndcg_at_k(recommended, relevant, k)}
+    
+    def user_history(user: int) -> List[Dict[str, Any]]:
+        return dataset.interaction_dicts(split.train_rows_by_user[user])
+    
+    results = []
+    
+    collaborative = CollaborativeFilteringRecommender()
+    train_interactions = dataset.interactions(split.train_rows)
+    results.append(await measure(
+        'cf_train', [lambda interactions=train_interactions: collaborative.train(interactions)],
+        interactions=len(train_interactions)
+    ))
+    del train_interactions
+    
+    results.append(await measure(
+        'cf_score',
+        [lambda user=user: collaborative.get_recommendations(dataset.user_ids[user], k) for user in query_users],
+        score
+    ))
+    
+    content = ContentBasedRecommender()
+    content.setup_encoders()
+    results.append(await measure(
+        'content_train', [lambda: content.train(dataset.events)],
+        events=len(dataset.events)
+    ))
+    
+    results.append(await measure(
+        'content_score',
+        [
+            lambda user=user: content.get_recommendations(
+                dataset.user_ids[user], dataset.user_preferences[user], user_history(user), k
+            )
+            for user in query_users
+        ],
+        score
+    ))
+    
+    results.append(await measure(
+        'similar_events',
+        [lambda event=event: content.get_similar_events(dataset.event_ids[event], k) for event in query_events]
+    ))
+    
+    hybrid = HybridRecommender()
+    hybrid.collaborative_recommender = collaborative
+    hybrid.content_recommender = content
+    hybrid.is_initialized = True
+    results.append(await measure(
+        'hybrid_recommendations',
+        [
+            lambda user=user: _hybrid_recommendations(hybrid, dataset, user, user_history(user), k)
+            for user in query_users
+        ],
+        score
+    ))
+    
+    return results
+
+
+async def _hybrid_recommendations(hybrid: HybridRecommender, dataset: SyntheticDataset, user: int,
+                                  history: List[Dict[str, Any]], k: int):
+    request = RecommendationRequest(user_id=dataset.user_ids[user], count=k)
+    response = await hybrid.get_recommendations(request, dataset.user_preferences[user], history)
+    return response.recommendations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='10k', help="Dataset size: 10k, 100k or 1m interactions")
+    parser.add_argument('--queries', type=int, default=200, help="Requests timed per serving benchmark")
+    parser.add_argument('--k', type=int, default=10, help="Recommendation list length for recall/NDCG")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=args.log_level)
+    settings.MODEL_CACHE_DIR = tempfile.mkdtemp(prefix='recommendation-benchmark-')
+    
+    started = time.perf_counter()
+    dataset = generate_dataset(scale_size(args.scale), seed=args.seed)
+    print(f"Generated {dataset.n_interactions} interactions, {len(dataset.user_ids)} users, "
+          f"{len(dataset.event_ids)} events in {time.perf_counter() - started:.1f}s "
+          f"(rss {peak_rss_mb():.0f} MB)")
+    
+    results = asyncio.run(run_benchmarks(dataset, args.queries, args.k, args.seed))
+    print(format_results(results, args.k))
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'scale': args.scale, 'k': args.k, 'results': [asdict(result) for result in results]}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
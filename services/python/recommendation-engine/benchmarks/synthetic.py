@@ -0,0 +1,210 @@
+"""Synthetic event catalog and interaction log for benchmarks"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from app.models.recommendation import UserInteraction
+
+# Interaction counts per named scale; users and events are derived from them
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000
+}
+INTERACTIONS_PER_USER = 20
+INTERACTIONS_PER_EVENT = 100
+MIN_EVENTS = 200
+
+# Category -> tag vocabulary; categories are drawn with Zipf-like weights in this order
+CATEGORY_TAGS = {
+    'music': ['concert', 'jazz', 'rock', 'electronic', 'festival', 'live', 'dj', 'acoustic'],
+    'technology': ['ai', 'startups', 'python', 'cloud', 'security', 'hackathon', 'data', 'web'],
+    'food': ['tasting', 'wine', 'street-food', 'cooking', 'vegan', 'brunch', 'coffee', 'craft-beer'],
+    'sports': ['running', 'yoga', 'cycling', 'football', 'climbing', 'fitness', 'marathon', 'tennis'],
+    'arts': ['gallery', 'painting', 'photography', 'sculpture', 'exhibition', 'design', 'craft', 'film'],
+    'business': ['networking', 'leadership', 'marketing', 'finance', 'sales', 'workshop', 'career', 'panel'],
+    'education': ['lecture', 'workshop', 'language', 'science', 'history', 'reading', 'seminar', 'course'],
+    'community': ['volunteering', 'meetup', 'charity', 'neighborhood', 'family', 'market', 'social', 'pets'],
+    'health': ['meditation', 'wellness', 'nutrition', 'mindfulness', 'yoga', 'therapy', 'sleep', 'fitness'],
+    'theater': ['comedy', 'drama', 'musical', 'improv', 'opera', 'dance', 'ballet', 'stand-up'],
+    'gaming': ['esports', 'board-games', 'tournament', 'retro', 'vr', 'tabletop', 'lan', 'streaming'],
+    'outdoors': ['hiking', 'camping', 'kayaking', 'birdwatching', 'picnic', 'gardening', 'nature', 'tour']
+}
+CITIES = ['New York', 'San Francisco', 'Chicago', 'Austin', 'Seattle', 'Boston', 'Denver', 'Miami']
+FORMATS = ['Night', 'Meetup', 'Workshop', 'Showcase', 'Summit', 'Session', 'Weekend', 'Social']
+
+# Observed interaction mix, most frequent first
+INTERACTION_TYPE_WEIGHTS = {
+    'view': 0.55,
+    'click': 0.20,
+    'like': 0.10,
+    'save': 0.05,
+    'share': 0.04,
+    'register': 0.05,
+    'comment': 0.01
+}
+
+POPULARITY_EXPONENT = 1.1  # Zipf exponent of event popularity by rank
+USER_ACTIVITY_SHAPE = 1.5  # Pareto shape of per-user activity
+CATEGORY_AFFINITY = 0.8  # Share of interactions within a user's preferred categories
+HISTORY_DAYS = 90
+
+
+@dataclass
+class SyntheticDataset:
+    """Catalog, users and a columnar, time-stamped interaction log"""
+    events: List[Dict[str, Any]]
+    event_ids: List[UUID]
+    user_ids: List[UUID]
+    user_preferences: List[Dict[str, Any]]
+    interaction_users: np.ndarray  # Position in ``user_ids``
+    interaction_events: np.ndarray  # Position in ``event_ids``
+    interaction_types: np.ndarray
+    interaction_times: np.ndarray  # Seconds since the start of the history
+    
+    @property
+    def n_interactions(self) -> int:
+        return len(self.interaction_users)
+    
+    def interactions(self, rows: Sequence[int]) -> List[UserInteraction]:
+        """Interaction log rows as pydantic interactions (the training input)"""
+        return [
+            UserInteraction(
+                user_id=self.user_ids[self.interaction_users[row]],
+                event_id=self.event_ids[self.interaction_events[row]],
+                interaction_type=self.interaction_types[row]
+            )
+            for row in rows
+        ]
+    
+    def interaction_dicts(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        """Interaction log rows in the request-time dict form"""
+        return [
+            {
+                'user_id': str(self.user_ids[self.interaction_users[row]]),
+                'event_id': str(self.event_ids[self.interaction_events[row]]),
+                'interaction_type': self.interaction_types[row],
+                'rating': None
+            }
+            for row in rows
+        ]
+
+
+def scale_size(scale: str) -> int:
+    """Number of interactions for a named scale"""
+    if scale.lower() not in SCALES:
+        raise ValueError(f"Unknown scale {scale!r}; expected one of {', '.join(SCALES)}")
+    return SCALES[scale.lower()]
+
+
+def generate_dataset(n_interactions: int, seed: int = 0) -> SyntheticDataset:
+    """Generate a catalog and interaction log with ``n_interactions`` rows
+    
+    Event popularity is Zipf-distributed and user activity Pareto-distributed.
+    Each user prefers one to three categories and draws most interactions from
+    them, so there is signal for the models to learn.
+    """
+    rng = np.random.default_rng(seed)
+    n_users = max(n_interactions // INTERACTIONS_PER_USER, 1)
+    n_events = max(n_interactions // INTERACTIONS_PER_EVENT, MIN_EVENTS)
+    categories = list(CATEGORY_TAGS)
+    category_weights = _zipf_weights(len(categories), 1.0)
+    
+    event_categories = rng.choice(len(categories), n_events, p=category_weights)
+    event_popularity = _zipf_weights(n_events, POPULARITY_EXPONENT)[rng.permutation(n_events)]
+    event_ids = [UUID(bytes=rng.bytes(16)) for _ in range(n_events)]
+    events = [
+        _generate_event(rng, event_id, categories[category], n_events)
+        for event_id, category in zip(event_ids, event_categories)
+    ]
+    
+    user_ids = [UUID(bytes=rng.bytes(16)) for _ in range(n_users)]
+    user_categories = rng.choice(len(categories), (n_users, 3), p=category_weights)
+    n_preferred = rng.integers(1, 4, n_users)
+    user_preferences = [
+        _generate_preferences(rng, [categories[c] for c in user_categories[user, :n_preferred[user]]])
+        for user in range(n_users)
+    ]
+    
+    activity = rng.pareto(USER_ACTIVITY_SHAPE, n_users) + 1.0
+    interaction_users = rng.choice(n_users, n_interactions, p=activity / activity.sum()).astype(np.int32)
+    
+    # Affine interactions pick one of the user's categories, then an event by popularity within it
+    affine = rng.random(n_interactions) < CATEGORY_AFFINITY
+    slot = (rng.random(n_interactions) * n_preferred[interaction_users]).astype(np.int64)
+    chosen_category = np.where(affine, user_categories[interaction_users, slot], -1)
+    
+    interaction_events = np.empty(n_interactions, dtype=np.int32)
+    for category in range(-1, len(categories)):
+        rows = np.flatnonzero(chosen_category == category)
+        candidates = np.arange(n_events) if category < 0 else np.flatnonzero(event_categories == category)
+        if not len(rows):
+            continue
+        if not len(candidates):
+            candidates = np.arange(n_events)
+        weights = event_popularity[candidates]
+        interaction_events[rows] = candidates[rng.choice(len(candidates), len(rows), p=weights / weights.sum())]
+    
+    type_names = np.array(list(INTERACTION_TYPE_WEIGHTS))
+    type_weights = np.array(list(INTERACTION_TYPE_WEIGHTS.values()))
+    interaction_types = type_names[rng.choice(len(type_names), n_interactions, p=type_weights / type_weights.sum())]
+    interaction_times = rng.random(n_interactions) * HISTORY_DAYS * 86400.0
+    
+    return SyntheticDataset(
+        events=events,
+        event_ids=event_ids,
+        user_ids=user_ids,
+        user_preferences=user_preferences,
+        interaction_users=interaction_users,
+        interaction_events=interaction_events,
+        interaction_types=interaction_types.astype(object),
+        interaction_times=interaction_times
+    )
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _generate_event(rng: np.random.Generator, event_id: UUID, category: str, n_events: int) -> Dict[str, Any]:
+    tags = [str(tag) for tag in rng.choice(CATEGORY_TAGS[category], rng.integers(2, 6), replace=False)]
+    city = CITIES[rng.integers(len(CITIES))]
+    is_virtual = bool(rng.random() < 0.2)
+    organizer = f"{category.title()} Collective {rng.integers(max(n_events // 20, 1))}"
+    venue = 'Online' if is_virtual else f"{city} {rng.choice(['Hall', 'Loft', 'Center', 'Park', 'Club'])}"
+    title = f"{tags[0].replace('-', ' ').title()} {FORMATS[rng.integers(len(FORMATS))]}"
+    price = 0.0 if rng.random() < 0.35 else round(float(rng.lognormal(3.2, 0.8)), 2)
+    
+    return {
+        'id': event_id,
+        'title': title,
+        'description': f"A {category} event about {', '.join(tags)} hosted by {organizer} in {city}.",
+        'short_description': f"{title} in {city}",
+        'category': category,
+        'tags': tags,
+        'organizer_name': organizer,
+        'venue_name': venue,
+        'is_virtual': is_virtual,
+        'price': price,
+        'start_time': datetime.utcnow() + timedelta(days=float(rng.uniform(1, 120))),
+        'location': {'city': city},
+        'images': ['cover.jpg'] * int(rng.integers(0, 4)),
+        'curation_score': float(rng.beta(5, 3))
+    }
+
+
+def _generate_preferences(rng: np.random.Generator, categories: List[str]) -> Dict[str, Any]:
+    tags = sorted({tag for category in categories for tag in CATEGORY_TAGS[category]})
+    price_max = None if rng.random() < 0.5 else float(rng.choice([25, 50, 100, 200]))
+    
+    return {
+        'preferred_categories': categories,
+        'interests': [str(tag) for tag in rng.choice(tags, min(len(tags), 4), replace=False)],
+        'preferred_locations': [CITIES[rng.integers(len(CITIES))]],
+        'price_range_min': None,
+        'price_range_max': price_max
+    }
\ No newline at end of file
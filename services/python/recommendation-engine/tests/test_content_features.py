@@ -0,0 +1,122 @@
+"""EventFeatureStore scores checked against the per-event content-based rules"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.algorithms.content_features import EventFeatureStore
+from app.algorithms.event_data import event_frame, frame_features
+
+NOW = datetime.now(timezone.utc)
+
+EVENTS = [
+    {'id': 'a', 'category': 'music', 'tags': ['jazz', 'live'], 'price': 20.0, 'venue_name': 'Blue Note NYC',
+     'start_time': (NOW + timedelta(days=10)).isoformat()},
+    {'id': 'b', 'category': 'tech', 'tags': [], 'price': 0.0, 'is_virtual': True,
+     'start_time': (NOW + timedelta(days=60)).isoformat()},
+    {'id': 'c', 'category': 'music', 'tags': ['rock'], 'price': 150.0, 'venue_name': 'Brooklyn Bowl',
+     'start_time': (NOW + timedelta(days=200)).isoformat()},
+    {'id': 'd', 'category': 'food', 'tags': ['jazz', 'wine', 'wine'], 'price': 5.0, 'venue_name': '',
+     'start_time': (NOW - timedelta(days=3)).isoformat()},
+    {'id': 'e', 'category': '', 'tags': None, 'price': None, 'start_time': None},
+    {'id': 'f', 'category': 'art', 'tags': ['gallery'], 'price': 45.0, 'venue_name': 'Chicago Loft',
+     'start_time': 'not a date'},
+]
+
+PROFILES = [
+    {'preferred_categories': {'music'}, 'preferred_tags': {'jazz', 'wine'},
+     'preferred_locations': {'nyc'}, 'price_preferences': {'min': 10.0, 'max': 50.0}, 'virtual_preference': 0.2},
+    {'preferred_categories': set(), 'preferred_tags': set(),
+     'preferred_locations': {'online', 'brooklyn'}, 'price_preferences': {'min': 0.0, 'max': 0.0},
+     'virtual_preference': 0.9},
+    {'preferred_categories': {'unknown'}, 'preferred_tags': {'unknown'},
+     'preferred_locations': set(), 'price_preferences': {'min': 30.0, 'max': 100.0}, 'virtual_preference': 0.5},
+]
+
+
+# Per-event rules of the original content-based scorer
+
+def category_score(profile, event):
+    if not profile['preferred_categories']:
+        return 0.5
+    return 1.0 if event['category'] in profile['preferred_categories'] else 0.1
+
+
+def tag_score(profile, event):
+    if not profile['preferred_tags'] or not event['tags']:
+        return 0.5
+    event_tags = set(event['tags'])
+    return len(profile['preferred_tags'] & event_tags) / len(profile['preferred_tags'] | event_tags)
+
+
+def location_score(profile, event):
+    if not profile['preferred_locations']:
+        return 1.0
+    if event['is_virtual']:
+        return 1.0 if 'online' in profile['preferred_locations'] else 0.8
+    if event['venue_name']:
+        for preferred in profile['preferred_locations']:
+            if preferred.lower() in event['venue_name'].lower():
+                return 1.0
+    return 0.5
+
+
+def price_score(profile, event):
+    price = event.get('price', 0.0) or 0.0
+    min_price, max_price = profile['price_preferences']['min'], profile['price_preferences']['max']
+    if min_price <= price <= max_price:
+        return 1.0
+    if price < min_price:
+        return 0.8
+    over_budget_ratio = price / max_price if max_price > 0 else float('inf')
+    return max(0.1, 1.0 / over_budget_ratio)
+
+
+def virtual_score(profile, event):
+    preference = profile['virtual_preference']
+    return 0.5 + 0.5 * preference if event['is_virtual'] else 0.5 + 0.5 * (1 - preference)
+
+
+def time_relevance(event):
+    if not event.get('start_time'):
+        return 0.8
+    try:
+        start_time = datetime.fromisoformat(event['start_time'].replace('Z', '+00:00'))
+    except Exception:
+        return 0.8
+    time_diff = start_time - datetime.now(start_time.tzinfo)
+    if timedelta(0) <= time_diff <= timedelta(days=30):
+        return 1.0
+    if timedelta(days=30) < time_diff <= timedelta(days=90):
+        return 0.9
+    if time_diff > timedelta(days=90):
+        return 0.7
+    return 0.1
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    frame = event_frame(EVENTS)
+    return EventFeatureStore.from_frame(frame), frame_features(frame)
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_profile_scores_match_per_event_rules(catalog, profile):
+    store, features = catalog
+    price_preferences = profile['price_preferences']
+
+    np.testing.assert_allclose(store.category_scores(profile['preferred_categories']),
+                               [category_score(profile, event) for event in features])
+    np.testing.assert_allclose(store.tag_scores(profile['preferred_tags']),
+                               [tag_score(profile, event) for event in features])
+    np.testing.assert_allclose(store.location_scores(profile['preferred_locations']),
+                               [location_score(profile, event) for event in features])
+    np.testing.assert_allclose(store.price_scores(price_preferences['min'], price_preferences['max']),
+                               [price_score(profile, event) for event in features])
+    np.testing.assert_allclose(store.virtual_scores(profile['virtual_preference']),
+                               [virtual_score(profile, event) for event in features])
+
+
+def test_time_relevance_matches_per_event_rule(catalog):
+    store, features = catalog
+    np.testing.assert_allclose(store.time_relevance(), [time_relevance(event) for event in features])
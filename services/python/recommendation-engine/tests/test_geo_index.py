@@ -0,0 +1,79 @@
+"""GeoGridIndex copy-on-write updates checked against full rebuilds"""
+import numpy as np
+
+from app.algorithms.geo_index import GeoGridIndex, haversine_km
+
+CELL_DEGREES = 0.5
+
+
+def random_locations(rng: np.random.Generator, n: int):
+    latitudes = rng.uniform(40.0, 44.0, n)
+    longitudes = rng.uniform(178.0, 182.0, n)
+    longitudes = np.where(longitudes > 180.0, longitudes - 360.0, longitudes)  # straddle the antimeridian
+    latitudes[rng.random(n) < 0.1] = np.nan
+    return latitudes, longitudes
+
+
+def built(latitudes: np.ndarray, longitudes: np.ndarray) -> GeoGridIndex:
+    index = GeoGridIndex(CELL_DEGREES)
+    index.build(latitudes, longitudes)
+    return index
+
+
+def entries(index: GeoGridIndex):
+    return sorted(zip(index.keys.tolist(), index.rows.tolist(), index.latitudes.tolist(), index.longitudes.tolist()))
+
+
+def assert_same_queries(index: GeoGridIndex, expected: GeoGridIndex, rng: np.random.Generator):
+    for latitude, longitude in zip(rng.uniform(40.0, 44.0, 20), rng.uniform(-180.0, 180.0, 20)):
+        rows, distances = index.within(latitude, longitude, 150.0)
+        expected_rows, expected_distances = expected.within(latitude, longitude, 150.0)
+        np.testing.assert_array_equal(rows, expected_rows)
+        np.testing.assert_allclose(distances, expected_distances)
+
+
+def test_within_matches_brute_force():
+    rng = np.random.default_rng(0)
+    latitudes, longitudes = random_locations(rng, 500)
+    index = built(latitudes, longitudes)
+    
+    for latitude, longitude in zip(rng.uniform(40.0, 44.0, 20), rng.uniform(178.0, 180.0, 20)):
+        rows, distances = index.within(latitude, longitude, 120.0)
+        located = np.flatnonzero(~np.isnan(latitudes))
+        all_distances = haversine_km(latitude, longitude, latitudes[located], longitudes[located])
+        assert set(rows.tolist()) == set(located[all_distances <= 120.0].tolist())
+        assert (np.diff(distances) >= 0).all()
+
+
+def test_updated_matches_rebuild():
+    rng = np.random.default_rng(1)
+    latitudes, longitudes = random_locations(rng, 400)
+    index = built(latitudes[:300], longitudes[:300])
+    before = entries(index)
+    
+    # Move some events, clear the location of others and append new ones
+    rows = np.concatenate([rng.choice(300, 40, replace=False), np.arange(300, 400)])
+    new_latitudes, new_longitudes = latitudes.copy(), longitudes.copy()
+    new_latitudes[rows[:40]], new_longitudes[rows[:40]] = random_locations(rng, 40)
+    updated = index.updated(rows, new_latitudes[rows], new_longitudes[rows])
+    
+    expected = built(new_latitudes, new_longitudes)
+    assert entries(updated) == entries(expected)
+    assert entries(index) == before
+    assert_same_queries(updated, expected, rng)
+
+
+def test_removed_renumbers_like_a_rebuild():
+    rng = np.random.default_rng(2)
+    latitudes, longitudes = random_locations(rng, 300)
+    index = built(latitudes, longitudes)
+    before = entries(index)
+    
+    removed = rng.choice(300, 50, replace=False)
+    kept = np.setdiff1d(np.arange(300), removed)
+    result = index.removed(removed)
+    
+    expected = built(latitudes[kept], longitudes[kept])
+    assert entries(result) == entries(expected)
+    assert entries(index) == before
+    assert_same_queries(result, expected, rng)
\ No newline at end of file
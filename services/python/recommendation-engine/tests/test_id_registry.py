@@ -0,0 +1,52 @@
+"""IdRegistry lookups through the overflow dict checked against fresh registries"""
+import uuid
+
+import numpy as np
+
+from app.utils.id_registry import IdRegistry, to_uuid_array
+
+
+def new_ids(n: int):
+    return [uuid.uuid4() for _ in range(n)]
+
+
+def test_appended_ids_resolve_before_and_after_reindex():
+    ids = new_ids(2500)
+    registry = IdRegistry.from_ids(ids[:500])
+    
+    # Small batches stay in the overflow dict until it outgrows its threshold, then merge
+    reindexed = False
+    for start in range(500, 2500, 100):
+        batch = ids[start:start + 100]
+        np.testing.assert_array_equal(registry.encode_or_add(batch), np.arange(start, start + 100))
+        reindexed |= not registry._recent
+        
+        expected = IdRegistry.from_ids(ids[:start + 100])
+        np.testing.assert_array_equal(registry.encode(ids[:start + 100]), expected.encode(ids[:start + 100]))
+    
+    assert reindexed and registry._recent
+    np.testing.assert_array_equal(registry.ids, to_uuid_array(ids))
+
+
+def test_encode_or_add_numbers_new_ids_in_first_seen_order():
+    known, fresh = new_ids(10), new_ids(3)
+    registry = IdRegistry.from_ids(known)
+    
+    batch = [fresh[1], known[4], fresh[0], fresh[1], str(fresh[2]), fresh[0].bytes]
+    np.testing.assert_array_equal(registry.encode_or_add(batch), [10, 4, 11, 10, 12, 11])
+    assert registry.decode([10, 11, 12]) == [fresh[1], fresh[0], fresh[2]]
+    assert registry.encode_one(uuid.uuid4()) is None
+    np.testing.assert_array_equal(registry.encode([fresh[2], uuid.uuid4()]), [12, -1])
+
+
+def test_copy_appends_without_changing_the_original():
+    ids = new_ids(20)
+    registry = IdRegistry.from_ids(ids[:10])
+    registry.encode_or_add(ids[10:15])
+    
+    copied = registry.copy()
+    copied.encode_or_add(ids[15:])
+    
+    assert len(registry) == 15 and len(copied) == 20
+    np.testing.assert_array_equal(registry.encode(ids), list(range(15)) + [-1] * 5)
+    np.testing.assert_array_equal(copied.encode(ids), np.arange(20))
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""NeighbourTable incremental updates checked against full rebuilds"""
+import numpy as np
+
+from app.algorithms.neighbours import NeighbourTable, normalize_rows
+
+K = 8
+
+
+def cosine_matrix(vectors: np.ndarray) -> np.ndarray:
+    normalized = normalize_rows(vectors)
+    return normalized @ normalized.T
+
+
+def rebuilt(vectors: np.ndarray) -> NeighbourTable:
+    table = NeighbourTable(k=K, block_size=16)
+    table.build(vectors)
+    return table
+
+
+def assert_scores_current(table: NeighbourTable, similarities: np.ndarray):
+    """Every listed neighbour carries its current similarity, best first"""
+    valid = table.indices >= 0
+    owners = np.nonzero(valid)[0]
+    np.testing.assert_allclose(table.scores[valid], similarities[owners, table.indices[valid]], atol=1e-5)
+    assert (np.diff(np.where(valid, table.scores, -np.inf), axis=1) <= 1e-6).all()
+    assert not (table.indices == np.arange(len(table))[:, np.newaxis]).any()
+
+
+def test_update_with_appended_rows_matches_rebuild():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    
+    table = rebuilt(vectors[:150])
+    table.update(np.arange(150, 200), vectors)
+    
+    expected = rebuilt(vectors)
+    np.testing.assert_array_equal(table.indices, expected.indices)
+    np.testing.assert_allclose(table.scores, expected.scores, atol=1e-5)
+
+
+def test_update_changed_rows_are_exact_and_scores_current():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    table = rebuilt(vectors)
+    
+    changed = rng.choice(200, 20, replace=False)
+    vectors[changed] = rng.standard_normal((20, 16))
+    table.update(changed, vectors, max_block_elements=2000)
+    
+    expected = rebuilt(vectors)
+    np.testing.assert_array_equal(table.indices[changed], expected.indices[changed])
+    assert_scores_current(table, cosine_matrix(vectors))
+
+def built_with(similarities: np.ndarray) -> NeighbourTable:
+    table = NeighbourTable(k=K, block_size=16)
+    table.build_with(len(similarities), lambda rows: similarities[rows])
+    return table
+
+
+def test_update_with_grown_table_matches_build_with():
+    rng = np.random.default_rng(2)
+    similarities = cosine_matrix(rng.standard_normal((120, 12)).astype(np.float32))
+    
+    table = built_with(similarities[:100, :100])
+    table.update_with(np.arange(100, 120), 120, lambda rows: similarities[rows], max_block_elements=500)
+    
+    expected = built_with(similarities)
+    np.testing.assert_array_equal(table.indices, expected.indices)
+    np.testing.assert_allclose(table.scores, expected.scores, atol=1e-6)
+
+
+def test_remove_with_renumbers_like_a_rebuild():
+    rng = np.random.default_rng(3)
+    similarities = cosine_matrix(rng.standard_normal((150, 12)).astype(np.float32))
+    
+    # Drop rows that are listed as neighbours, so some lists must be recomputed
+    table = built_with(similarities)
+    removed = np.unique(np.concatenate([table.indices[:5, 0], rng.choice(150, 10, replace=False)]))
+    kept = np.setdiff1d(np.arange(150), removed)
+    remaining = similarities[np.ix_(kept, kept)]
+    table.remove_with(removed, lambda rows: remaining[rows], max_block_elements=500)
+    
+    expected = built_with(remaining)
+    np.testing.assert_array_equal(table.indices, expected.indices)
+    np.testing.assert_allclose(table.scores, expected.scores, atol=1e-6)
\ No newline at end of file
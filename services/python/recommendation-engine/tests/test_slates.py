@@ -0,0 +1,67 @@
+"""Slate publishing and lookup through a real artifact store"""
+import asyncio
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+from app.algorithms.slates import SlateBuilder, SlateStore
+from app.utils.id_registry import UUID_DTYPE
+from app.utils.model_artifacts import ModelArtifactStore
+
+SLATE_SIZE = 3
+VERSIONS = {'collaborative': 'cf-1', 'content_based': 'content-1'}
+
+
+def shard(slates):
+    """Shard result from ``{user_id: [(event_id, score), ...]}``, padded like ``SlateScorer.score_users``"""
+    event_ids = np.full((len(slates), SLATE_SIZE), b'', dtype=UUID_DTYPE)
+    scores = np.full((len(slates), SLATE_SIZE), -np.inf, dtype=np.float32)
+    for row, slate in enumerate(slates.values()):
+        for column, (event_id, score) in enumerate(slate):
+            event_ids[row, column] = event_id.bytes
+            scores[row, column] = score
+    user_ids = np.array([user_id.bytes for user_id in slates], dtype=UUID_DTYPE)
+    return user_ids, event_ids, scores, VERSIONS
+
+
+def published(results, tmp_path) -> SlateStore:
+    builder = SlateBuilder(n_workers=0)
+    builder.artifact_store = ModelArtifactStore("recommendation_slates", root=str(tmp_path))
+    builder._publish(results, time.time())
+    
+    store = SlateStore()
+    store.artifact_store = builder.artifact_store
+    assert asyncio.run(store.load_model())
+    return store
+
+
+@pytest.mark.parametrize('padded', [True, False])
+def test_published_slates_round_trip(tmp_path, padded):
+    events = [uuid.uuid4() for _ in range(4)]
+    users = [uuid.uuid4() for _ in range(3)]
+    slates = [
+        {users[0]: [(events[2], 0.9), (events[0], 0.5), (events[1], 0.25)],
+         users[1]: [(events[3], 0.75)] + ([] if padded else [(events[0], 0.5), (events[2], 0.125)])},
+        {users[2]: [(events[1], 1.0), (events[3], 0.5), (events[0], 0.0)]}
+    ]
+    store = published([shard(slate) for slate in slates], tmp_path)
+    
+    assert len(store.event_registry) == 4 and b'' not in store.event_registry.ids.tolist()
+    assert (store.slate_events == -1).sum() == (2 if padded else 0)
+    for slate in slates:
+        for user_id, expected in slate.items():
+            got = store.get(user_id)
+            assert [event_id for event_id, _ in got] == [event_id for event_id, _ in expected]
+            np.testing.assert_allclose([score for _, score in got], [score for _, score in expected], atol=1e-3)
+    assert store.get(uuid.uuid4()) is None
+
+
+def test_user_without_candidates_gets_an_empty_slate(tmp_path):
+    events = [uuid.uuid4() for _ in range(2)]
+    users = [uuid.uuid4() for _ in range(2)]
+    store = published([shard({users[0]: [(events[0], 0.5), (events[1], 0.25)]}), shard({users[1]: []})], tmp_path)
+    
+    assert store.get(users[1]) == []
+    assert [event_id for event_id, _ in store.get(users[0])] == events
\ No newline at end of file